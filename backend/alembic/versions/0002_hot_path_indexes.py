@@ -0,0 +1,66 @@
+"""hot path indexes
+
+Composite and partial indexes matched to the filters and sort orders used by
+the routers (worker/user order lists, chat messages and unread counts,
+notification feeds, service browsing, reviews and favorites). On Postgres the
+indexes are built CONCURRENTLY so existing tables stay writable.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index predicate per dialect)
+INDEXES = [
+    ('ix_orders_worker_id_status_created_at', 'orders', ['worker_id', 'status', 'created_at'], None),
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], None),
+    ('ix_messages_chat_id_created_at', 'messages', ['chat_id', 'created_at'], None),
+    ('ix_messages_chat_id_sender_type_unread', 'messages', ['chat_id', 'sender_type'],
+     {'postgresql': 'is_read = false', 'sqlite': 'is_read = 0'}),
+    ('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at'],
+     {'postgresql': 'user_id IS NOT NULL', 'sqlite': 'user_id IS NOT NULL'}),
+    ('ix_notifications_worker_id_created_at', 'notifications', ['worker_id', 'created_at'],
+     {'postgresql': 'worker_id IS NOT NULL', 'sqlite': 'worker_id IS NOT NULL'}),
+    ('ix_services_category_id_is_available', 'services', ['category_id', 'is_available'], None),
+    ('ix_services_worker_id', 'services', ['worker_id'], None),
+    ('ix_reviews_worker_id', 'reviews', ['worker_id'], None),
+    ('ix_reviews_order_id', 'reviews', ['order_id'], None),
+    ('ix_user_favorites_user_id_worker_id', 'user_favorites', ['user_id', 'worker_id'], None),
+    ('ix_chats_user_id_is_active', 'chats', ['user_id', 'is_active'], None),
+    ('ix_chats_worker_id_is_active', 'chats', ['worker_id', 'is_active'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            kwargs = {}
+            if where:
+                kwargs['postgresql_where'] = sa.text(where['postgresql'])
+                kwargs['sqlite_where'] = sa.text(where['sqlite'])
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,60 @@
+"""order scheduled_end
+
+Stores the end of each booking (scheduled_date + hours) so overlap checks can
+compare plain columns on every database. On Postgres a GiST index over
+(worker_id, tsrange(scheduled_date, scheduled_end)) for active orders serves
+those checks; it needs the btree_gist extension for the integer column.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('scheduled_end', sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE orders SET scheduled_end = scheduled_date + make_interval(hours => COALESCE(hours, 1)) "
+            "WHERE scheduled_date IS NOT NULL"
+        )
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_orders_worker_id_schedule', 'orders',
+                ['worker_id', sa.text('tsrange(scheduled_date, scheduled_end)')],
+                unique=False, postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True,
+                postgresql_where=sa.text(
+                    "status IN ('pending', 'accepted', 'in_progress') AND scheduled_date IS NOT NULL"
+                ),
+            )
+    else:
+        op.execute(
+            "UPDATE orders SET scheduled_end = datetime(scheduled_date, '+' || COALESCE(hours, 1) || ' hours') "
+            "WHERE scheduled_date IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_orders_worker_id_schedule', table_name='orders',
+                          postgresql_concurrently=True, if_exists=True)
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('scheduled_end')
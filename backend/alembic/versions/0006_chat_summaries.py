@@ -0,0 +1,90 @@
+"""chat summaries
+
+Keeps the last message and per-side unread counts on each chat so chat
+lists are one indexed query ordered by last_message_at. Existing chats are
+backfilled from their messages.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('chats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_message_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('user_unread_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('worker_unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    chats = sa.table(
+        'chats',
+        sa.column('id', sa.Integer), sa.column('created_at', sa.DateTime),
+        sa.column('last_message_id', sa.Integer), sa.column('last_message_at', sa.DateTime),
+        sa.column('user_unread_count', sa.Integer), sa.column('worker_unread_count', sa.Integer),
+    )
+    messages = sa.table(
+        'messages',
+        sa.column('id', sa.Integer), sa.column('chat_id', sa.Integer), sa.column('sender_type', sa.String),
+        sa.column('is_read', sa.Boolean), sa.column('created_at', sa.DateTime),
+    )
+    in_chat = messages.c.chat_id == chats.c.id
+
+    def unread_from(sender_type):
+        return (
+            sa.select(sa.func.count()).where(in_chat, messages.c.sender_type == sender_type,
+                                             messages.c.is_read == sa.false())
+            .scalar_subquery()
+        )
+
+    op.execute(chats.update().values(
+        last_message_id=sa.select(messages.c.id).where(in_chat)
+        .order_by(messages.c.created_at.desc(), messages.c.id.desc()).limit(1).scalar_subquery(),
+        last_message_at=sa.func.coalesce(
+            sa.select(sa.func.max(messages.c.created_at)).where(in_chat).scalar_subquery(),
+            chats.c.created_at,
+        ),
+        user_unread_count=unread_from('worker'),
+        worker_unread_count=unread_from('user'),
+    ))
+
+    # The new indexes cover the old ones' columns; CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for side in ('user', 'worker'):
+            op.create_index(
+                f'ix_chats_{side}_id_is_active_last_message_at', 'chats',
+                [f'{side}_id', 'is_active', 'last_message_at'], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(f'ix_chats_{side}_id_is_active', table_name='chats',
+                          postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for side in ('user', 'worker'):
+            op.create_index(
+                f'ix_chats_{side}_id_is_active', 'chats', [f'{side}_id', 'is_active'], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index(f'ix_chats_{side}_id_is_active_last_message_at', table_name='chats',
+                          postgresql_concurrently=True, if_exists=True)
+    with op.batch_alter_table('chats', schema=None) as batch_op:
+        batch_op.drop_column('worker_unread_count')
+        batch_op.drop_column('user_unread_count')
+        batch_op.drop_column('last_message_at')
+        batch_op.drop_column('last_message_id')
@@ -0,0 +1,101 @@
+"""chat read watermarks
+
+Replaces per-message is_read updates with one read watermark per chat side.
+Watermarks are backfilled from the newest message each side has read, and
+unread counts are recounted past them. The partial unread index gives way to
+one on (chat_id, sender_type, id) for those range counts.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+chats = sa.table(
+    'chats',
+    sa.column('id', sa.Integer),
+    sa.column('user_unread_count', sa.Integer), sa.column('worker_unread_count', sa.Integer),
+    sa.column('user_last_read_message_id', sa.Integer), sa.column('worker_last_read_message_id', sa.Integer),
+)
+messages = sa.table(
+    'messages',
+    sa.column('id', sa.Integer), sa.column('chat_id', sa.Integer), sa.column('sender_type', sa.String),
+    sa.column('is_read', sa.Boolean),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('chats', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_last_read_message_id', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('worker_last_read_message_id', sa.Integer(), server_default='0', nullable=False))
+
+    in_chat = messages.c.chat_id == chats.c.id
+
+    def last_read_from(sender_type):
+        return sa.func.coalesce(
+            sa.select(sa.func.max(messages.c.id)).where(in_chat, messages.c.sender_type == sender_type,
+                                                        messages.c.is_read == sa.true())
+            .scalar_subquery(),
+            0,
+        )
+
+    def unread_from(sender_type, watermark):
+        return (
+            sa.select(sa.func.count()).where(in_chat, messages.c.sender_type == sender_type,
+                                             messages.c.id > watermark)
+            .scalar_subquery()
+        )
+
+    op.execute(chats.update().values(
+        user_last_read_message_id=last_read_from('worker'),
+        worker_last_read_message_id=last_read_from('user'),
+    ))
+    op.execute(chats.update().values(
+        user_unread_count=unread_from('worker', chats.c.user_last_read_message_id),
+        worker_unread_count=unread_from('user', chats.c.worker_last_read_message_id),
+    ))
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_chat_id_sender_type_id', 'messages', ['chat_id', 'sender_type', 'id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_messages_chat_id_sender_type_unread', table_name='messages',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_messages_chat_id_sender_type_unread', 'messages', ['chat_id', 'sender_type'], unique=False,
+            postgresql_where=sa.text('is_read = false'), sqlite_where=sa.text('is_read = 0'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_messages_chat_id_sender_type_id', table_name='messages',
+                      postgresql_concurrently=True, if_exists=True)
+
+    # Carry the watermarks back into per-message flags
+    watermark = sa.select(sa.case(
+        (messages.c.sender_type == 'user', chats.c.worker_last_read_message_id),
+        else_=chats.c.user_last_read_message_id,
+    )).where(chats.c.id == messages.c.chat_id).scalar_subquery()
+    op.execute(messages.update().where(messages.c.is_read == sa.false(), messages.c.id <= watermark)
+               .values(is_read=True))
+    with op.batch_alter_table('chats', schema=None) as batch_op:
+        batch_op.drop_column('worker_last_read_message_id')
+        batch_op.drop_column('user_last_read_message_id')
@@ -0,0 +1,47 @@
+"""unread notification counts
+
+Keeps each user's and worker's unread notification count on their row so
+the badge endpoint is a primary-key lookup. Existing counts are backfilled
+from the notifications table.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    notifications = sa.table(
+        'notifications',
+        sa.column('user_id', sa.Integer), sa.column('worker_id', sa.Integer), sa.column('is_read', sa.Boolean),
+    )
+    for table_name, owner in (('users', notifications.c.user_id), ('workers', notifications.c.worker_id)):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('unread_notification_count', sa.Integer(), server_default='0',
+                                          nullable=False))
+        owners = sa.table(table_name, sa.column('id', sa.Integer), sa.column('unread_notification_count', sa.Integer))
+        op.execute(owners.update().values(
+            unread_notification_count=sa.select(sa.func.count())
+            .where(owner == owners.c.id, notifications.c.is_read == sa.false())
+            .scalar_subquery()
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in ('workers', 'users'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('unread_notification_count')
@@ -0,0 +1,55 @@
+"""broadcast notifications
+
+Audience-wide notifications (all users, all workers, a category's workers)
+stored once, plus the id each user and worker has read broadcasts up to.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'broadcast_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('audience', sa.String(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_broadcast_notifications_id'), 'broadcast_notifications', ['id'], unique=False)
+    op.create_index(
+        'ix_broadcast_notifications_audience_category_id_created_at', 'broadcast_notifications',
+        ['audience', 'category_id', 'created_at'], unique=False,
+    )
+    for table_name in ('users', 'workers'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('broadcasts_seen_up_to', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in ('workers', 'users'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('broadcasts_seen_up_to')
+    op.drop_index('ix_broadcast_notifications_audience_category_id_created_at', table_name='broadcast_notifications')
+    op.drop_index(op.f('ix_broadcast_notifications_id'), table_name='broadcast_notifications')
+    op.drop_table('broadcast_notifications')
@@ -1 +1,13 @@
-from app.main import app  # Expose FastAPI app for Vercel 
\ No newline at end of file
+"""Vercel serverless entry point (see vercel.json)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Serverless invocations must not hold idle pooled connections between requests
+os.environ.setdefault("DATABASE_POOL_PROFILE", "serverless")
+# A function instance cannot keep background loops alive; run outbox_worker.py elsewhere
+os.environ.setdefault("OUTBOX_DISPATCHER", "off")
+os.environ.setdefault("EMAIL_DISPATCHER", "off")
+
+from app.main import app  # noqa: E402
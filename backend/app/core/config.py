@@ -5,17 +5,116 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./helpmate.db"
+    # Pool profile: auto, server (long-lived uvicorn), serverless or pgbouncer
+    database_pool_profile: str = "auto"
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: int = 30
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    
+    # SQLite production mode: WAL, pragmas and a single-writer connection
+    sqlite_tuning: bool = False
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size: int = -65536  # negative values are KiB
+    # Wait for a locked SQLite database, in milliseconds; applies with or without tuning
+    sqlite_busy_timeout: int = 5000
+    
+    # Startup check of the Alembic revision: warn, strict (refuse to start) or off
+    schema_check: str = "warn"
     
     # JWT
     secret_key: str = "your-secret-key-here-make-it-long-and-secure"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
-    # Email (for future use)
+    # Principal cache
+    principal_cache_max_entries: int = 10000
+    principal_cache_ttl_seconds: int = 60
+    
+    # Password hashing (0 workers hashes inline on the calling thread)
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+    
+    # Per-process booking interval trees used for conflict checks on SQLite
+    booking_index_ttl_seconds: int = 30
+    booking_index_max_workers: int = 1000
+    # Lifetime of the slot hold taken while a user confirms a booking
+    booking_hold_seconds: int = 300
+    # How long a booking keeps retrying a busy SQLite write lock before giving up
+    booking_lock_timeout_seconds: float = 30.0
+    # Cached free-slot lists per worker (also dropped on any booking change)
+    availability_cache_ttl_seconds: int = 30
+    # 15-minute slot bitmaps per category for multi-worker availability search
+    slot_index_horizon_days: int = 14
+    slot_index_ttl_seconds: int = 300
+    slot_index_max_categories: int = 64
+    
+    # Cross-process fan-out of chat events: memory (single process), redis or postgres
+    realtime_broker: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    # Per-socket outbound queue; slow consumers are disconnected on overflow or a stalled send
+    websocket_send_queue_size: int = 256
+    websocket_send_timeout_seconds: float = 5.0
+    # Time a chat socket has to send its auth frame when no ?token= is given
+    websocket_auth_timeout_seconds: float = 10.0
+    # Protocol-level ping/pong run by the server; sockets that miss a pong are dropped.
+    # Only "python main.py" passes these to uvicorn: with the uvicorn CLI use
+    # --ws-ping-interval/--ws-ping-timeout, other ASGI servers have their own options
+    websocket_ping_interval_seconds: float = 20.0
+    websocket_ping_timeout_seconds: float = 20.0
+    # Sockets whose client sends no frame (e.g. {"type": "ping"}) for this long are closed; 0 disables
+    websocket_idle_timeout_seconds: float = 1800.0
+    websocket_reap_interval_seconds: float = 30.0
+    # Comment line written to idle notification event streams, so proxies keep them open
+    notification_stream_keepalive_seconds: float = 15.0
+    # Streams end after this long and the client's EventSource reconnects (resuming via Last-Event-ID)
+    notification_stream_max_seconds: float = 300.0
+    # Notifications replayed to an event stream reconnecting with Last-Event-ID; past this it gets a reset event
+    notification_stream_replay_limit: int = 100
+    # Messages sent over chat sockets are inserted in group commits
+    chat_write_batch_size: int = 100
+    chat_write_batch_delay_ms: float = 10
+    chat_write_max_pending: int = 5000
+    # Order side effects go through the outbox: "inprocess" delivers them from each API process,
+    # "off" leaves them to a separate python outbox_worker.py (e.g. on serverless deployments)
+    outbox_dispatcher: str = "inprocess"
+    outbox_batch_size: int = 50
+    outbox_poll_interval_seconds: float = 5.0
+    # Failed deliveries are retried after retry_base, doubling per attempt; then marked failed
+    outbox_max_attempts: int = 8
+    outbox_retry_base_seconds: float = 5.0
+    outbox_retry_max_seconds: float = 3600.0
+    # A claimed event is offered to other dispatchers again if not delivered within this time
+    outbox_lease_seconds: float = 120.0
+    
+    # Keyset pagination of list endpoints
+    page_size_default: int = 50
+    page_size_max: int = 200
+    
+    # Email
     smtp_server: Optional[str] = None
     smtp_port: Optional[int] = None
     smtp_username: Optional[str] = None
     smtp_password: Optional[str] = None
+    # Envelope and From address; defaults to smtp_username
+    smtp_sender: Optional[str] = None
+    smtp_starttls: bool = True
+    smtp_timeout_seconds: float = 30.0
+    # Emails are queued in the database and sent over a few long-lived SMTP connections:
+    # "inprocess" sends from each API process, "off" leaves it to python outbox_worker.py
+    email_dispatcher: str = "inprocess"
+    smtp_pool_size: int = 3
+    # Pooled connections idle for longer are closed before reuse, ahead of the server's own timeout
+    smtp_idle_seconds: float = 60.0
+    email_batch_size: int = 100
+    email_poll_interval_seconds: float = 5.0
+    # Temporary failures are retried after retry_base, doubling per attempt; then the email is dead
+    email_max_attempts: int = 8
+    email_retry_base_seconds: float = 30.0
+    email_retry_max_seconds: float = 3600.0
+    # A claimed batch is offered to other senders again if not sent within this time
+    email_lease_seconds: float = 300.0
     
     # App
     app_name: str = "HelpMate API"
@@ -1,13 +1,60 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_pool import engine_options, pool_metrics
+from .sqlite_profile import (
+    apply_sqlite_pragmas, single_writer_session_class, sqlite_tuning_enabled, writer_engine_options
+)
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    scheme, sep, rest = database_url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return database_url
+
 
 # Create database engine
-engine = create_engine(settings.database_url)
+engine = create_engine(
+    settings.database_url,
+    **engine_options(settings, settings.database_url, "sync"),
+)
+
+# Create async database engine for routers that run on the event loop
+async_database_url = get_async_database_url(settings.database_url)
+async_engine = create_async_engine(
+    async_database_url,
+    **engine_options(settings, async_database_url, "async", is_async=True),
+)
+
+pool_metrics.register("sync", engine.pool)
+pool_metrics.register("async", async_engine.sync_engine.pool)
+
+session_options = {}
+async_session_options = {}
+if sqlite_tuning_enabled(settings, settings.database_url):
+    # Dedicated single-connection engines that every flush is routed through
+    write_engine = create_engine(settings.database_url, **writer_engine_options(settings))
+    async_write_engine = create_async_engine(async_database_url, **writer_engine_options(settings))
+    for tuned_engine in (engine, write_engine, async_engine.sync_engine, async_write_engine.sync_engine):
+        apply_sqlite_pragmas(tuned_engine, settings)
+    pool_metrics.register("sync_writer", write_engine.pool)
+    pool_metrics.register("async_writer", async_write_engine.sync_engine.pool)
+    session_options["class_"] = single_writer_session_class(write_engine)
+    async_session_options["sync_session_class"] = single_writer_session_class(async_write_engine.sync_engine)
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, **session_options)
+
+# Create AsyncSessionLocal class; objects stay usable after commit since
+# async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, **async_session_options)
 
 # Create Base class
 Base = declarative_base()
@@ -19,4 +66,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+# Dependency to get async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from .config import Settings
+
+# Supabase's transaction-mode pooler (PgBouncer) listens on this port
+PGBOUNCER_PORT = 6543
+
+
+class PoolMetrics:
+    """Checkout latency and saturation counters for each named engine pool."""
+
+    def __init__(self, sample_size: int = 1024):
+        self._pools: Dict[str, object] = {}
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, dict] = {}
+        self._sample_size = sample_size
+        self._lock = threading.Lock()
+
+    def register(self, name: str, pool):
+        with self._lock:
+            self._pools[name] = pool
+            self._samples[name] = deque(maxlen=self._sample_size)
+            self._counts[name] = {"checkouts": 0, "timeouts": 0, "max_wait_ms": 0.0}
+
+    def observe(self, name: str, wait_seconds: float, timed_out: bool = False):
+        wait_ms = wait_seconds * 1000
+        with self._lock:
+            counts = self._counts.get(name)
+            if counts is None:
+                return
+            if timed_out:
+                counts["timeouts"] += 1
+            else:
+                counts["checkouts"] += 1
+                self._samples[name].append(wait_ms)
+            counts["max_wait_ms"] = max(counts["max_wait_ms"], wait_ms)
+
+    def stats(self) -> Dict[str, dict]:
+        result = {}
+        with self._lock:
+            for name, pool in self._pools.items():
+                samples = sorted(self._samples[name])
+                entry = dict(self._counts[name])
+                entry["pool"] = type(pool).__name__
+                if samples:
+                    entry["avg_wait_ms"] = sum(samples) / len(samples)
+                    entry["p99_wait_ms"] = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+                if isinstance(pool, QueuePool):
+                    capacity = pool.size() + pool._max_overflow
+                    entry["checked_out"] = pool.checkedout()
+                    entry["capacity"] = capacity
+                    entry["saturation"] = pool.checkedout() / capacity if capacity > 0 else None
+                result[name] = entry
+        return result
+
+
+pool_metrics = PoolMetrics()
+
+
+def _instrumented(pool_cls, name: str):
+    """Subclass ``pool_cls`` so every checkout reports its wait time to ``pool_metrics``."""
+
+    class InstrumentedPool(pool_cls):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except Exception:
+                pool_metrics.observe(name, time.perf_counter() - started, timed_out=True)
+                raise
+            pool_metrics.observe(name, time.perf_counter() - started)
+            return connection
+
+    InstrumentedPool.__name__ = pool_cls.__name__
+    return InstrumentedPool
+
+
+def resolve_pool_profile(settings: Settings, database_url: Optional[str] = None) -> str:
+    """Pick ``server``, ``serverless`` or ``pgbouncer`` when the profile is ``auto``."""
+    profile = settings.database_pool_profile
+    if profile != "auto":
+        return profile
+    if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        return "serverless"
+    url = make_url(database_url or settings.database_url)
+    if url.get_backend_name() == "postgresql" and url.port == PGBOUNCER_PORT:
+        return "pgbouncer"
+    return "server"
+
+
+def engine_options(settings: Settings, database_url: str, name: str, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine/create_async_engine under the active pool profile."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        # pysqlite and aiosqlite both take the busy timeout in seconds
+        return {"connect_args": {"timeout": settings.sqlite_busy_timeout / 1000}}
+
+    profile = resolve_pool_profile(settings, database_url)
+    if profile == "serverless":
+        # Each invocation may run in a fresh container; never keep idle connections
+        options = {"poolclass": NullPool}
+    else:
+        queue_pool = AsyncAdaptedQueuePool if is_async else QueuePool
+        options = {
+            "poolclass": _instrumented(queue_pool, name),
+            "pool_size": settings.database_pool_size,
+            "max_overflow": settings.database_max_overflow,
+            "pool_timeout": settings.database_pool_timeout,
+            "pool_recycle": settings.database_pool_recycle,
+            "pool_pre_ping": settings.database_pool_pre_ping,
+        }
+
+    behind_pgbouncer = profile == "pgbouncer" or url.port == PGBOUNCER_PORT
+    if behind_pgbouncer and is_async:
+        # PgBouncer in transaction mode hands each transaction to a different
+        # server connection, so asyncpg must not reuse named prepared statements
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
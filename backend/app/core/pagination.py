@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import DateTime, String, and_, literal, or_
+from sqlalchemy.types import TypeDecorator
+from app.core.config import settings
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class _CursorTimestamp(TypeDecorator):
+    """Binds a cursor's created_at in the form the column is stored in.
+
+    SQLite keeps server-default timestamps as 'YYYY-MM-DD HH:MM:SS' text, so
+    the bound value has to be text in that same format for equal timestamps
+    to compare equal.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == "sqlite":
+            return value.replace(tzinfo=None).isoformat(sep=" ")
+        return value
+
+
+def encode_cursor(created_at: datetime, row_id: int, tiebreak=None) -> str:
+    key = [created_at.isoformat(), row_id] + ([tiebreak] if tiebreak is not None else [])
+    raw = json.dumps(key).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, Optional[Any]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id, *tiebreak = json.loads(raw)
+        if len(tiebreak) > 1:
+            raise ValueError("too many cursor fields")
+        return datetime.fromisoformat(created_at), int(row_id), tiebreak[0] if tiebreak else None
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+class Page:
+    """``limit`` and ``cursor`` query parameters of a keyset-paginated list.
+
+    Declared as a dependency. ``apply`` orders a select by (created_at, id),
+    or by another timestamp column and id, with an optional tiebreak column
+    in between for selects whose ids can repeat, and narrows it to the rows after
+    the cursor; ``finish`` drops the extra row fetched to detect a following
+    page and, if there is one, puts its opaque cursor in the X-Next-Cursor
+    response header. Response bodies stay plain JSON lists.
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    ):
+        self.response = response
+        self.limit = limit
+        self._key = "created_at"
+        self._tiebreak_key = None
+        self.after = decode_cursor(cursor) if cursor else None
+
+    def apply(self, query, model, descending: bool = True, column=None, tiebreak=None):
+        """Page ``query`` over ``model`` by (``column``, ``tiebreak``, id); ``column`` defaults to created_at.
+
+        ``tiebreak`` orders rows with the same timestamp and id, e.g. rows
+        from two tables in a UNION; its value goes into the cursor.
+        """
+        sort_column = column if column is not None else model.created_at
+        row_id = model.id
+        self._key = sort_column.key
+        self._tiebreak_key = tiebreak.key if tiebreak is not None else None
+        keys = [sort_column] + ([tiebreak] if tiebreak is not None else []) + [row_id]
+        if self.after is not None:
+            after_value, after_id, after_tiebreak = self.after
+            bounds = [(sort_column, literal(after_value, _CursorTimestamp()))]
+            if tiebreak is not None and after_tiebreak is not None:
+                bounds.append((tiebreak, literal(after_tiebreak, tiebreak.type)))
+            bounds.append((row_id, after_id))
+            # (a, b, c) past (A, B, C) is: a past A, or a == A and (b, c) past (B, C)
+            condition = None
+            for key, value in reversed(bounds):
+                past = key < value if descending else key > value
+                condition = past if condition is None else or_(past, and_(key == value, condition))
+            query = query.filter(condition)
+        if descending:
+            query = query.order_by(*(key.desc() for key in keys))
+        else:
+            query = query.order_by(*(key.asc() for key in keys))
+        return query.limit(self.limit + 1)
+
+    def finish(self, rows) -> List:
+        rows = list(rows)
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            tiebreak = getattr(last, self._tiebreak_key) if self._tiebreak_key else None
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, self._key), last.id, tiebreak)
+        return rows
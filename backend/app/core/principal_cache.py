@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from .config import settings
+
+
+class _LRU:
+    """Bounded LRU map whose entries carry an absolute expiry time."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, expires_at: float):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        return self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class PrincipalCache:
+    """In-process cache for authenticated principals.
+
+    Decoded JWT claims are cached by token and resolved User/Worker rows are
+    cached as column snapshots keyed by ``(user_type, user_id)``. No entry
+    outlives the ``exp`` claim of the token that produced it. Handlers that
+    write to a principal must call :meth:`invalidate`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._claims = _LRU(max_entries)
+        self._principals = _LRU(max_entries)
+        self._lock = threading.Lock()
+
+    def _expiry(self, claims: dict, now: float) -> float:
+        expires_at = now + self.ttl_seconds
+        exp = claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        return expires_at
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        with self._lock:
+            return self._claims.get(token, time.time())
+
+    def set_claims(self, token: str, claims: dict):
+        now = time.time()
+        with self._lock:
+            self._claims.set(token, claims, self._expiry(claims, now))
+
+    def get_principal(self, db: Session, model, user_type: str, user_id: int):
+        """Return a session-bound instance rebuilt from the cached snapshot, or None."""
+        with self._lock:
+            snapshot = self._principals.get((user_type, user_id), time.time())
+        if snapshot is None:
+            return None
+        instance = model(**snapshot)
+        make_transient_to_detached(instance)
+        # load=False attaches the instance to the session without a SELECT
+        return db.merge(instance, load=False)
+
+    def set_principal(self, user_type: str, principal, claims: dict):
+        snapshot = {
+            attr.key: getattr(principal, attr.key)
+            for attr in inspect(principal).mapper.column_attrs
+        }
+        now = time.time()
+        with self._lock:
+            self._principals.set((user_type, principal.id), snapshot, self._expiry(claims, now))
+
+    def invalidate(self, user_type: str, user_id: int):
+        """Drop the cached snapshot for a principal after its row was written."""
+        with self._lock:
+            self._principals.pop((user_type, user_id))
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+            self._principals.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                "claims": self._claims.stats(),
+                "principals": self._principals.stats(),
+            }
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
@@ -0,0 +1,40 @@
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Head revision under alembic/versions; bump it together with every new migration
+SCHEMA_REVISION = "0012"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+async def current_schema_revision(engine: AsyncEngine):
+    """Revision recorded in ``alembic_version``, or None for an unmigrated database."""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return result.scalar()
+    except SQLAlchemyError:
+        return None
+
+
+async def check_schema_version(engine: AsyncEngine, mode: str = "warn"):
+    """Compare the database revision with SCHEMA_REVISION in a single query.
+
+    Replaces running ``Base.metadata.create_all`` at import: schema changes are
+    applied out of band with ``python migrate_db.py`` (alembic upgrade head).
+    """
+    if mode == "off":
+        return
+    revision = await current_schema_revision(engine)
+    if revision == SCHEMA_REVISION:
+        return
+    message = (
+        f"Database schema is at revision {revision or 'none'}, expected {SCHEMA_REVISION}. "
+        "Run 'python migrate_db.py' to apply migrations."
+    )
+    if mode == "strict":
+        raise SchemaVersionError(message)
+    print(f"Warning: {message}")
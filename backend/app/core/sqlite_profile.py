@@ -0,0 +1,61 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from .config import Settings
+
+
+def sqlite_tuning_enabled(settings: Settings, database_url: str) -> bool:
+    return settings.sqlite_tuning and database_url.startswith("sqlite") and ":memory:" not in database_url
+
+
+def apply_sqlite_pragmas(engine: Engine, settings: Settings):
+    """Set WAL and the production pragmas on every new connection of ``engine``."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+        cursor.close()
+
+
+def writer_engine_options(settings: Settings) -> dict:
+    """A pool of exactly one connection: checkouts queue up FIFO behind the single writer."""
+    return {
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": settings.database_pool_timeout,
+    }
+
+
+class SingleWriterSession(Session):
+    """Session that sends flushes and DML to ``write_bind`` and reads to its normal bind.
+
+    In WAL mode readers never wait on the writer, and funnelling every write
+    through one pooled connection turns ``database is locked`` errors into an
+    orderly queue. Once a transaction has written, its remaining statements
+    stay on the writer connection until commit: they see the uncommitted rows,
+    and the writer is never held while waiting for a reader connection (which
+    could deadlock against sessions holding a reader while queueing for the
+    writer).
+    """
+
+    write_bind = None
+    _writer_transaction = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.write_bind is not None:
+            if self._writer_transaction is not None and self._writer_transaction is self.get_transaction():
+                return self.write_bind
+            if self._flushing or isinstance(clause, UpdateBase):
+                self._writer_transaction = self.get_transaction() or self.begin()
+                return self.write_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def single_writer_session_class(write_engine: Engine):
+    return type("SingleWriterSession", (SingleWriterSession,), {"write_bind": write_engine})
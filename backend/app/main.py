@@ -1,48 +1,93 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.core.database import engine
-from app.models import User, Worker, WorkerOrder, Category, Service, Order, Review, Chat, Message, UserFavorite
-from app.routers import auth, categories, workers, services, orders, chat, favorites, notifications, admin
-
-from app.core.database import Base
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="HelpMate API",
-    description="A comprehensive home service provider platform API",
-    version="1.0.0"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-app.include_router(auth.router, prefix="/api/v1")
-app.include_router(categories.router, prefix="/api/v1")
-app.include_router(workers.router, prefix="/api/v1")
-app.include_router(services.router, prefix="/api/v1")
-app.include_router(orders.router, prefix="/api/v1")
-app.include_router(chat.router, prefix="/api/v1")
-app.include_router(favorites.router, prefix="/api/v1")
-app.include_router(admin.router, prefix="/api/v1")
-app.include_router(notifications.router, prefix="/api/v1")
-
-@app.get("/")
-async def root():
-    return {
-        "message": "Welcome to HelpMate API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.schema import check_schema_version
+from app.core.security import password_hasher
+from app.services.broker import broker
+from app.services.chat_writer import chat_writer
+from app.services.connections import connection_hub
+from app.services.email_queue import email_queue
+from app.services.email_templates import email_templates
+from app.services.outbox import outbox_dispatcher
+from app.services.realtime import realtime_events
+from app.routers import auth, categories, workers, services, orders, chat, favorites, notifications, realtime, admin
+
+API_PREFIX = "/api/v1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by migrations (python migrate_db.py), not at import
+    await check_schema_version(async_engine, settings.schema_check)
+    await connection_hub.start()
+    await broker.start(connection_hub.deliver)
+    realtime_events.start()
+    await chat_writer.start()
+    email_templates.load()
+    if settings.outbox_dispatcher == "inprocess":
+        await outbox_dispatcher.start()
+    if settings.email_dispatcher == "inprocess":
+        await email_queue.start()
+    yield
+    await outbox_dispatcher.stop()
+    await email_queue.stop()
+    await chat_writer.stop()
+    realtime_events.stop()
+    await broker.stop()
+    await connection_hub.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="HelpMate API",
+        description="A comprehensive home service provider platform API",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify your frontend URL
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # Serve static files (for profile images, etc.)
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+
+    app.include_router(auth.router, prefix=API_PREFIX)
+    app.include_router(categories.router, prefix=API_PREFIX)
+    app.include_router(workers.router, prefix=API_PREFIX)
+    app.include_router(services.router, prefix=API_PREFIX)
+    app.include_router(orders.router, prefix=API_PREFIX)
+    app.include_router(chat.router, prefix=API_PREFIX)
+    app.include_router(favorites.router, prefix=API_PREFIX)
+    app.include_router(notifications.router, prefix=API_PREFIX)
+    app.include_router(realtime.router, prefix=API_PREFIX)
+    app.include_router(admin.router, prefix=API_PREFIX)
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": "Welcome to HelpMate API",
+            "version": "1.0.0",
+            "docs": "/docs",
+            "redoc": "/redoc"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    return app
+
+
+app = create_app()
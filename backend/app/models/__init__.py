@@ -1,11 +1,13 @@
 # Import all models in the correct order to avoid circular dependencies
 from .user import User, UserFavorite
-from .worker import Worker, WorkerOrder
+from .worker import Worker, WorkerOrder, WorkerWorkingHours
 from .category import Category
 from .service import Service
-from .order import Order, Review
+from .order import Order, Review, BookingHold, BookingLock
 from .chat import Chat, Message
-from .notification import Notification
+from .notification import Notification, BroadcastNotification
+from .outbox import OutboxEvent
+from .outbound_email import OutboundEmail
 
 # Export all models
 __all__ = [
@@ -13,11 +15,17 @@ __all__ = [
     "UserFavorite",
     "Worker", 
     "WorkerOrder",
+    "WorkerWorkingHours",
     "Category",
     "Service",
     "Order",
     "Review",
+    "BookingHold",
+    "BookingLock",
     "Chat",
     "Message",
-    "Notification"
+    "Notification",
+    "BroadcastNotification",
+    "OutboxEvent",
+    "OutboundEmail"
 ] 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -14,6 +14,16 @@ class Chat(Base):
     # Chat status
     is_active = Column(Boolean, default=True)
     
+    # Summary kept current by the message endpoints
+    last_message_id = Column(Integer)
+    last_message_at = Column(DateTime(timezone=True), default=func.now())  # creation time until the first message
+    user_unread_count = Column(Integer, nullable=False, default=0, server_default="0")  # worker messages the user has not read
+    worker_unread_count = Column(Integer, nullable=False, default=0, server_default="0")  # user messages the worker has not read
+    
+    # Read watermarks: each side has read every message from the other side up to this id
+    user_last_read_message_id = Column(Integer, nullable=False, default=0, server_default="0")
+    worker_last_read_message_id = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -22,6 +32,13 @@ class Chat(Base):
     user = relationship("User", back_populates="chats")
     worker = relationship("Worker", back_populates="chats")
     messages = relationship("Message", back_populates="chat", cascade="all, delete-orphan")
+    last_message = relationship("Message", primaryjoin="foreign(Chat.last_message_id) == Message.id", viewonly=True)
+    
+    __table_args__ = (
+        # Chat lists, most recent activity first
+        Index("ix_chats_user_id_is_active_last_message_at", "user_id", "is_active", "last_message_at"),
+        Index("ix_chats_worker_id_is_active_last_message_at", "worker_id", "is_active", "last_message_at"),
+    )
 
 
 class Message(Base):
@@ -34,10 +51,17 @@ class Message(Base):
     
     # Message content
     content = Column(Text, nullable=False)
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, default=False)  # legacy flag; read state now comes from the chat's read watermarks
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    chat = relationship("Chat", back_populates="messages") 
\ No newline at end of file
+    chat = relationship("Chat", back_populates="messages")
+    
+    __table_args__ = (
+        # Message history and last-message lookups
+        Index("ix_messages_chat_id_created_at", "chat_id", "created_at"),
+        # Unread counts are range counts past a read watermark
+        Index("ix_messages_chat_id_sender_type_id", "chat_id", "sender_type", "id"),
+    ) 
\ No newline at end of file
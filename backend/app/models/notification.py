@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, and_, event, or_, select, update
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.service import Service
+from app.models.user import User
+from app.models.worker import Worker
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -16,4 +19,92 @@ class Notification(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", backref="notifications", foreign_keys=[user_id])
-    worker = relationship("Worker", backref="notifications", foreign_keys=[worker_id]) 
\ No newline at end of file
+    worker = relationship("Worker", backref="notifications", foreign_keys=[worker_id])
+
+    # created_at comes back with the INSERT, so new rows can be pushed to sockets without a reload
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Each row belongs to either a user or a worker, so index only that side
+        Index(
+            "ix_notifications_user_id_created_at", "user_id", "created_at",
+            postgresql_where=(user_id != None), sqlite_where=(user_id != None),
+        ),
+        Index(
+            "ix_notifications_worker_id_created_at", "worker_id", "created_at",
+            postgresql_where=(worker_id != None), sqlite_where=(worker_id != None),
+        ),
+    ) 
+
+
+# Who a broadcast notification is for; category_workers are the workers offering a service in its category
+BROADCAST_AUDIENCES = ("users", "workers", "category_workers")
+
+
+class BroadcastNotification(Base):
+    """A notification for a whole audience, stored once and merged into each member's feed when read.
+
+    A member has read every broadcast up to their broadcasts_seen_up_to id;
+    broadcasts from before they signed up are not shown to them.
+    """
+    __tablename__ = "broadcast_notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    audience = Column(String, nullable=False)  # one of BROADCAST_AUDIENCES
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)  # for category_workers
+    type = Column(String, nullable=False)  # e.g., 'announcement', 'promo'
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    category = relationship("Category", foreign_keys=[category_id])
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        Index("ix_broadcast_notifications_audience_category_id_created_at", "audience", "category_id", "created_at"),
+    )
+
+
+def broadcast_audience(principal_type: str, principal_id: int):
+    """Condition on BroadcastNotification selecting the broadcasts addressed to one user or worker."""
+    model = User if principal_type == "user" else Worker
+    joined = BroadcastNotification.created_at >= select(model.created_at).where(model.id == principal_id).scalar_subquery()
+    if principal_type == "user":
+        return and_(BroadcastNotification.audience == "users", joined)
+    return and_(
+        or_(
+            BroadcastNotification.audience == "workers",
+            and_(
+                BroadcastNotification.audience == "category_workers",
+                BroadcastNotification.category_id.in_(
+                    select(Service.category_id).where(Service.worker_id == principal_id)
+                ),
+            ),
+        ),
+        joined,
+    )
+
+
+def adjust_unread_count(principal_type: str, principal_id: int, delta):
+    """UPDATE adding ``delta`` to a user's or worker's unread_notification_count.
+
+    updated_at is carried over as is: a new or read notification is not a
+    profile change.
+    """
+    table = (User if principal_type == "user" else Worker).__table__
+    return (
+        update(table).where(table.c.id == principal_id)
+        .values(unread_notification_count=table.c.unread_notification_count + delta, updated_at=table.c.updated_at)
+    )
+
+
+@event.listens_for(Notification, "after_insert")
+def count_unread_notification(mapper, connection, notification):
+    """Bump the owner's unread counter in the inserting transaction, wherever the notification was created."""
+    if notification.is_read:
+        return
+    if notification.user_id is not None:
+        connection.execute(adjust_unread_count("user", notification.user_id, 1))
+    elif notification.worker_id is not None:
+        connection.execute(adjust_unread_count("worker", notification.worker_id, 1))
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, ForeignKey
+from datetime import timedelta, timezone
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, ForeignKey, Index, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
+# Orders in these states occupy the worker's time slot
+ACTIVE_ORDER_STATUSES = ("pending", "accepted", "in_progress")
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -21,6 +25,7 @@ class Order(Base):
     
     # Scheduling
     scheduled_date = Column(DateTime)
+    scheduled_end = Column(DateTime)  # scheduled_date + hours, maintained on flush
     completed_date = Column(DateTime)
     
     # Timestamps
@@ -32,6 +37,36 @@ class Order(Base):
     worker = relationship("Worker", back_populates="orders_received")
     service = relationship("Service", back_populates="orders")
     review = relationship("Review", back_populates="order", uselist=False)
+    
+    __table_args__ = (
+        # Worker pending/completed lists and booking conflict checks
+        Index("ix_orders_worker_id_status_created_at", "worker_id", "status", "created_at"),
+        # User order history
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # Range index for overlap checks on Postgres (needs the btree_gist extension)
+        Index(
+            "ix_orders_worker_id_schedule",
+            "worker_id",
+            func.tsrange(scheduled_date, scheduled_end),
+            postgresql_using="gist",
+            postgresql_where=text(
+                "status IN ('pending', 'accepted', 'in_progress') AND scheduled_date IS NOT NULL"
+            ),
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+@event.listens_for(Order, "before_insert")
+@event.listens_for(Order, "before_update")
+def set_scheduled_end(mapper, connection, order):
+    """Keep scheduled_end in step with scheduled_date and hours."""
+    if order.scheduled_date is None:
+        order.scheduled_end = None
+        return
+    if order.scheduled_date.tzinfo is not None:
+        # The column is timezone-naive; store UTC
+        order.scheduled_date = order.scheduled_date.astimezone(timezone.utc).replace(tzinfo=None)
+    order.scheduled_end = order.scheduled_date + timedelta(hours=order.hours if order.hours is not None else 1)
 
 
 class Review(Base):
@@ -50,4 +85,34 @@ class Review(Base):
     # Relationships
     user = relationship("User", back_populates="reviews")
     worker = relationship("Worker", back_populates="reviews_received")
-    order = relationship("Order", back_populates="review") 
\ No newline at end of file
+    order = relationship("Order", back_populates="review")
+    
+    __table_args__ = (
+        Index("ix_reviews_worker_id", "worker_id"),
+        Index("ix_reviews_order_id", "order_id"),
+    ) 
+
+class BookingHold(Base):
+    """A slot a user is holding while they confirm the booking; void after expires_at."""
+    __tablename__ = "booking_holds"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    worker_id = Column(Integer, ForeignKey("workers.id"), nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    scheduled_date = Column(DateTime, nullable=False)
+    scheduled_end = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_booking_holds_worker_id_expires_at", "worker_id", "expires_at"),
+    )
+
+
+class BookingLock(Base):
+    """One row per worker; writing it serializes reservations on databases without advisory locks."""
+    __tablename__ = "booking_locks"
+    
+    worker_id = Column(Integer, ForeignKey("workers.id"), primary_key=True)
+    locked_at = Column(DateTime(timezone=True), server_default=func.now())
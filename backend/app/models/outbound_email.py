@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class OutboundEmail(Base):
+    """An email waiting to be sent by the email queue; deleted once the SMTP server accepts it.
+
+    Temporary failures are retried at ``available_at``; permanent rejections
+    and emails out of attempts stay behind with status 'dead'.
+    """
+    __tablename__ = "outbound_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text)  # plain-text alternative, sent alongside html_body
+    status = Column(String, nullable=False, default="pending")  # pending, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_outbound_emails_status_available_at", "status", "available_at"),
+    )
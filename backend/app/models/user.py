@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -20,6 +20,10 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     image = Column(String, nullable=True)  # Optional profile image URL or path
+    # Maintained on notification insert and mark-read, so badge counts skip the notifications table
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Broadcast notifications up to this id have been read
+    broadcasts_seen_up_to = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     orders = relationship("Order", back_populates="user")
@@ -39,6 +43,10 @@ class UserFavorite(Base):
     # Relationships
     user = relationship("User", back_populates="favorites")
     worker = relationship("Worker")
+    
+    __table_args__ = (
+        Index("ix_user_favorites_user_id_worker_id", "user_id", "worker_id"),
+    )
 
 
 class PasswordReset(Base):
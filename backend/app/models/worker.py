@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Time, Text, Float, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -14,6 +14,10 @@ class Worker(Base):
     phone_number = Column(String)
     address = Column(Text)
     image = Column(String, nullable=True)  # Optional profile image URL or path
+    # Maintained on notification insert and mark-read, so badge counts skip the notifications table
+    unread_notification_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Broadcast notifications up to this id have been read
+    broadcasts_seen_up_to = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Work Profile
     bio = Column(Text)
@@ -35,6 +39,24 @@ class Worker(Base):
     orders_placed = relationship("WorkerOrder", back_populates="worker")
     reviews_received = relationship("Review", back_populates="worker")
     chats = relationship("Chat", back_populates="worker")
+    working_hours = relationship("WorkerWorkingHours", back_populates="worker", cascade="all, delete-orphan")
+
+
+class WorkerWorkingHours(Base):
+    __tablename__ = "worker_working_hours"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    worker_id = Column(Integer, ForeignKey("workers.id"), nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    start_time = Column(Time, nullable=False)  # UTC, like scheduled_date
+    end_time = Column(Time, nullable=False)
+    
+    # Relationships
+    worker = relationship("Worker", back_populates="working_hours")
+    
+    __table_args__ = (
+        Index("ix_worker_working_hours_worker_id", "worker_id"),
+    )
 
 
 class WorkerOrder(Base):
@@ -1,14 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.models.user import User
 from app.models.worker import Worker
 from app.models.category import Category
-from app.models.order import Order
+from app.models.order import ACTIVE_ORDER_STATUSES, Order
+from app.models.notification import BROADCAST_AUDIENCES, BroadcastNotification
 from app.schemas.category import CategoryCreate, CategoryResponse
+from app.schemas.notification import BroadcastCreate, BroadcastResponse
 from app.routers.auth import get_current_user
+from app.core.principal_cache import principal_cache
+from app.core.security import password_hasher
+from app.core.db_pool import pool_metrics
+from app.services.booking_index import booking_index
+from app.services.availability import availability_cache
+from app.services.slot_index import slot_index
+from app.services.chat_writer import chat_writer
+from app.services.connections import connection_hub
+from app.services.email_queue import email_queue
+from app.services.outbox import order_event, outbox_dispatcher
+from app.services.realtime import realtime_events
+from app.services.reservations import lock_worker_schedule, slot_is_taken
 from app.models.service import Service
-import asyncio
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -44,6 +59,7 @@ def activate_user(user_id: int, active: bool, db: Session = Depends(get_db), cur
         raise HTTPException(status_code=404, detail="User not found")
     user.is_active = active
     db.commit()
+    principal_cache.invalidate("user", user_id)
     return {"success": True, "user_id": user_id, "is_active": user.is_active}
 
 # Activate/Deactivate Worker
@@ -54,46 +70,60 @@ def activate_worker(worker_id: int, active: bool, db: Session = Depends(get_db),
         raise HTTPException(status_code=404, detail="Worker not found")
     worker.is_active = active
     db.commit()
+    principal_cache.invalidate("worker", worker_id)
     return {"success": True, "worker_id": worker_id, "is_active": worker.is_active}
 
 # Change Order Status
 @router.put("/orders/{order_id}/status")
-def change_order_status(order_id: int, status: str, db: Session = Depends(get_db), current_user: User = Depends(admin_required), background_tasks: BackgroundTasks = None):
-    order = db.query(Order).filter(Order.id == order_id).first()
+async def change_order_status(order_id: int, status: str, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(admin_required)):
+    order = await db.get(Order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     if status not in ["pending", "completed", "cancelled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
+    # Reactivating a booking must not overlap one made after it was cancelled or completed
+    if status in ACTIVE_ORDER_STATUSES and order.status not in ACTIVE_ORDER_STATUSES and order.scheduled_date:
+        end_time = order.scheduled_date + timedelta(hours=order.hours or 1)
+        await lock_worker_schedule(db, order.worker_id)
+        if await slot_is_taken(db, order.worker_id, order.scheduled_date, end_time,
+                               user_id=order.user_id, exclude_order_id=order.id):
+            await db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail="The worker is already booked at this time; the order cannot be reactivated."
+            )
     status_was_completed = order.status == "completed"
     order.status = status
-    db.commit()
-    # If status changed to completed, send notification
+    # If status changed to completed, notify both sides (via the outbox) in the same commit
     if not status_was_completed and order.status == "completed":
-        from app.models.notification import Notification
-        user_notif = Notification(
-            user_id=order.user_id,
-            type="order_completed",
-            title="Order Completed",
-            message=f"Your order (ID: {order.id}) has been marked as completed. Description: {order.description}"
-        )
-        worker_notif = Notification(
-            worker_id=order.worker_id,
-            type="order_completed",
-            title="Order Completed",
-            message=f"Your order (ID: {order.id}) has been marked as completed. Description: {order.description}"
-        )
-        db.add(user_notif)
-        db.add(worker_notif)
-        db.commit()
-        if background_tasks is not None:
-            from app.services.email_service import email_service
-            user = db.query(User).filter(User.id == order.user_id).first()
-            worker = db.query(Worker).filter(Worker.id == order.worker_id).first()
-            background_tasks.add_task(
-                lambda: asyncio.run(email_service.send_order_completed_email(user, worker, order))
-            )
+        db.add(order_event("order_completed", order))
+    await db.commit()
     return {"success": True, "order_id": order_id, "status": order.status}
 
+# Announce to a whole audience
+@router.post("/broadcasts", response_model=BroadcastResponse)
+def create_broadcast(
+    broadcast: BroadcastCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_required),
+):
+    """One row for everyone in the audience; members see it merged into their notification feed"""
+    if broadcast.audience not in BROADCAST_AUDIENCES:
+        raise HTTPException(status_code=400, detail=f"Audience must be one of: {', '.join(BROADCAST_AUDIENCES)}")
+    category_id = broadcast.category_id if broadcast.audience == "category_workers" else None
+    if broadcast.audience == "category_workers" and (category_id is None or db.get(Category, category_id) is None):
+        raise HTTPException(status_code=404, detail="Category not found")
+    db_broadcast = BroadcastNotification(
+        audience=broadcast.audience,
+        category_id=category_id,
+        type=broadcast.type,
+        title=broadcast.title,
+        message=broadcast.message,
+    )
+    db.add(db_broadcast)
+    db.commit()
+    return db_broadcast
+
 # List all users
 @router.get("/users")
 def list_users(db: Session = Depends(get_db), current_user: User = Depends(admin_required)):
@@ -141,4 +171,21 @@ def list_orders(db: Session = Depends(get_db), current_user: User = Depends(admi
 @router.get("/categories")
 def list_categories(db: Session = Depends(get_db), current_user: User = Depends(admin_required)):
     categories = db.query(Category).all()
-    return categories 
\ No newline at end of file
+    return categories
+
+# Runtime metrics
+@router.get("/metrics")
+def get_metrics(current_user: User = Depends(admin_required)):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "booking_index": booking_index.stats(),
+        "availability_cache": availability_cache.stats(),
+        "slot_index": slot_index.stats(),
+        "websockets": connection_hub.stats(),
+        "chat_writer": chat_writer.stats(),
+        "outbox": outbox_dispatcher.stats(),
+        "email_queue": email_queue.stats(),
+        "realtime_events": realtime_events.stats(),
+        "database_pools": pool_metrics.stats(),
+    }
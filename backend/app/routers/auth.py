@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, verify_token
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
+from app.core.security import password_hasher, create_access_token, verify_token
+from app.core.principal_cache import principal_cache
 from app.models.user import User, PasswordReset, EmailVerificationToken
 from app.models.worker import Worker
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token, UserUpdate, ChangePasswordRequest as UserChangePasswordRequest, ForgotPasswordRequest as UserForgotPasswordRequest, ResetPasswordRequest as UserResetPasswordRequest
 from app.schemas.worker import WorkerCreate, WorkerLogin, WorkerResponse, WorkerUpdate, ChangePasswordRequest as WorkerChangePasswordRequest, ForgotPasswordRequest as WorkerForgotPasswordRequest, ResetPasswordRequest as WorkerResetPasswordRequest
 from app.services.worker_service import WorkerService
 from app.services.email_service import email_service
+from app.services.framing import decode_message
 import os
 import asyncio
 
@@ -31,78 +35,97 @@ def get_public_image_url(image_path: str, request: Request) -> str:
 
 
 @router.post("/register/user", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db), background_tasks: BackgroundTasks = None):
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
-    # Check if email already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # Hash before touching the database so no connection is held while bcrypt runs
+    hashed_password = await password_hasher.hash(user.password)
     
-    # Create new user
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        full_name=user.full_name,
-        hashed_password=hashed_password,
-        phone_number=user.phone_number,
-        address=user.address,
-        is_verified=False,
-        is_active=False
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    # Create verification token and send email
-    token_record = email_service.create_verification_token(db, db_user.id, "user")
-    if background_tasks is not None:
-        background_tasks.add_task(
-            lambda: asyncio.run(email_service.send_verification_email(db_user.email, token_record.token, "user"))
-        )
-    return db_user
+    # Blocking writes run off the event loop, where they could wait on the
+    # outbox and email queue transactions they would stall (SQLite locks)
+    def create():
+        # Check if email already exists
+        db_user = db.query(User).filter(User.email == user.email).first()
+        if db_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+    
+        # Create new user
+        db_user = User(
+            email=user.email,
+            full_name=user.full_name,
+            hashed_password=hashed_password,
+            phone_number=user.phone_number,
+            address=user.address,
+            is_verified=False,
+            is_active=False
+        )
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        # Create verification token and send email
+        token_record = email_service.create_verification_token(db, db_user.id, "user")
+        email_service.queue_verification_email(db, db_user.email, token_record.token, "user")
+        db.commit()
+        return db_user
+
+    return await run_in_threadpool(create)
 
 
 @router.post("/register/worker", response_model=WorkerResponse)
-def register_worker(worker: WorkerCreate, db: Session = Depends(get_db), background_tasks: BackgroundTasks = None):
+async def register_worker(worker: WorkerCreate, db: Session = Depends(get_db)):
     """Register a new worker with automatic service creation. Now supports category_id for direct category selection."""
-    # Check if email already exists
-    db_worker = db.query(Worker).filter(Worker.email == worker.email).first()
-    if db_worker:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+    # Hash before touching the database so no connection is held while bcrypt runs
+    hashed_password = await password_hasher.hash(worker.password)
     
-    # Create worker with services using the service
-    worker_data = worker.dict()
-    worker_data['hashed_password'] = get_password_hash(worker.password)
-    worker_data['is_verified'] = False
-    worker_data['is_active'] = False
+    # Blocking writes run off the event loop, where they could wait on the
+    # outbox and email queue transactions they would stall (SQLite locks)
+    def create():
+        # Check if email already exists
+        db_worker = db.query(Worker).filter(Worker.email == worker.email).first()
+        if db_worker:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
     
-    try:
-        db_worker = WorkerService.create_worker_with_services(db, worker_data)
-        # Create verification token and send email
-        token_record = email_service.create_verification_token(db, db_worker.id, "worker")
-        if background_tasks is not None:
-            background_tasks.add_task(
-                lambda: asyncio.run(email_service.send_verification_email(db_worker.email, token_record.token, "worker"))
+        # Create worker with services using the service
+        worker_data = worker.dict()
+        worker_data['hashed_password'] = hashed_password
+        worker_data['is_verified'] = False
+        worker_data['is_active'] = False
+    
+        try:
+            db_worker = WorkerService.create_worker_with_services(db, worker_data)
+            # Create verification token and send email
+            token_record = email_service.create_verification_token(db, db_worker.id, "worker")
+            email_service.queue_verification_email(db, db_worker.email, token_record.token, "worker")
+            db.commit()
+            return db_worker
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error creating worker: {str(e)}"
             )
-        return db_worker
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating worker: {str(e)}"
-        )
+
+    return await run_in_threadpool(create)
 
 
 @router.post("/login/user", response_model=Token)
-def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Login for users"""
-    user = db.query(User).filter(User.email == user_credentials.email).first()
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    # The blocking lookup runs in the threadpool; only the hash check is awaited on the loop
+    def lookup():
+        try:
+            return db.query(User).filter(User.email == user_credentials.email).first()
+        finally:
+            # Return the connection to the pool while bcrypt runs
+            db.close()
+
+    user = await run_in_threadpool(lookup)
+    if not user or not await password_hasher.verify(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -137,10 +160,18 @@ def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/login/worker", response_model=Token)
-def login_worker(worker_credentials: WorkerLogin, db: Session = Depends(get_db)):
+async def login_worker(worker_credentials: WorkerLogin, db: Session = Depends(get_db)):
     """Login for workers"""
-    worker = db.query(Worker).filter(Worker.email == worker_credentials.email).first()
-    if not worker or not verify_password(worker_credentials.password, worker.hashed_password):
+    # The blocking lookup runs in the threadpool; only the hash check is awaited on the loop
+    def lookup():
+        try:
+            return db.query(Worker).filter(Worker.email == worker_credentials.email).first()
+        finally:
+            # Return the connection to the pool while bcrypt runs
+            db.close()
+
+    worker = await run_in_threadpool(lookup)
+    if not worker or not await password_hasher.verify(worker_credentials.password, worker.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -174,7 +205,7 @@ def login_worker(worker_credentials: WorkerLogin, db: Session = Depends(get_db))
 
 
 @router.post("/forgot-password/user")
-async def forgot_password_user(request: UserForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password_user(request: UserForgotPasswordRequest, db: Session = Depends(get_db)):
     """Send password reset email for user"""
     # Check if user exists
     user = db.query(User).filter(User.email == request.email).first()
@@ -192,20 +223,10 @@ async def forgot_password_user(request: UserForgotPasswordRequest, db: Session =
         # Create reset record
         reset_record = email_service.create_reset_record(db, request.email, "user")
         
-        # Send email
-        email_sent = await email_service.send_reset_email(
-            request.email, 
-            reset_record.reset_code, 
-            "user"
-        )
-        
-        if email_sent:
-            return {"message": "Password reset code sent to your email."}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send reset email"
-            )
+        # Queue email
+        email_service.queue_reset_email(db, request.email, reset_record.reset_code, "user")
+        db.commit()
+        return {"message": "Password reset code sent to your email."}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -214,7 +235,7 @@ async def forgot_password_user(request: UserForgotPasswordRequest, db: Session =
 
 
 @router.post("/forgot-password/worker")
-async def forgot_password_worker(request: WorkerForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password_worker(request: WorkerForgotPasswordRequest, db: Session = Depends(get_db)):
     """Send password reset email for worker"""
     # Check if worker exists
     worker = db.query(Worker).filter(Worker.email == request.email).first()
@@ -232,20 +253,10 @@ async def forgot_password_worker(request: WorkerForgotPasswordRequest, db: Sessi
         # Create reset record
         reset_record = email_service.create_reset_record(db, request.email, "worker")
         
-        # Send email
-        email_sent = await email_service.send_reset_email(
-            request.email, 
-            reset_record.reset_code, 
-            "worker"
-        )
-        
-        if email_sent:
-            return {"message": "Password reset code sent to your email."}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send reset email"
-            )
+        # Queue email
+        email_service.queue_reset_email(db, request.email, reset_record.reset_code, "worker")
+        db.commit()
+        return {"message": "Password reset code sent to your email."}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -275,14 +286,16 @@ async def reset_password_user(request: UserResetPasswordRequest, db: Session = D
             detail="User not found"
         )
     
+    hashed_password = await password_hasher.hash(request.new_password)
     try:
         # Update password
-        user.hashed_password = get_password_hash(request.new_password)
+        user.hashed_password = hashed_password
         
         # Mark reset code as used
         email_service.mark_reset_code_used(db, reset_record)
         
         db.commit()
+        principal_cache.invalidate("user", user.id)
         
         return {"message": "Password reset successfully"}
     except Exception as e:
@@ -315,14 +328,16 @@ async def reset_password_worker(request: WorkerResetPasswordRequest, db: Session
             detail="Worker not found"
         )
     
+    hashed_password = await password_hasher.hash(request.new_password)
     try:
         # Update password
-        worker.hashed_password = get_password_hash(request.new_password)
+        worker.hashed_password = hashed_password
         
         # Mark reset code as used
         email_service.mark_reset_code_used(db, reset_record)
         
         db.commit()
+        principal_cache.invalidate("worker", worker.id)
         
         return {"message": "Password reset successfully"}
     except Exception as e:
@@ -335,34 +350,101 @@ async def reset_password_worker(request: WorkerResetPasswordRequest, db: Session
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Get current authenticated user"""
+    return resolve_principal(token, db)
+
+
+def resolve_principal(token: str, db: Session):
+    """The User or Worker a bearer token belongs to, bound to ``db``; raises 401 otherwise"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = verify_token(token)
+    payload = principal_cache.get_claims(token)
     if payload is None:
-        raise credentials_exception
+        payload = verify_token(token)
+        if payload is None:
+            raise credentials_exception
+        principal_cache.set_claims(token, payload)
     
     email: str = payload.get("sub")
     user_type: str = payload.get("user_type")
+    user_id: int = payload.get("user_id")
     
     if email is None or user_type is None:
         raise credentials_exception
     
     if user_type == "user":
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
-            raise credentials_exception
-        return user
+        model = User
     elif user_type == "worker":
-        worker = db.query(Worker).filter(Worker.email == email).first()
-        if worker is None:
-            raise credentials_exception
-        return worker
+        model = Worker
     else:
         raise credentials_exception
+    
+    principal = None
+    if user_id is not None:
+        principal = principal_cache.get_principal(db, model, user_type, user_id)
+    if principal is None:
+        # Use a short-lived session so the pooled connection goes back before
+        # the (async) handler runs; holding it across awaits can exhaust the pool
+        with SessionLocal() as lookup_db:
+            principal = lookup_db.query(model).filter(model.email == email).first()
+            if principal is None:
+                raise credentials_exception
+            principal_cache.set_principal(user_type, principal, payload)
+        principal = db.merge(principal, load=False)
+    elif principal.email != email:
+        raise credentials_exception
+    return principal
+
+
+async def authenticate_socket(websocket: WebSocket):
+    """The User or Worker behind a WebSocket: ?token= or a first {"type": "auth", "token": ...} frame (JSON or MessagePack)"""
+    token = websocket.query_params.get("token")
+    if token is None:
+        try:
+            message = await asyncio.wait_for(websocket.receive(), timeout=settings.websocket_auth_timeout_seconds)
+        except asyncio.TimeoutError:
+            return None
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        frame = decode_message(message)
+        if frame is not None and frame.get("type") == "auth":
+            token = frame.get("token")
+    if not isinstance(token, str):
+        return None
+    return await lookup_principal(token)
+
+
+async def lookup_principal(token: str):
+    """The User or Worker a token belongs to, or None, resolved on a short-lived session.
+
+    For long-lived connections, which must not hold a request-scoped
+    session (and its pooled connection) open while they stream.
+    """
+    def lookup():
+        with SessionLocal() as db:
+            try:
+                return resolve_principal(token, db)
+            except HTTPException:
+                return None
+
+    return await run_in_threadpool(lookup)
+
+
+async def get_stream_principal(request: Request):
+    """Current user for event streams: a bearer header or ?token=, since EventSource cannot send headers"""
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    token = credentials if scheme.lower() == "bearer" and credentials else request.query_params.get("token")
+    principal = await lookup_principal(token) if token else None
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
 
 @router.get("/user/profile", response_model=UserResponse)
@@ -396,6 +478,7 @@ async def update_user_profile(
     for field, value in user_update.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
     db.commit()
+    principal_cache.invalidate("user", current_user.id)
     db.refresh(current_user)
     # Patch image field to public URL
     user_dict = current_user.__dict__.copy()
@@ -447,6 +530,7 @@ async def update_worker_profile(
     for field, value in worker_update.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
     db.commit()
+    principal_cache.invalidate("worker", current_user.id)
     db.refresh(current_user)
     worker_dict = current_user.__dict__.copy()
     worker_dict["image"] = get_public_image_url(current_user.image, request) if current_user.image else None
@@ -482,14 +566,15 @@ async def change_user_password(
             detail="Only users can access this endpoint"
         )
     
-    if not verify_password(data.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
-    current_user.hashed_password = get_password_hash(data.new_password)
+    current_user.hashed_password = await password_hasher.hash(data.new_password)
     db.commit()
+    principal_cache.invalidate("user", current_user.id)
     
     return {"message": "Password changed successfully"}
 
@@ -507,14 +592,15 @@ async def change_worker_password(
             detail="Only workers can access this endpoint"
         )
     
-    if not verify_password(data.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
-    current_user.hashed_password = get_password_hash(data.new_password)
+    current_user.hashed_password = await password_hasher.hash(data.new_password)
     db.commit()
+    principal_cache.invalidate("worker", current_user.id)
     
     return {"message": "Password changed successfully"} 
 
@@ -530,6 +616,7 @@ def verify_email(token: str, db: Session = Depends(get_db)):
             user.is_active = True
             email_service.mark_verification_token_used(db, record)
             db.commit()
+            principal_cache.invalidate("user", user.id)
             return {"message": "Email verified successfully. You can now log in."}
     # Try worker
     record = email_service.verify_email_token(db, token, "worker")
@@ -541,6 +628,7 @@ def verify_email(token: str, db: Session = Depends(get_db)):
             worker.is_active = True
             email_service.mark_verification_token_used(db, record)
             db.commit()
+            principal_cache.invalidate("worker", worker.id)
             return {"message": "Email verified successfully. You can now log in."}
     raise HTTPException(status_code=400, detail="Invalid or expired verification token.") 
 
@@ -1,51 +1,254 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
-from typing import List, Dict, Set
-from app.core.database import get_db
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.pagination import Page
 from app.models.chat import Chat, Message
 from app.models.user import User
 from app.models.worker import Worker
-from app.schemas.chat import ChatCreate, ChatResponse, MessageCreate, MessageResponse, ChatListResponse
-from app.routers.auth import get_current_user
+from app.schemas.chat import ChatCreate, ChatResponse, MessageCreate, MessageResponse, ChatListResponse, ChatReadRequest, ChatReadState
+from app.routers.auth import authenticate_socket, get_current_user
+from app.services.chat_writer import chat_writer
+from app.services.connections import Connection, connection_hub
+from app.services.framing import MSGPACK_SUBPROTOCOL
+from app.services.realtime import publish_chat_event, publish_chat_message
 import asyncio
+import functools
+import json
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# In-memory mapping of chat_id to set of WebSocket connections
-active_connections: Dict[int, Set[WebSocket]] = {}
+# Reply to a client's {"type": "ping"} heartbeat
+PONG_FRAME = json.dumps({"type": "pong"})
 
-async def broadcast_message(chat_id: int, message: dict):
-    connections = active_connections.get(chat_id, set())
-    to_remove = set()
-    for ws in connections:
-        try:
-            await ws.send_json(message)
-        except Exception:
-            to_remove.add(ws)
-    for ws in to_remove:
-        connections.discard(ws)
+
+def _chat_options():
+    """Eager loads needed to serialize a ChatResponse without lazy loading."""
+    return (
+        joinedload(Chat.user),
+        joinedload(Chat.worker),
+        selectinload(Chat.messages),
+    )
+
+
+async def _load_chat(db: AsyncSession, chat_id: int) -> Chat:
+    result = await db.execute(
+        select(Chat).options(*_chat_options()).filter(Chat.id == chat_id)
+        .execution_options(populate_existing=True)
+    )
+    chat = result.scalars().first()
+    if chat is not None:
+        _apply_read_state(chat, chat.messages)
+    return chat
+
+
+def _chat_list_options():
+    """Eager loads for chat list entries, all joined into the list query."""
+    return (
+        joinedload(Chat.user),
+        joinedload(Chat.worker),
+        joinedload(Chat.last_message),
+    )
+
+
+def _apply_read_state(chat: Chat, messages) -> None:
+    """Set each message's is_read from the recipient's read watermark, without writing it."""
+    for message in messages:
+        if message is None or message.is_read:
+            continue
+        if message.sender_type == "user":
+            watermark = chat.worker_last_read_message_id
+        else:
+            watermark = chat.user_last_read_message_id
+        if message.id <= watermark:
+            set_committed_value(message, "is_read", True)
+
+
+def _build_chat_list(chats: List[Chat], reader: str) -> List[ChatListResponse]:
+    """Chat list entries from the summary columns kept on each chat (``reader`` is "user" or "worker")."""
+    for chat in chats:
+        _apply_read_state(chat, [chat.last_message])
+    return [
+        ChatListResponse(
+            id=chat.id,
+            user_id=chat.user_id,
+            worker_id=chat.worker_id,
+            is_active=chat.is_active,
+            created_at=chat.created_at,
+            updated_at=chat.updated_at,
+            user=chat.user,
+            worker=chat.worker,
+            last_message=chat.last_message,
+            unread_count=chat.user_unread_count if reader == "user" else chat.worker_unread_count
+        )
+        for chat in chats
+    ]
+
+
+async def _add_message(db: AsyncSession, chat_id: int, sender_type: str, sender_id: int, content: str) -> Message:
+    """Insert a message and update the chat summary in the same transaction; the caller commits."""
+    db_message = Message(
+        chat_id=chat_id,
+        sender_type=sender_type,
+        sender_id=sender_id,
+        content=content
+    )
+    db.add(db_message)
+    await db.flush()
+    # Counted in SQL so concurrent senders cannot lose increments
+    values = {"last_message_id": db_message.id, "last_message_at": func.now()}
+    if sender_type == "user":
+        values["worker_unread_count"] = Chat.worker_unread_count + 1
+    else:
+        values["user_unread_count"] = Chat.user_unread_count + 1
+    await db.execute(
+        update(Chat).where(Chat.id == chat_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return db_message
+
+async def _mark_read(db: AsyncSession, chat: Chat, reader: str, up_to_message_id: int) -> ChatReadState:
+    """Move ``reader``'s read watermark up to a message and recount their unread messages; the caller commits.
+
+    The watermark never moves back or past the chat's last message. Unread
+    counts become an index range count over the messages after it.
+    """
+    sender = "worker" if reader == "user" else "user"
+    watermark_column = getattr(Chat, f"{reader}_last_read_message_id")
+    unread_column = getattr(Chat, f"{reader}_unread_count")
+    watermark = max(getattr(chat, watermark_column.key), min(up_to_message_id, chat.last_message_id or 0))
+    if watermark > getattr(chat, watermark_column.key):
+        unread = select(func.count()).where(
+            Message.chat_id == chat.id,
+            Message.sender_type == sender,
+            Message.id > watermark,
+        ).scalar_subquery()
+        await db.execute(
+            update(Chat).where(Chat.id == chat.id, watermark_column < watermark)
+            .values({watermark_column: watermark, unread_column: unread})
+            .execution_options(synchronize_session=False)
+        )
+    unread_count = (await db.execute(select(unread_column).where(Chat.id == chat.id))).scalar()
+    return ChatReadState(chat_id=chat.id, reader=reader, last_read_message_id=watermark, unread_count=unread_count)
+
+async def _broadcast_read(chat: Chat, state: ChatReadState):
+    """Tell the chat's and both participants' sockets how far one side has read."""
+    await publish_chat_event(chat.id, chat.user_id, chat.worker_id, {
+        "type": "read", "chat_id": state.chat_id, "reader": state.reader,
+        "last_read_message_id": state.last_read_message_id,
+    })
+
+def chat_side(chat: Chat, principal) -> Optional[str]:
+    """ "user" or "worker" if ``principal`` takes part in ``chat``, else None"""
+    if isinstance(principal, User) and chat.user_id == principal.id:
+        return "user"
+    if isinstance(principal, Worker) and chat.worker_id == principal.id:
+        return "worker"
+    return None
+
+def error_frame(client_id, detail: str) -> str:
+    return json.dumps({"type": "error", "client_id": client_id, "detail": detail})
+
+def _send_ack(connection: Connection, client_id, saved: asyncio.Future):
+    """Ack a socket-sent message with the MessageResponse it was saved as."""
+    if saved.cancelled():
+        return
+    if saved.exception() is not None:
+        connection.offer(error_frame(client_id, "Message could not be saved"))
+        return
+    connection.offer(f'{{"type": "ack", "client_id": {json.dumps(client_id)}, "message": {saved.result()}}}')
+
+async def handle_chat_frame(connection: Connection, chat: Chat, sender_type: str, sender_id: int, frame: dict):
+    """Act on a frame a chat participant sent over a socket.
+
+    {"type": "message", "content": ..., "client_id": ...} is queued for the
+    next group commit and acked once saved; {"type": "read",
+    "up_to_message_id": ...} moves the sender's read watermark.
+    """
+    client_id = frame.get("client_id")
+    if frame.get("type") == "message" and isinstance(frame.get("content"), str):
+        saved = await chat_writer.submit(chat, sender_type, sender_id, frame["content"])
+        saved.add_done_callback(functools.partial(_send_ack, connection, client_id))
+    elif frame.get("type") == "read" and isinstance(frame.get("up_to_message_id"), int):
+        async with AsyncSessionLocal() as db:
+            current = await db.get(Chat, chat.id)
+            if current is None:
+                # Deleted while the socket was open
+                connection.offer(error_frame(client_id, "Chat not found"))
+                return
+            state = await _mark_read(db, current, sender_type, frame["up_to_message_id"])
+            await db.commit()
+        await _broadcast_read(current, state)
+    else:
+        connection.offer(error_frame(client_id, "Invalid message frame"))
+
+async def accept_socket(websocket: WebSocket) -> bool:
+    """Accept a socket, with MessagePack framing if the client offered it; True if it did."""
+    packed = MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if packed else None)
+    return packed
+
+async def iter_frames(connection: Connection):
+    """Each client frame as a dict (None if it is not a JSON or MessagePack object), until the client disconnects.
+
+    Application heartbeats, {"type": "ping"}, are answered with {"type": "pong"} here.
+    """
+    try:
+        while True:
+            frame = await connection.receive_frame()
+            if frame is not None and frame.get("type") == "ping":
+                connection.offer(PONG_FRAME)
+            else:
+                yield frame
+    except WebSocketDisconnect:
+        return
+
+async def _receive_chat_frames(connection: Connection, chat: Chat, sender_type: str, sender_id: int):
+    async for frame in iter_frames(connection):
+        if frame is None:
+            connection.offer(error_frame(None, "Invalid message frame"))
+            continue
+        await handle_chat_frame(connection, chat, sender_type, sender_id, frame)
 
 @router.websocket("/ws/chat/{chat_id}")
 async def websocket_chat(websocket: WebSocket, chat_id: int):
-    await websocket.accept()
-    if chat_id not in active_connections:
-        active_connections[chat_id] = set()
-    active_connections[chat_id].add(websocket)
+    """Chat events for participants, who can also send messages over the socket.
+
+    Frames are JSON unless the client offers the helpmate.msgpack.v1
+    subprotocol, which switches them to MessagePack with short keys and
+    integer epoch timestamps (see app/services/framing.py).
+    """
+    packed = await accept_socket(websocket)
     try:
-        while True:
-            data = await websocket.receive_text()  # Just keep alive, no direct send from client
-            await asyncio.sleep(0.1)
+        principal = await authenticate_socket(websocket)
     except WebSocketDisconnect:
-        active_connections[chat_id].discard(websocket)
-        if not active_connections[chat_id]:
-            del active_connections[chat_id]
+        return
+    if principal is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+    async with AsyncSessionLocal() as db:
+        chat = await db.get(Chat, chat_id)
+    sender_type = chat_side(chat, principal) if chat is not None else None
+    if sender_type is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Chat not found")
+        return
+
+    connection = connection_hub.connect(websocket, packed)
+    connection_hub.subscribe(connection, f"chat:{chat_id}")
+    try:
+        await connection.serve(_receive_chat_frames(connection, chat, sender_type, principal.id))
+    finally:
+        connection_hub.remove(connection)
 
 
 @router.post("/", response_model=ChatResponse)
 async def create_chat(
     chat: ChatCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new chat between user and worker"""
     # Verify the user is creating the chat
@@ -56,7 +259,7 @@ async def create_chat(
         )
     
     # Check if worker exists
-    worker = db.query(Worker).filter(Worker.id == chat.worker_id).first()
+    worker = await db.get(Worker, chat.worker_id)
     if not worker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,13 +267,16 @@ async def create_chat(
         )
     
     # Check if chat already exists
-    existing_chat = db.query(Chat).filter(
-        Chat.user_id == current_user.id,
-        Chat.worker_id == chat.worker_id,
-        Chat.is_active == True
-    ).first()
+    existing_chat = (await db.execute(
+        select(Chat).options(*_chat_options()).filter(
+            Chat.user_id == current_user.id,
+            Chat.worker_id == chat.worker_id,
+            Chat.is_active == True
+        )
+    )).scalars().first()
     
     if existing_chat:
+        _apply_read_state(existing_chat, existing_chat.messages)
         return existing_chat
     
     # Create new chat
@@ -79,64 +285,40 @@ async def create_chat(
         worker_id=chat.worker_id
     )
     db.add(db_chat)
-    db.commit()
-    db.refresh(db_chat)
-    return db_chat
+    await db.commit()
+    return await _load_chat(db, db_chat.id)
 
 
 @router.get("/", response_model=List[ChatListResponse])
 async def get_user_chats(
+    page: Page = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all chats for the current user"""
+    """Get the current user's chats, most recent activity first"""
     if not isinstance(current_user, User):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only users can access chats"
         )
     
-    chats = db.query(Chat).filter(
-        Chat.user_id == current_user.id,
-        Chat.is_active == True
-    ).all()
+    chats = page.finish((await db.execute(page.apply(
+        select(Chat).options(*_chat_list_options()).filter(
+            Chat.user_id == current_user.id,
+            Chat.is_active == True
+        ),
+        Chat,
+        column=Chat.last_message_at,
+    ))).scalars())
     
-    result = []
-    for chat in chats:
-        # Get last message
-        last_message = db.query(Message).filter(
-            Message.chat_id == chat.id
-        ).order_by(Message.created_at.desc()).first()
-        
-        # Get unread count
-        unread_count = db.query(Message).filter(
-            Message.chat_id == chat.id,
-            Message.sender_type == "worker",
-            Message.is_read == False
-        ).count()
-        
-        chat_data = ChatListResponse(
-            id=chat.id,
-            user_id=chat.user_id,
-            worker_id=chat.worker_id,
-            is_active=chat.is_active,
-            created_at=chat.created_at,
-            updated_at=chat.updated_at,
-            user=chat.user,
-            worker=chat.worker,
-            last_message=last_message,
-            unread_count=unread_count
-        )
-        result.append(chat_data)
-    
-    return result
+    return _build_chat_list(chats, "user")
 
 
 @router.get("/{chat_id}", response_model=ChatResponse)
 async def get_chat(
     chat_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific chat with messages"""
     if not isinstance(current_user, User):
@@ -145,10 +327,12 @@ async def get_chat(
             detail="Only users can access chats"
         )
     
-    chat = db.query(Chat).filter(
-        Chat.id == chat_id,
-        Chat.user_id == current_user.id
-    ).first()
+    chat = (await db.execute(
+        select(Chat).options(*_chat_options()).filter(
+            Chat.id == chat_id,
+            Chat.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not chat:
         raise HTTPException(
@@ -156,6 +340,7 @@ async def get_chat(
             detail="Chat not found"
         )
     
+    _apply_read_state(chat, chat.messages)
     return chat
 
 
@@ -164,7 +349,7 @@ async def send_message(
     chat_id: int,
     message: MessageCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message in a chat"""
     if not isinstance(current_user, User):
@@ -174,10 +359,12 @@ async def send_message(
         )
     
     # Check if chat exists and user has access
-    chat = db.query(Chat).filter(
-        Chat.id == chat_id,
-        Chat.user_id == current_user.id
-    ).first()
+    chat = (await db.execute(
+        select(Chat).filter(
+            Chat.id == chat_id,
+            Chat.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not chat:
         raise HTTPException(
@@ -186,29 +373,24 @@ async def send_message(
         )
     
     # Create message
-    db_message = Message(
-        chat_id=chat_id,
-        sender_type="user",
-        sender_id=current_user.id,
-        content=message.content
-    )
-    db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    db_message = await _add_message(db, chat_id, "user", current_user.id, message.content)
+    await db.commit()
+    await db.refresh(db_message)
     # Broadcast to WebSocket
-    await broadcast_message(chat_id, MessageResponse.from_orm(db_message).dict())
+    await publish_chat_message(chat.id, chat.user_id, chat.worker_id, MessageResponse.from_orm(db_message).json())
     return db_message
 
 
 @router.get("/{chat_id}/messages", response_model=List[MessageResponse])
 async def get_chat_messages(
     chat_id: int,
+    page: Page = Depends(),
     current_user = Depends(get_current_user),  # Can be User or Worker
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all messages in a chat"""
+    """Get a chat's messages: the latest page first, each page in chronological order"""
     # Find the chat
-    chat = db.query(Chat).filter(Chat.id == chat_id).first()
+    chat = await db.get(Chat, chat_id)
     if not chat:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -228,60 +410,41 @@ async def get_chat_messages(
             detail="You do not have access to this chat's messages"
         )
 
-    messages = db.query(Message).filter(
-        Message.chat_id == chat_id
-    ).order_by(Message.created_at.asc()).all()
+    messages = page.finish((await db.execute(page.apply(
+        select(Message).filter(
+            Message.chat_id == chat_id
+        ),
+        Message,
+    ))).scalars())
+    _apply_read_state(chat, messages)
 
-    return messages
+    return messages[::-1]
 
 
 # Worker endpoints for chat
 @router.get("/worker/chats", response_model=List[ChatListResponse])
 async def get_worker_chats(
+    page: Page = Depends(),
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all chats for the current worker"""
+    """Get the current worker's chats, most recent activity first"""
     if not isinstance(current_worker, Worker):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only workers can access chats"
         )
     
-    chats = db.query(Chat).filter(
-        Chat.worker_id == current_worker.id,
-        Chat.is_active == True
-    ).all()
-    
-    result = []
-    for chat in chats:
-        # Get last message
-        last_message = db.query(Message).filter(
-            Message.chat_id == chat.id
-        ).order_by(Message.created_at.desc()).first()
-        
-        # Get unread count
-        unread_count = db.query(Message).filter(
-            Message.chat_id == chat.id,
-            Message.sender_type == "user",
-            Message.is_read == False
-        ).count()
-        
-        chat_data = ChatListResponse(
-            id=chat.id,
-            user_id=chat.user_id,
-            worker_id=chat.worker_id,
-            is_active=chat.is_active,
-            created_at=chat.created_at,
-            updated_at=chat.updated_at,
-            user=chat.user,
-            worker=chat.worker,
-            last_message=last_message,
-            unread_count=unread_count
-        )
-        result.append(chat_data)
+    chats = page.finish((await db.execute(page.apply(
+        select(Chat).options(*_chat_list_options()).filter(
+            Chat.worker_id == current_worker.id,
+            Chat.is_active == True
+        ),
+        Chat,
+        column=Chat.last_message_at,
+    ))).scalars())
     
-    return result
+    return _build_chat_list(chats, "worker")
 
 
 @router.post("/worker/{chat_id}/messages", response_model=MessageResponse)
@@ -289,7 +452,7 @@ async def send_worker_message(
     chat_id: int,
     message: MessageCreate,
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message as a worker"""
     if not isinstance(current_worker, Worker):
@@ -299,10 +462,12 @@ async def send_worker_message(
         )
     
     # Check if chat exists and worker has access
-    chat = db.query(Chat).filter(
-        Chat.id == chat_id,
-        Chat.worker_id == current_worker.id
-    ).first()
+    chat = (await db.execute(
+        select(Chat).filter(
+            Chat.id == chat_id,
+            Chat.worker_id == current_worker.id
+        )
+    )).scalars().first()
     
     if not chat:
         raise HTTPException(
@@ -311,28 +476,44 @@ async def send_worker_message(
         )
     
     # Create message
-    db_message = Message(
-        chat_id=chat_id,
-        sender_type="worker",
-        sender_id=current_worker.id,
-        content=message.content
-    )
-    db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    db_message = await _add_message(db, chat_id, "worker", current_worker.id, message.content)
+    await db.commit()
+    await db.refresh(db_message)
     # Broadcast to WebSocket
-    await broadcast_message(chat_id, MessageResponse.from_orm(db_message).dict())
+    await publish_chat_message(chat.id, chat.user_id, chat.worker_id, MessageResponse.from_orm(db_message).json())
     return db_message
 
 
+@router.put("/{chat_id}/read", response_model=ChatReadState)
+async def mark_chat_read(
+    chat_id: int,
+    read: ChatReadRequest,
+    current_user = Depends(get_current_user),  # Can be User or Worker
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Mark every message from the other side up to a message id as read"""
+    chat = await db.get(Chat, chat_id)
+    reader = chat_side(chat, current_user) if chat is not None else None
+    if reader is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat not found"
+        )
+    
+    state = await _mark_read(db, chat, reader, read.up_to_message_id)
+    await db.commit()
+    await _broadcast_read(chat, state)
+    return state
+
+
 @router.put("/{chat_id}/messages/{message_id}/read")
 async def mark_message_as_read(
     chat_id: int,
     message_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Mark a message as read"""
+    """Mark a message, and every earlier one from the worker, as read"""
     if not isinstance(current_user, User):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -340,10 +521,12 @@ async def mark_message_as_read(
         )
     
     # Check if chat exists and user has access
-    chat = db.query(Chat).filter(
-        Chat.id == chat_id,
-        Chat.user_id == current_user.id
-    ).first()
+    chat = (await db.execute(
+        select(Chat).filter(
+            Chat.id == chat_id,
+            Chat.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not chat:
         raise HTTPException(
@@ -352,10 +535,12 @@ async def mark_message_as_read(
         )
     
     # Mark message as read
-    message = db.query(Message).filter(
-        Message.id == message_id,
-        Message.chat_id == chat_id
-    ).first()
+    message = (await db.execute(
+        select(Message.id).filter(
+            Message.id == message_id,
+            Message.chat_id == chat_id
+        )
+    )).scalars().first()
     
     if not message:
         raise HTTPException(
@@ -363,6 +548,7 @@ async def mark_message_as_read(
             detail="Message not found"
         )
     
-    message.is_read = True
-    db.commit()
-    return {"message": "Message marked as read"} 
\ No newline at end of file
+    state = await _mark_read(db, chat, "user", message_id)
+    await db.commit()
+    await _broadcast_read(chat, state)
+    return {"message": "Message marked as read"}
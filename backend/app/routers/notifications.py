@@ -1,55 +1,230 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.models.notification import Notification
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import false, func, select, true, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.pagination import Page
+from app.models.notification import BroadcastNotification, Notification, adjust_unread_count, broadcast_audience
 from app.models.user import User
 from app.models.worker import Worker
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, get_stream_principal
+from app.schemas.notification import NotificationReadRequest, NotificationReadState, NotificationUnreadCount
+from app.services.connections import EventStream, connection_hub
+from app.services.realtime import audience_topics, notification_frame, principal_topic, publish_principal_event
 from datetime import datetime
+import json
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
-@router.get("/user", response_model=List[dict])
-def get_user_notifications(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if not isinstance(current_user, User):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only users can access this endpoint")
-    notifs = db.query(Notification).filter(Notification.user_id == current_user.id).order_by(Notification.created_at.desc()).all()
+
+def _side(principal) -> str:
+    return "user" if isinstance(principal, User) else "worker"
+
+def _owner_column(principal):
+    return Notification.user_id if isinstance(principal, User) else Notification.worker_id
+
+def _seen_up_to(principal):
+    """The principal's broadcast marker, read in the query, as the principal may come from the auth cache."""
+    model = User if isinstance(principal, User) else Worker
+    return select(model.broadcasts_seen_up_to).where(model.id == principal.id).scalar_subquery()
+
+async def _unread_count(db: AsyncSession, principal) -> int:
+    """The principal's maintained unread counter plus the broadcasts to them past their marker."""
+    model = User if isinstance(principal, User) else Worker
+    unseen_broadcasts = (
+        select(func.count()).select_from(BroadcastNotification)
+        .where(broadcast_audience(_side(principal), principal.id), BroadcastNotification.id > _seen_up_to(principal))
+        .scalar_subquery()
+    )
+    return (await db.execute(
+        select(model.unread_notification_count + unseen_broadcasts).where(model.id == principal.id)
+    )).scalar_one()
+
+def _feed(principal):
+    """The principal's own notifications and the broadcasts to their audience, as one selectable."""
+    own = select(
+        Notification.id, Notification.type, Notification.title, Notification.message,
+        func.coalesce(Notification.is_read, false()).label("is_read"), Notification.created_at,
+        false().label("broadcast"),
+    ).where(_owner_column(principal) == principal.id)
+    broadcasts = select(
+        BroadcastNotification.id, BroadcastNotification.type, BroadcastNotification.title,
+        BroadcastNotification.message, (BroadcastNotification.id <= _seen_up_to(principal)).label("is_read"),
+        BroadcastNotification.created_at, true().label("broadcast"),
+    ).where(broadcast_audience(_side(principal), principal.id))
+    return union_all(own, broadcasts).subquery("feed")
+
+async def _feed_page(db: AsyncSession, page: Page, principal) -> List[dict]:
+    # Ids repeat across the two tables and timestamps can tie, so the flag is part of the sort key
+    feed = _feed(principal)
+    rows = page.finish((await db.execute(page.apply(select(feed), feed.c, tiebreak=feed.c.broadcast))).all())
     return [
         {
             "id": n.id,
             "type": n.type,
             "title": n.title,
             "message": n.message,
-            "is_read": n.is_read,
-            "created_at": n.created_at
-        } for n in notifs
+            "is_read": bool(n.is_read),
+            "created_at": n.created_at,
+            "broadcast": bool(n.broadcast),
+        } for n in rows
     ]
 
+async def _mark_broadcasts_seen(db: AsyncSession, principal, up_to_id: int):
+    """Move the principal's broadcast marker up to ``up_to_id``, never back or past the newest broadcast."""
+    model = User if isinstance(principal, User) else Worker
+    newest = (await db.execute(select(func.max(BroadcastNotification.id)))).scalar() or 0
+    seen_up_to = min(up_to_id, newest)
+    await db.execute(
+        update(model.__table__)
+        .where(model.__table__.c.id == principal.id, model.__table__.c.broadcasts_seen_up_to < seen_up_to)
+        .values(broadcasts_seen_up_to=seen_up_to, updated_at=model.__table__.c.updated_at)
+    )
+
+async def _mark_read(db: AsyncSession, principal, *conditions) -> int:
+    """Mark the principal's unread notifications matching ``conditions`` read and decrement its counter; the caller commits.
+
+    Returns how many were marked.
+    """
+    marked = (await db.execute(
+        update(Notification)
+        .where(_owner_column(principal) == principal.id, Notification.is_read == False, *conditions)
+        .values(is_read=True)
+    )).rowcount
+    if marked:
+        await db.execute(adjust_unread_count(_side(principal), principal.id, -marked))
+    return marked
+
+async def _broadcast_read(principal, up_to_id: Optional[int], unread_count: int, up_to_broadcast_id: Optional[int] = None):
+    """Tell the principal's other devices to update their badge."""
+    await publish_principal_event(_side(principal), principal.id, {
+        "type": "notifications_read", "up_to_id": up_to_id, "up_to_broadcast_id": up_to_broadcast_id,
+        "unread_count": unread_count,
+    })
+
+def _sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/user", response_model=List[dict])
+async def get_user_notifications(page: Page = Depends(), current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    if not isinstance(current_user, User):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only users can access this endpoint")
+    return await _feed_page(db, page, current_user)
+
 @router.get("/worker", response_model=List[dict])
-def get_worker_notifications(current_user: Worker = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_worker_notifications(page: Page = Depends(), current_user: Worker = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     if not isinstance(current_user, Worker):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers can access this endpoint")
-    notifs = db.query(Notification).filter(Notification.worker_id == current_user.id).order_by(Notification.created_at.desc()).all()
-    return [
-        {
-            "id": n.id,
-            "type": n.type,
-            "title": n.title,
-            "message": n.message,
-            "is_read": n.is_read,
-            "created_at": n.created_at
-        } for n in notifs
-    ]
+    return await _feed_page(db, page, current_user)
+
+@router.get("/unread-count", response_model=NotificationUnreadCount)
+async def get_unread_count(current_user = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Unread notifications for the badge, from the counter kept on the user or worker row"""
+    return NotificationUnreadCount(unread_count=await _unread_count(db, current_user))
+
+@router.put("/read", response_model=NotificationReadState)
+async def mark_notifications_read(read: NotificationReadRequest, current_user = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    """Mark own notifications up to ``up_to_id`` and broadcasts up to ``up_to_broadcast_id`` read, in one statement each"""
+    unread_before = await _unread_count(db, current_user)
+    if read.up_to_id is not None:
+        await _mark_read(db, current_user, Notification.id <= read.up_to_id)
+    if read.up_to_broadcast_id is not None:
+        await _mark_broadcasts_seen(db, current_user, read.up_to_broadcast_id)
+    unread_count = await _unread_count(db, current_user)
+    await db.commit()
+    if unread_count != unread_before:
+        await _broadcast_read(current_user, read.up_to_id, unread_count, read.up_to_broadcast_id)
+    return NotificationReadState(marked=unread_before - unread_count, unread_count=unread_count)
+
+@router.get("/stream")
+async def stream_notifications(request: Request, current_user = Depends(get_stream_principal)):
+    """Server-Sent Events: a "notification" event for every new notification or broadcast and a "read" event when some are marked read.
+
+    Notification events carry the notification's id as the event id, so a
+    reconnecting EventSource (Last-Event-ID) first gets what it missed. When
+    it missed more than notification_stream_replay_limit, it gets a "reset"
+    event instead and should re-fetch the list. The server ends each stream
+    after notification_stream_max_seconds.
+    Takes the token as a bearer header or ?token=.
+    """
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    replay_after = int(last_event_id) if last_event_id.isdigit() else None
+    # Live events arriving while missed notifications are loaded wait here
+    held: Optional[List[str]] = [] if replay_after is not None else None
+    replayed_up_to = replay_after or 0
+
+    def render(frame: str) -> Optional[str]:
+        if held is not None:
+            held.append(frame)
+            return None
+        event = json.loads(frame)
+        if event.get("type") == "notification":
+            notification = event["notification"]
+            if notification.get("broadcast"):
+                # Broadcast ids are a separate sequence, so they are not event ids
+                return _sse("notification", notification)
+            if notification["id"] <= replayed_up_to:
+                return None
+            return _sse("notification", notification, notification["id"])
+        if event.get("type") == "notifications_read":
+            del event["type"]
+            return _sse("read", event)
+        if event.get("type") == "reset":
+            # Carries the newest missed id, so the client resumes after the list it re-fetches
+            return _sse("reset", {"up_to_id": event["up_to_id"]}, event["up_to_id"])
+        return None
+
+    stream = connection_hub.register(EventStream(connection_hub, render))
+    # Subscribe before replaying, so nothing committed in between is missed
+    connection_hub.subscribe(stream, principal_topic(_side(current_user), current_user.id))
+    async with AsyncSessionLocal() as db:
+        for topic in await audience_topics(db, _side(current_user), current_user.id):
+            connection_hub.subscribe(stream, topic)
+    if replay_after is not None:
+        async with AsyncSessionLocal() as db:
+            missed = (await db.execute(
+                select(Notification)
+                .where(_owner_column(current_user) == current_user.id, Notification.id > replay_after)
+                .order_by(Notification.id)
+                .limit(settings.notification_stream_replay_limit + 1)
+            )).scalars().all()
+            newest = None
+            if len(missed) > settings.notification_stream_replay_limit:
+                newest = (await db.execute(
+                    select(func.max(Notification.id)).where(_owner_column(current_user) == current_user.id)
+                )).scalar()
+        frames, held = held, None
+        if newest is not None:
+            # Too far behind to replay; held live events up to the newest are covered by the re-fetch
+            stream.offer(json.dumps({"type": "reset", "up_to_id": newest}))
+            replayed_up_to = newest
+        else:
+            for n in missed:
+                stream.offer(notification_frame(n))
+            if missed:
+                replayed_up_to = missed[-1].id
+        for frame in frames:
+            stream.offer(frame)
+
+    return StreamingResponse(
+        stream.events(settings.notification_stream_keepalive_seconds, settings.notification_stream_max_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.put("/{notification_id}/read")
-def mark_notification_read(notification_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
+async def mark_notification_read(notification_id: int, db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
+    notif = await db.get(Notification, notification_id)
     if not notif:
         raise HTTPException(status_code=404, detail="Notification not found")
     # Only allow owner to mark as read
-    if (notif.user_id and hasattr(current_user, 'id') and notif.user_id != current_user.id) or (notif.worker_id and hasattr(current_user, 'id') and notif.worker_id != getattr(current_user, 'id', None)):
+    if getattr(notif, _owner_column(current_user).key) != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
-    notif.is_read = True
-    db.commit()
+    if await _mark_read(db, current_user, Notification.id == notification_id):
+        unread_count = await _unread_count(db, current_user)
+        await db.commit()
+        await _broadcast_read(current_user, notification_id, unread_count)
     return {"success": True, "notification_id": notification_id} 
\ No newline at end of file
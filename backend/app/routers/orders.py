@@ -1,25 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
-from app.core.database import get_db
-from app.models.order import Order, Review
+from datetime import timedelta
+from app.core.database import get_async_db
+from app.core.pagination import Page
+from app.models.order import ACTIVE_ORDER_STATUSES, BookingHold, Order, Review
 from app.models.user import User
 from app.models.service import Service
-from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse, ReviewCreate, ReviewResponse
+from app.schemas.order import (
+    OrderCreate, OrderUpdate, OrderResponse, ReviewCreate, ReviewResponse, BookingHoldCreate, BookingHoldResponse
+)
 from app.routers.auth import get_current_user
+from app.core.principal_cache import principal_cache
 from app.models.worker import Worker
-import asyncio
-from app.models.notification import Notification
+from app.services.booking_index import find_conflicting_order
+from app.services.outbox import order_event
+from app.services.reservations import claim_hold, create_hold, lock_worker_schedule, slot_is_taken
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def _order_options():
+    """Eager loads needed to serialize an OrderResponse without lazy loading."""
+    return (
+        joinedload(Order.service).joinedload(Service.category),
+        joinedload(Order.service).joinedload(Service.worker),
+        joinedload(Order.worker),
+        joinedload(Order.user),
+    )
+
+
+def _review_options():
+    """Eager loads needed to serialize a ReviewResponse without lazy loading."""
+    return (
+        joinedload(Review.user),
+        joinedload(Review.worker),
+    )
+
+
+async def _load_order(db: AsyncSession, order_id: int) -> Order:
+    result = await db.execute(
+        select(Order).options(*_order_options()).filter(Order.id == order_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
 @router.post("/", response_model=OrderResponse)
 async def create_order(
     order: OrderCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    background_tasks: BackgroundTasks = None
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new order (only users can create orders)"""
     # Verify the user is creating the order
@@ -30,10 +63,7 @@ async def create_order(
         )
     
     # Check if the service exists and is available
-    from app.models.service import Service
-    from app.models.worker import Worker
-    
-    service = db.query(Service).filter(Service.id == order.service_id).first()
+    service = await db.get(Service, order.service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -47,7 +77,7 @@ async def create_order(
         )
     
     # Check if worker exists and is available
-    worker = db.query(Worker).filter(Worker.id == service.worker_id).first()
+    worker = await db.get(Worker, service.worker_id)
     if not worker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,38 +92,25 @@ async def create_order(
     
     # Check for time conflicts if scheduled_date is provided
     if order.scheduled_date:
-        # Check if worker has any overlapping orders at the same time
-        from datetime import timedelta
-        
-        # Calculate the end time of the requested booking
         end_time = order.scheduled_date + timedelta(hours=order.hours)
-        
-        # Check for overlapping orders using a subquery approach
-        from sqlalchemy import text
-        
-        # Use raw SQL for the complex time overlap check
-        overlap_query = text("""
-            SELECT * FROM orders 
-            WHERE worker_id = :worker_id 
-            AND status IN ('pending', 'accepted', 'in_progress')
-            AND scheduled_date IS NOT NULL
-            AND (
-                (scheduled_date <= :new_start AND scheduled_date + (hours || ' hours')::interval > :new_start)
-                OR (scheduled_date < :new_end AND scheduled_date + (hours || ' hours')::interval >= :new_end)
-                OR (scheduled_date >= :new_start AND scheduled_date + (hours || ' hours')::interval <= :new_end)
+        # Cheap lock-free rejection first, then re-check under the worker's
+        # reservation lock, which is held until the order is committed
+        if await find_conflicting_order(db, worker.id, order.scheduled_date, end_time):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Sorry, the worker is already booked at this time. Please choose another date and time."
+            )
+        await lock_worker_schedule(db, worker.id)
+        if order.hold_id is not None and not await claim_hold(
+            db, order.hold_id, current_user.id, worker.id, order.scheduled_date, end_time
+        ):
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Your hold on this time slot has expired. Please choose the time again."
             )
-        """)
-        
-        conflicting_orders = db.execute(
-            overlap_query,
-            {
-                'worker_id': worker.id,
-                'new_start': order.scheduled_date,
-                'new_end': end_time
-            }
-        ).first()
-        
-        if conflicting_orders:
+        if await slot_is_taken(db, worker.id, order.scheduled_date, end_time, user_id=current_user.id):
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Sorry, the worker is already booked at this time. Please choose another date and time."
@@ -114,61 +131,94 @@ async def create_order(
         scheduled_date=order.scheduled_date
     )
     db.add(db_order)
+    await db.flush()
+    # Notifications and emails are delivered by the outbox dispatcher once this commits
+    db.add(order_event("order_booked", db_order))
+    await db.commit()
+    return await _load_order(db, db_order.id)
+
+
+@router.post("/holds", response_model=BookingHoldResponse)
+async def create_booking_hold(
+    hold: BookingHoldCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Hold a time slot while the user confirms the booking; the hold expires on its own"""
+    if not isinstance(current_user, User):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only users can hold time slots"
+        )
     
-    db.commit()
-    db.refresh(db_order)
-    # Create notifications for user and worker
-    notif_title = "Order Booked"
-    notif_msg = f"Your order (ID: {db_order.id}) has been booked. Description: {db_order.description}"
-    user_notif = Notification(
-        user_id=current_user.id,
-        type="order_booked",
-        title=notif_title,
-        message=notif_msg
-    )
-    worker_notif = Notification(
-        worker_id=worker.id,
-        type="order_booked",
-        title=notif_title,
-        message=notif_msg
-    )
-    db.add(user_notif)
-    db.add(worker_notif)
-    db.commit()
-    # Send notification emails to user and worker
-    if background_tasks is not None:
-        from app.services.email_service import email_service
-        background_tasks.add_task(
-            lambda: asyncio.run(email_service.send_order_booked_email(current_user, worker, db_order))
+    service = await db.get(Service, hold.service_id)
+    if not service or not service.is_available:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
         )
-    return db_order
+    
+    end_time = hold.scheduled_date + timedelta(hours=hold.hours or 1)
+    if await find_conflicting_order(db, service.worker_id, hold.scheduled_date, end_time):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sorry, the worker is already booked at this time. Please choose another date and time."
+        )
+    await lock_worker_schedule(db, service.worker_id)
+    db_hold = await create_hold(db, current_user.id, service.worker_id, service.id, hold.scheduled_date, end_time)
+    if db_hold is None:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sorry, the worker is already booked at this time. Please choose another date and time."
+        )
+    await db.commit()
+    return db_hold
+
+
+@router.delete("/holds/{hold_id}")
+async def release_booking_hold(
+    hold_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Release a slot hold before it expires"""
+    db_hold = await db.get(BookingHold, hold_id)
+    if not db_hold or not isinstance(current_user, User) or db_hold.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hold not found"
+        )
+    await db.delete(db_hold)
+    await db.commit()
+    return {"message": "Hold released successfully"}
 
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    page: Page = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all orders for the current user"""
+    """Get the current user's orders, newest first"""
     if not isinstance(current_user, User):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only users can access this endpoint"
         )
     
-    orders = db.query(Order).options(
-        joinedload(Order.service).joinedload(Service.category),
-        joinedload(Order.worker),
-        joinedload(Order.user)
-    ).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
-    return orders
+    result = await db.execute(page.apply(
+        select(Order).options(*_order_options()).filter(Order.user_id == current_user.id),
+        Order,
+    ))
+    return page.finish(result.scalars())
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific order by ID"""
     if not isinstance(current_user, User):
@@ -177,14 +227,13 @@ async def get_order(
             detail="Only users can access this endpoint"
         )
     
-    order = db.query(Order).options(
-        joinedload(Order.service).joinedload(Service.category),
-        joinedload(Order.worker),
-        joinedload(Order.user)
-    ).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Order).options(*_order_options()).filter(
+            Order.id == order_id,
+            Order.user_id == current_user.id
+        )
+    )
+    order = result.scalars().first()
     
     if not order:
         raise HTTPException(
@@ -200,8 +249,7 @@ async def update_order(
     order_id: int,
     order_update: OrderUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    background_tasks: BackgroundTasks = None
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update an order (only the order owner can update)"""
     if not isinstance(current_user, User):
@@ -210,10 +258,12 @@ async def update_order(
             detail="Only users can update orders"
         )
     
-    db_order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    db_order = (await db.execute(
+        select(Order).filter(
+            Order.id == order_id,
+            Order.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not db_order:
         raise HTTPException(
@@ -223,47 +273,41 @@ async def update_order(
     
     # Track if status is being set to completed
     status_was_completed = db_order.status == "completed"
+    update_data = order_update.dict(exclude_unset=True)
+    # Moving, extending or reactivating a booking must not overlap another active one
+    new_start = update_data.get("scheduled_date", db_order.scheduled_date)
+    new_hours = update_data.get("hours") or db_order.hours or 1
+    new_status = update_data.get("status") or db_order.status
+    slot_changed = (
+        new_start != db_order.scheduled_date
+        or new_hours != (db_order.hours or 1)
+        or new_status != db_order.status
+    )
+    if slot_changed and new_start and new_status in ACTIVE_ORDER_STATUSES:
+        new_end = new_start + timedelta(hours=new_hours)
+        await lock_worker_schedule(db, db_order.worker_id)
+        if await slot_is_taken(db, db_order.worker_id, new_start, new_end,
+                               user_id=current_user.id, exclude_order_id=db_order.id):
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Sorry, the worker is already booked at this time. Please choose another date and time."
+            )
     # Update order fields
-    for field, value in order_update.dict(exclude_unset=True).items():
+    for field, value in update_data.items():
         setattr(db_order, field, value)
-    db.commit()
-    db.refresh(db_order)
-    # If status changed to completed, send notification and create notification records
+    # If status changed to completed, notify both sides (via the outbox) in the same commit
     if not status_was_completed and db_order.status == "completed":
-        from app.models.user import User
-        from app.models.worker import Worker
-        user = db.query(User).filter(User.id == db_order.user_id).first()
-        worker = db.query(Worker).filter(Worker.id == db_order.worker_id).first()
-        notif_title = "Order Completed"
-        notif_msg = f"Your order (ID: {db_order.id}) has been marked as completed. Description: {db_order.description}"
-        user_notif = Notification(
-            user_id=user.id,
-            type="order_completed",
-            title=notif_title,
-            message=notif_msg
-        )
-        worker_notif = Notification(
-            worker_id=worker.id,
-            type="order_completed",
-            title=notif_title,
-            message=notif_msg
-        )
-        db.add(user_notif)
-        db.add(worker_notif)
-        db.commit()
-        if background_tasks is not None:
-            from app.services.email_service import email_service
-            background_tasks.add_task(
-                lambda: asyncio.run(email_service.send_order_completed_email(user, worker, db_order))
-            )
-    return db_order
+        db.add(order_event("order_completed", db_order))
+    await db.commit()
+    return await _load_order(db, db_order.id)
 
 
 @router.delete("/{order_id}")
 async def cancel_order(
     order_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel an order (only the order owner can cancel)"""
     if not isinstance(current_user, User):
@@ -272,10 +316,12 @@ async def cancel_order(
             detail="Only users can cancel orders"
         )
     
-    db_order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    db_order = (await db.execute(
+        select(Order).filter(
+            Order.id == order_id,
+            Order.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not db_order:
         raise HTTPException(
@@ -291,7 +337,7 @@ async def cancel_order(
     
     db_order.status = "cancelled"
     
-    db.commit()
+    await db.commit()
     return {"message": "Order cancelled successfully"}
 
 
@@ -301,7 +347,7 @@ async def create_review(
     order_id: int,
     review: ReviewCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a review for an order (only users can create reviews)"""
     if not isinstance(current_user, User):
@@ -311,10 +357,12 @@ async def create_review(
         )
     
     # Check if order exists and belongs to the user
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    order = (await db.execute(
+        select(Order).filter(
+            Order.id == order_id,
+            Order.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not order:
         raise HTTPException(
@@ -329,7 +377,9 @@ async def create_review(
         )
     
     # Check if review already exists
-    existing_review = db.query(Review).filter(Review.order_id == order_id).first()
+    existing_review = (await db.execute(
+        select(Review).filter(Review.order_id == order_id)
+    )).scalars().first()
     if existing_review:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -354,8 +404,7 @@ async def create_review(
     db.add(db_review)
     
     # Update worker's rating
-    from app.models.worker import Worker
-    worker = db.query(Worker).filter(Worker.id == order.worker_id).first()
+    worker = await db.get(Worker, order.worker_id)
     if worker:
         # Calculate new average rating
         total_reviews = worker.total_reviews + 1
@@ -363,16 +412,21 @@ async def create_review(
         worker.rating = new_rating
         worker.total_reviews = total_reviews
     
-    db.commit()
-    db.refresh(db_review)
-    return db_review
+    await db.commit()
+    if worker:
+        principal_cache.invalidate("worker", worker.id)
+    result = await db.execute(
+        select(Review).options(*_review_options()).filter(Review.id == db_review.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 
 @router.get("/{order_id}/review", response_model=ReviewResponse)
 async def get_review(
     order_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get review for a specific order"""
     if not isinstance(current_user, User):
@@ -382,10 +436,12 @@ async def get_review(
         )
     
     # Check if order exists and belongs to the user
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.user_id == current_user.id
-    ).first()
+    order = (await db.execute(
+        select(Order).filter(
+            Order.id == order_id,
+            Order.user_id == current_user.id
+        )
+    )).scalars().first()
     
     if not order:
         raise HTTPException(
@@ -393,7 +449,9 @@ async def get_review(
             detail="Order not found"
         )
     
-    review = db.query(Review).filter(Review.order_id == order_id).first()
+    review = (await db.execute(
+        select(Review).options(*_review_options()).filter(Review.order_id == order_id)
+    )).scalars().first()
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -404,34 +462,36 @@ async def get_review(
 
 @router.get("/worker/pending", response_model=List[OrderResponse])
 async def get_pending_orders_for_worker(
+    page: Page = Depends(),
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all pending orders assigned to the current worker"""
+    """Get the pending orders assigned to the current worker, newest first"""
     if not isinstance(current_worker, Worker):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers can access this endpoint")
-    orders = db.query(Order).options(
-        joinedload(Order.service).joinedload(Service.category),
-        joinedload(Order.user)
-    ).filter(
-        Order.worker_id == current_worker.id,
-        Order.status == "pending"
-    ).order_by(Order.created_at.desc()).all()
-    return orders
+    result = await db.execute(page.apply(
+        select(Order).options(*_order_options()).filter(
+            Order.worker_id == current_worker.id,
+            Order.status == "pending"
+        ),
+        Order,
+    ))
+    return page.finish(result.scalars())
 
 @router.get("/worker/completed", response_model=List[OrderResponse])
 async def get_completed_orders_for_worker(
+    page: Page = Depends(),
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all completed orders assigned to the current worker"""
+    """Get the completed orders assigned to the current worker, newest first"""
     if not isinstance(current_worker, Worker):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers can access this endpoint")
-    orders = db.query(Order).options(
-        joinedload(Order.service).joinedload(Service.category),
-        joinedload(Order.user)
-    ).filter(
-        Order.worker_id == current_worker.id,
-        Order.status == "completed"
-    ).order_by(Order.created_at.desc()).all()
-    return orders 
\ No newline at end of file
+    result = await db.execute(page.apply(
+        select(Order).options(*_order_options()).filter(
+            Order.worker_id == current_worker.id,
+            Order.status == "completed"
+        ),
+        Order,
+    ))
+    return page.finish(result.scalars()) 
\ No newline at end of file
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from typing import Dict
+from app.core.database import AsyncSessionLocal
+from app.models.chat import Chat
+from app.models.user import User
+from app.routers.auth import authenticate_socket
+from app.routers.chat import accept_socket, chat_side, error_frame, handle_chat_frame, iter_frames
+from app.services.connections import Connection, connection_hub
+from app.services.realtime import audience_topics, principal_topic
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+
+async def _receive_frames(connection: Connection, user_type: str, principal):
+    # Chats this socket has already been allowed to send to
+    chats: Dict[int, Chat] = {}
+    async for frame in iter_frames(connection):
+        chat_id = frame.get("chat_id") if frame is not None else None
+        if not isinstance(chat_id, int):
+            connection.offer(error_frame(frame.get("client_id") if frame else None, "Invalid message frame"))
+            continue
+        chat = chats.get(chat_id)
+        if chat is None:
+            async with AsyncSessionLocal() as db:
+                chat = await db.get(Chat, chat_id)
+            if chat is None or chat_side(chat, principal) != user_type:
+                connection.offer(error_frame(frame.get("client_id"), "Chat not found"))
+                continue
+            chats[chat_id] = chat
+        await handle_chat_frame(connection, chat, user_type, principal.id, frame)
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket):
+    """One socket per signed-in device for everything addressed to the user or worker.
+
+    Carries chat messages ({"type": "message"}), read receipts ({"type": "read"}),
+    order status changes ({"type": "order_status"}) and new notifications
+    ({"type": "notification"}, including broadcasts to the principal's
+    audience). Clients send the same frames as on a chat socket, with a
+    "chat_id", and can negotiate MessagePack framing the same way.
+    """
+    packed = await accept_socket(websocket)
+    try:
+        principal = await authenticate_socket(websocket)
+    except WebSocketDisconnect:
+        return
+    if principal is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+    user_type = "user" if isinstance(principal, User) else "worker"
+
+    connection = connection_hub.connect(websocket, packed)
+    connection_hub.subscribe(connection, principal_topic(user_type, principal.id))
+    async with AsyncSessionLocal() as db:
+        for topic in await audience_topics(db, user_type, principal.id):
+            connection_hub.subscribe(connection, topic)
+    try:
+        await connection.serve(_receive_frames(connection, user_type, principal))
+    finally:
+        connection_hub.remove(connection)
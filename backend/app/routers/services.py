@@ -1,24 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import Page
 from app.models.service import Service
 from app.models.worker import Worker
+from app.models.category import Category
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse
 from app.routers.auth import get_current_user
+from app.services.slot_index import slot_index
 
 router = APIRouter(prefix="/services", tags=["services"])
 
 
+def _service_options():
+    """Eager loads needed to serialize a ServiceResponse without lazy loading."""
+    return (
+        joinedload(Service.category),
+        joinedload(Service.worker),
+    )
+
+
+async def _load_service(db: AsyncSession, service_id: int) -> Service:
+    result = await db.execute(
+        select(Service).options(*_service_options()).filter(Service.id == service_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+
 @router.get("/", response_model=List[ServiceResponse])
-def get_services(
+async def get_services(
     category_id: int = None,
     worker_id: int = None,
     available_only: bool = True,
-    db: Session = Depends(get_db)
+    page: Page = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all services with optional filtering"""
-    query = db.query(Service)
+    """Get services with optional filtering, newest first"""
+    query = select(Service).options(*_service_options())
     
     if available_only:
         query = query.filter(Service.is_available == True)
@@ -29,14 +51,14 @@ def get_services(
     if worker_id:
         query = query.filter(Service.worker_id == worker_id)
     
-    services = query.all()
-    return services
+    services = (await db.execute(page.apply(query, Service))).scalars()
+    return page.finish(services)
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-def get_service(service_id: int, db: Session = Depends(get_db)):
+async def get_service(service_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific service by ID"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await _load_service(db, service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,7 +71,7 @@ def get_service(service_id: int, db: Session = Depends(get_db)):
 async def create_service(
     service: ServiceCreate,
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new service (only workers can create services)"""
     # Verify the worker is creating the service
@@ -60,8 +82,7 @@ async def create_service(
         )
     
     # Check if category exists
-    from app.models.category import Category
-    category = db.query(Category).filter(Category.id == service.category_id).first()
+    category = await db.get(Category, service.category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,9 +95,9 @@ async def create_service(
         worker_id=current_worker.id
     )
     db.add(db_service)
-    db.commit()
-    db.refresh(db_service)
-    return db_service
+    await db.commit()
+    slot_index.invalidate_category(db_service.category_id)
+    return await _load_service(db, db_service.id)
 
 
 @router.put("/{service_id}", response_model=ServiceResponse)
@@ -84,7 +105,7 @@ async def update_service(
     service_id: int,
     service_update: ServiceUpdate,
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a service (only the service owner can update)"""
     # Verify the worker is updating their own service
@@ -94,10 +115,12 @@ async def update_service(
             detail="Only workers can update services"
         )
     
-    db_service = db.query(Service).filter(
-        Service.id == service_id,
-        Service.worker_id == current_worker.id
-    ).first()
+    db_service = (await db.execute(
+        select(Service).filter(
+            Service.id == service_id,
+            Service.worker_id == current_worker.id
+        )
+    )).scalars().first()
     
     if not db_service:
         raise HTTPException(
@@ -106,19 +129,21 @@ async def update_service(
         )
     
     # Update service fields
+    previous_category_id = db_service.category_id
     for field, value in service_update.dict(exclude_unset=True).items():
         setattr(db_service, field, value)
     
-    db.commit()
-    db.refresh(db_service)
-    return db_service
+    await db.commit()
+    slot_index.invalidate_category(previous_category_id)
+    slot_index.invalidate_category(db_service.category_id)
+    return await _load_service(db, db_service.id)
 
 
 @router.delete("/{service_id}")
 async def delete_service(
     service_id: int,
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a service (only the service owner can delete)"""
     # Verify the worker is deleting their own service
@@ -128,10 +153,12 @@ async def delete_service(
             detail="Only workers can delete services"
         )
     
-    db_service = db.query(Service).filter(
-        Service.id == service_id,
-        Service.worker_id == current_worker.id
-    ).first()
+    db_service = (await db.execute(
+        select(Service).filter(
+            Service.id == service_id,
+            Service.worker_id == current_worker.id
+        )
+    )).scalars().first()
     
     if not db_service:
         raise HTTPException(
@@ -141,14 +168,15 @@ async def delete_service(
     
     # Soft delete by setting is_available to False
     db_service.is_available = False
-    db.commit()
+    await db.commit()
+    slot_index.invalidate_category(db_service.category_id)
     return {"message": "Service deleted successfully"}
 
 
 @router.get("/worker/my-services", response_model=List[ServiceResponse])
 async def get_my_services(
     current_worker: Worker = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all services created by the current worker"""
     if not isinstance(current_worker, Worker):
@@ -157,5 +185,7 @@ async def get_my_services(
             detail="Only workers can access this endpoint"
         )
     
-    services = db.query(Service).filter(Service.worker_id == current_worker.id).all()
-    return services 
\ No newline at end of file
+    services = (await db.execute(
+        select(Service).options(*_service_options()).filter(Service.worker_id == current_worker.id)
+    )).scalars().all()
+    return services
@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
-from app.models.worker import Worker
+from datetime import datetime, timedelta
+from app.core.database import get_db, get_async_db
+from app.core.pagination import Page
+from app.models.worker import Worker, WorkerWorkingHours
 from app.models.order import Review
+from app.models.service import Service
+from app.models.category import Category
 from app.schemas.worker import (
-    WorkerUpdate, WorkerResponse
+    WorkerUpdate, WorkerResponse, WorkerAvailabilityResponse, WorkingHours, AvailableWorkersResponse
 )
 from app.schemas.order import ReviewResponse
 from app.routers.auth import get_current_user
+from app.core.principal_cache import principal_cache
 from app.services.worker_service import WorkerService
+from app.services.availability import get_free_slots
+from app.services.slot_index import slot_index, SLOT_MINUTES
+from app.services.booking_index import naive_utc
 from sqlalchemy.orm import joinedload
 import os
 
@@ -47,11 +57,75 @@ async def update_worker_profile(
         setattr(current_worker, field, value)
     
     db.commit()
+    principal_cache.invalidate("worker", current_worker.id)
+    slot_index.invalidate_worker(current_worker.id)
     db.refresh(current_worker)
     worker_dict = current_worker.__dict__.copy()
     worker_dict["image"] = get_public_image_url(current_worker.image, request) if current_worker.image else None
     return worker_dict
 
+
+@router.get("/profile/working-hours", response_model=List[WorkingHours])
+async def get_my_working_hours(
+    current_worker: Worker = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get current worker's weekly working hours"""
+    if not isinstance(current_worker, Worker):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only workers have working hours"
+        )
+    
+    hours = (await db.execute(
+        select(WorkerWorkingHours).filter(WorkerWorkingHours.worker_id == current_worker.id)
+        .order_by(WorkerWorkingHours.weekday, WorkerWorkingHours.start_time)
+    )).scalars().all()
+    return hours
+
+
+@router.put("/profile/working-hours", response_model=List[WorkingHours])
+async def set_my_working_hours(
+    working_hours: List[WorkingHours],
+    current_worker: Worker = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Replace current worker's weekly working hours"""
+    if not isinstance(current_worker, Worker):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only workers have working hours"
+        )
+    
+    for entry in working_hours:
+        if not 0 <= entry.weekday <= 6:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="weekday must be between 0 (Monday) and 6 (Sunday)"
+            )
+        if entry.end_time <= entry.start_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_time must be after start_time"
+            )
+        for value in (entry.start_time, entry.end_time):
+            if value.minute % SLOT_MINUTES or value.second or value.microsecond:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Working hours must start and end on a {SLOT_MINUTES}-minute boundary"
+                )
+    
+    existing = (await db.execute(
+        select(WorkerWorkingHours).filter(WorkerWorkingHours.worker_id == current_worker.id)
+    )).scalars().all()
+    for row in existing:
+        await db.delete(row)
+    for entry in working_hours:
+        db.add(WorkerWorkingHours(worker_id=current_worker.id, **entry.dict()))
+    await db.commit()
+    slot_index.invalidate_worker(current_worker.id)
+    return sorted(working_hours, key=lambda entry: (entry.weekday, entry.start_time))
+
 @router.post("/upload-profile-image")
 async def upload_worker_profile_image(request: Request, file: UploadFile = File(...)):
     """Upload a profile image for the worker. Returns the public URL."""
@@ -67,29 +141,69 @@ async def upload_worker_profile_image(request: Request, file: UploadFile = File(
     return {"url": public_url}
 
 @router.get("/", response_model=List[WorkerResponse])
-def get_workers(
+async def get_workers(
     category_id: int = None,
     available_only: bool = True,
-    db: Session = Depends(get_db)
+    page: Page = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all workers with optional filtering"""
-    query = db.query(Worker).filter(Worker.is_active == True)
+    """Get workers with optional filtering, newest first"""
+    query = select(Worker).filter(Worker.is_active == True)
     
     if available_only:
         query = query.filter(Worker.is_available == True)
     
     if category_id:
-        # Filter by category through services
-        from app.models.service import Service
-        query = query.join(Service, Worker.id == Service.worker_id).filter(Service.category_id == category_id)
+        # Filter by category through services (a subquery, so workers with several services appear once)
+        query = query.filter(Worker.id.in_(select(Service.worker_id).filter(Service.category_id == category_id)))
     
-    workers = query.all()
-    return workers
+    workers = (await db.execute(page.apply(query, Worker))).scalars()
+    return page.finish(workers)
+
+@router.get("/available", response_model=AvailableWorkersResponse)
+async def get_available_workers(
+    category_id: int,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the workers of a category who are free for the whole of from-to, best rated first"""
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+    horizon_start, horizon_end = slot_index.horizon()
+    if naive_utc(start) < horizon_start or naive_utc(end) > horizon_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Search window must fall between {horizon_start.isoformat()} and {horizon_end.isoformat()}"
+        )
+    
+    category = await db.get(Category, category_id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+    
+    total, worker_ids = await slot_index.find_available(db, category_id, start, end, skip, limit)
+    workers = (await db.execute(select(Worker).filter(Worker.id.in_(worker_ids)))).scalars().all()
+    by_id = {worker.id: worker for worker in workers}
+    return {
+        "category_id": category_id,
+        "start": start,
+        "end": end,
+        "total": total,
+        "workers": [by_id[worker_id] for worker_id in worker_ids if worker_id in by_id],
+    }
 
 @router.get("/{worker_id}", response_model=WorkerResponse)
-def get_worker(worker_id: int, db: Session = Depends(get_db)):
+async def get_worker(worker_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific worker by ID"""
-    worker = db.query(Worker).filter(Worker.id == worker_id).first()
+    worker = await db.get(Worker, worker_id)
     if not worker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,18 +211,74 @@ def get_worker(worker_id: int, db: Session = Depends(get_db)):
         )
     return worker
 
+@router.get("/{worker_id}/availability", response_model=WorkerAvailabilityResponse)
+async def get_worker_availability(
+    worker_id: int,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    slot: int = Query(60, ge=15, le=720, description="Slot length in minutes"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a worker's free time slots between from and to"""
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must be after 'from'"
+        )
+    if end - start > timedelta(days=31):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Availability can be requested for at most 31 days at a time"
+        )
+    
+    worker = await db.get(Worker, worker_id)
+    if not worker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Worker not found"
+        )
+    
+    slots = await get_free_slots(db, worker_id, start, end, timedelta(minutes=slot))
+    return {
+        "worker_id": worker_id,
+        "start": start,
+        "end": end,
+        "slot_minutes": slot,
+        "free_slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots],
+    }
+
+@router.get("/{worker_id}/working-hours", response_model=List[WorkingHours])
+async def get_worker_working_hours(worker_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a worker's weekly working hours (UTC)"""
+    worker = await db.get(Worker, worker_id)
+    if not worker:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Worker not found"
+        )
+    
+    hours = (await db.execute(
+        select(WorkerWorkingHours).filter(WorkerWorkingHours.worker_id == worker_id)
+        .order_by(WorkerWorkingHours.weekday, WorkerWorkingHours.start_time)
+    )).scalars().all()
+    return hours
+
 @router.get("/{worker_id}/reviews", response_model=List[ReviewResponse])
-def get_worker_reviews(worker_id: int, db: Session = Depends(get_db)):
-    """Get all reviews for a specific worker"""
+async def get_worker_reviews(worker_id: int, page: Page = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Get a worker's reviews, newest first"""
     # Check if worker exists
-    worker = db.query(Worker).filter(Worker.id == worker_id).first()
+    worker = await db.get(Worker, worker_id)
     if not worker:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Worker not found"
         )
     
-    reviews = db.query(Review).options(
-        joinedload(Review.user)
-    ).filter(Review.worker_id == worker_id).all()
-    return reviews 
\ No newline at end of file
+    reviews = (await db.execute(page.apply(
+        select(Review).options(
+            joinedload(Review.user),
+            joinedload(Review.worker)
+        ).filter(Review.worker_id == worker_id),
+        Review,
+    ))).scalars()
+    return page.finish(reviews)
@@ -69,4 +69,14 @@ class ChatListResponse(BaseModel):
         from_attributes = True
         json_encoders = {
             datetime: lambda v: v.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
-        } 
\ No newline at end of file
+        } 
+
+class ChatReadRequest(BaseModel):
+    up_to_message_id: int
+
+
+class ChatReadState(BaseModel):
+    chat_id: int
+    reader: str  # "user" or "worker"
+    last_read_message_id: int
+    unread_count: int
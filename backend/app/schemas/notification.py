@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+
+class NotificationReadRequest(BaseModel):
+    up_to_id: Optional[int] = None  # own notifications
+    up_to_broadcast_id: Optional[int] = None  # broadcast notifications
+
+
+class NotificationUnreadCount(BaseModel):
+    unread_count: int
+
+
+class NotificationReadState(BaseModel):
+    marked: int
+    unread_count: int
+
+
+class BroadcastCreate(BaseModel):
+    audience: str  # "users", "workers" or "category_workers"
+    category_id: Optional[int] = None
+    type: str = "announcement"
+    title: str
+    message: str
+
+
+class BroadcastResponse(BaseModel):
+    id: int
+    audience: str
+    category_id: Optional[int] = None
+    type: str
+    title: str
+    message: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -15,7 +15,26 @@ class OrderBase(BaseModel):
 
 
 class OrderCreate(OrderBase):
-    pass
+    hold_id: Optional[int] = None  # slot hold taken with POST /orders/holds
+
+
+class BookingHoldCreate(BaseModel):
+    service_id: int
+    hours: Optional[int] = 1
+    scheduled_date: datetime
+
+
+class BookingHoldResponse(BaseModel):
+    id: int
+    user_id: int
+    worker_id: int
+    service_id: int
+    scheduled_date: datetime
+    scheduled_end: datetime
+    expires_at: datetime
+    
+    class Config:
+        from_attributes = True
 
 
 class OrderUpdate(BaseModel):
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, time
 
 
 class WorkerCreate(BaseModel):
@@ -68,4 +68,34 @@ class ForgotPasswordRequest(BaseModel):
 class ResetPasswordRequest(BaseModel):
     email: EmailStr
     reset_code: str
-    new_password: str 
\ No newline at end of file
+    new_password: str 
+
+
+class AvailabilitySlot(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class WorkerAvailabilityResponse(BaseModel):
+    worker_id: int
+    start: datetime
+    end: datetime
+    slot_minutes: int
+    free_slots: List[AvailabilitySlot]
+
+
+class WorkingHours(BaseModel):
+    weekday: int  # 0 = Monday ... 6 = Sunday
+    start_time: time  # UTC, on a 15-minute boundary
+    end_time: time
+
+    class Config:
+        from_attributes = True
+
+
+class AvailableWorkersResponse(BaseModel):
+    category_id: int
+    start: datetime
+    end: datetime
+    total: int
+    workers: List[WorkerResponse]
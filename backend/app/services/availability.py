@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.order import ACTIVE_ORDER_STATUSES, BookingHold, Order
+from app.services.booking_index import booking_index, naive_utc
+
+Interval = Tuple[datetime, datetime]
+
+
+def free_slots(busy: List[Interval], start: datetime, end: datetime, slot: timedelta) -> List[Interval]:
+    """Sweep the busy intervals in start order and cut each free gap into ``slot``-long pieces."""
+    slots = []
+    cursor = start
+    for busy_start, busy_end in sorted(busy) + [(end, end)]:
+        gap_end = min(busy_start, end)
+        while cursor + slot <= gap_end:
+            slots.append((cursor, cursor + slot))
+            cursor += slot
+        if busy_end > cursor:
+            cursor = busy_end
+        if cursor >= end:
+            break
+    return slots
+
+
+class AvailabilityCache:
+    """Free-slot results per worker, valid while the worker's booking generation is unchanged.
+
+    Every committed order or hold change of a worker bumps its generation in
+    ``booking_index``, which invalidates all cached windows of that worker.
+    Entries also expire after ``ttl_seconds`` (changes made by other
+    processes) and when the first hold they account for runs out.
+    """
+
+    max_windows_per_worker = 32
+
+    def __init__(self, ttl_seconds: int, max_workers: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self._workers: "OrderedDict[int, Tuple[int, Dict[tuple, Tuple[float, list]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, worker_id: int, key: tuple):
+        generation = booking_index.generation(worker_id)
+        with self._lock:
+            entry = self._workers.get(worker_id)
+            if entry is not None and entry[0] == generation:
+                cached = entry[1].get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._workers.move_to_end(worker_id)
+                    self.hits += 1
+                    return cached[1]
+            self.misses += 1
+            return None
+
+    def set(self, worker_id: int, key: tuple, slots: list, generation: int, ttl_seconds: float):
+        with self._lock:
+            entry = self._workers.get(worker_id)
+            if entry is None or entry[0] != generation:
+                entry = (generation, {})
+                self._workers[worker_id] = entry
+            windows = entry[1]
+            windows[key] = (time.monotonic() + ttl_seconds, slots)
+            if len(windows) > self.max_windows_per_worker:
+                del windows[next(iter(windows))]
+            self._workers.move_to_end(worker_id)
+            while len(self._workers) > self.max_workers:
+                self._workers.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": len(self._workers), "hits": self.hits, "misses": self.misses}
+
+
+# Global availability cache instance
+availability_cache = AvailabilityCache(
+    ttl_seconds=settings.availability_cache_ttl_seconds,
+    max_workers=settings.booking_index_max_workers,
+)
+
+
+async def get_free_slots(db: AsyncSession, worker_id: int, start: datetime, end: datetime,
+                         slot: timedelta) -> List[Interval]:
+    """Free ``slot``-long windows of ``worker_id`` in [start, end), from one read of orders and holds."""
+    start, end = naive_utc(start), naive_utc(end)
+    key = (start, end, slot)
+    cached = availability_cache.get(worker_id, key)
+    if cached is not None:
+        return cached
+
+    generation = booking_index.generation(worker_id)
+    now = datetime.utcnow()
+    orders = (await db.execute(
+        select(Order.scheduled_date, Order.scheduled_end).where(
+            Order.worker_id == worker_id,
+            Order.status.in_(ACTIVE_ORDER_STATUSES),
+            Order.scheduled_date < end,
+            Order.scheduled_end > start,
+        )
+    )).all()
+    holds = (await db.execute(
+        select(BookingHold.scheduled_date, BookingHold.scheduled_end, BookingHold.expires_at).where(
+            BookingHold.worker_id == worker_id,
+            BookingHold.expires_at > now,
+            BookingHold.scheduled_date < end,
+            BookingHold.scheduled_end > start,
+        )
+    )).all()
+
+    busy = [(row_start, row_end) for row_start, row_end in orders]
+    busy.extend((row_start, row_end) for row_start, row_end, _ in holds)
+    slots = free_slots(busy, start, end, slot)
+
+    ttl_seconds = float(availability_cache.ttl_seconds)
+    for _, _, expires_at in holds:
+        # A hold running out frees its slot without any commit to invalidate the entry
+        ttl_seconds = min(ttl_seconds, (expires_at - now).total_seconds())
+    availability_cache.set(worker_id, key, slots, generation, ttl_seconds)
+    return slots
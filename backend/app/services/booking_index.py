@@ -0,0 +1,291 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.order import ACTIVE_ORDER_STATUSES, BookingHold, Order
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class _Node:
+    __slots__ = ("key", "end", "order_id", "priority", "left", "right", "max_end")
+
+    def __init__(self, start: datetime, end: datetime, order_id: int):
+        self.key = (start, order_id)
+        self.end = end
+        self.order_id = order_id
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_end = end
+
+    def update(self):
+        self.max_end = self.end
+        if self.left is not None and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+def _split(node, key):
+    """Split a treap into the nodes ordered before ``key`` and the rest."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        node.update()
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    node.update()
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class IntervalTree:
+    """Treap of [start, end) intervals ordered by start and augmented with the
+    largest end in each subtree, so inserts, removals and overlap queries take
+    O(log n) expected time."""
+
+    def __init__(self):
+        self._root = None
+        self._starts: Dict[int, datetime] = {}
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start: datetime, end: datetime, order_id: int):
+        self.remove(order_id)
+        left, right = _split(self._root, (start, order_id))
+        self._root = _merge(_merge(left, _Node(start, end, order_id)), right)
+        self._starts[order_id] = start
+
+    def remove(self, order_id: int):
+        start = self._starts.pop(order_id, None)
+        if start is None:
+            return
+        left, rest = _split(self._root, (start, order_id))
+        _, right = _split(rest, (start, order_id + 1))
+        self._root = _merge(left, right)
+
+    def find_overlap(self, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> Optional[int]:
+        """Id of an interval overlapping [start, end), or None."""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            if node.key[0] < end:
+                if node.end > start and node.order_id != exclude_id:
+                    return node.order_id
+                # Later starts can still overlap only while they begin before ``end``
+                stack.append(node.right)
+            stack.append(node.left)
+        return None
+
+
+class _WorkerBookings:
+    def __init__(self, expires_at: float):
+        self.tree = IntervalTree()
+        self.expires_at = expires_at
+
+
+class BookingIndex:
+    """Per-process interval trees of each worker's active scheduled orders.
+
+    A worker's tree is loaded from the database on its first conflict check
+    and then kept current from committed sessions in this process (see the
+    session hooks below). Orders written by other processes become visible
+    when the tree expires after ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: int, max_workers: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max_workers
+        self._workers: "OrderedDict[int, _WorkerBookings]" = OrderedDict()
+        # Bumped on every committed schedule change of a worker, so a load that
+        # raced a commit is discarded and cached availability can be validated
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.hits = 0
+        self.loads = 0
+
+    def generation(self, worker_id: int) -> int:
+        with self._lock:
+            return self._generations.get(worker_id, 0)
+
+    def find_conflict(self, worker_id: int, start: datetime, end: datetime,
+                      exclude_order_id: Optional[int] = None) -> Optional[int]:
+        """Conflicting order id, 0 when the slot is free, or None when the worker is not loaded."""
+        with self._lock:
+            bookings = self._workers.get(worker_id)
+            if bookings is None or bookings.expires_at <= time.monotonic():
+                return None
+            self._workers.move_to_end(worker_id)
+            self.hits += 1
+            return bookings.tree.find_overlap(start, end, exclude_order_id) or 0
+
+    def load(self, worker_id: int, rows, generation: int):
+        bookings = _WorkerBookings(time.monotonic() + self.ttl_seconds)
+        for order_id, start, end in rows:
+            bookings.tree.add(start, end, order_id)
+        with self._lock:
+            self.loads += 1
+            if self._generations.get(worker_id, 0) != generation:
+                return
+            self._workers[worker_id] = bookings
+            self._workers.move_to_end(worker_id)
+            while len(self._workers) > self.max_workers:
+                self._workers.popitem(last=False)
+
+    def subscribe(self, listener):
+        """Call ``listener(changes)`` with every batch of committed order changes."""
+        self._listeners.append(listener)
+
+    def apply(self, changes):
+        """Fold committed ``(order_id, worker_id, active, start, end)`` rows into loaded trees."""
+        with self._lock:
+            for order_id, worker_id, active, start, end in changes:
+                self._generations[worker_id] = self._generations.get(worker_id, 0) + 1
+                bookings = self._workers.get(worker_id)
+                if bookings is None:
+                    continue
+                if active:
+                    bookings.tree.add(start, end, order_id)
+                else:
+                    bookings.tree.remove(order_id)
+        for listener in self._listeners:
+            listener(changes)
+
+    def touch(self, worker_ids):
+        """Record a committed schedule change (such as a hold) that is not in the trees."""
+        with self._lock:
+            for worker_id in worker_ids:
+                self._generations[worker_id] = self._generations.get(worker_id, 0) + 1
+
+    def invalidate(self, worker_id: Optional[int] = None):
+        with self._lock:
+            if worker_id is None:
+                self._workers.clear()
+            else:
+                self._workers.pop(worker_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "bookings": sum(len(b.tree) for b in self._workers.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+
+# Global booking index instance
+booking_index = BookingIndex(
+    ttl_seconds=settings.booking_index_ttl_seconds,
+    max_workers=settings.booking_index_max_workers,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_order_changes(session, flush_context):
+    changes = session.info.setdefault("booking_changes", [])
+    touched = session.info.setdefault("booking_touched", set())
+    for instance in session.new | session.dirty:
+        if isinstance(instance, Order):
+            active = instance.status in ACTIVE_ORDER_STATUSES and instance.scheduled_date is not None
+            changes.append((instance.id, instance.worker_id, active, instance.scheduled_date, instance.scheduled_end))
+        elif isinstance(instance, BookingHold):
+            touched.add(instance.worker_id)
+    for instance in session.deleted:
+        if isinstance(instance, Order):
+            changes.append((instance.id, instance.worker_id, False, None, None))
+        elif isinstance(instance, BookingHold):
+            touched.add(instance.worker_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_order_changes(session):
+    changes = session.info.pop("booking_changes", None)
+    if changes:
+        booking_index.apply(changes)
+    touched = session.info.pop("booking_touched", None)
+    if touched:
+        booking_index.touch(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_order_changes(session):
+    session.info.pop("booking_changes", None)
+    session.info.pop("booking_touched", None)
+
+
+async def find_conflicting_order(db: AsyncSession, worker_id: int, start: datetime, end: datetime,
+                                 exclude_order_id: Optional[int] = None, use_index: bool = True) -> Optional[int]:
+    """Id of an active order of ``worker_id`` overlapping [start, end), or None.
+
+    Postgres answers from the GiST range index on (worker_id, tsrange); other
+    databases use the in-process interval tree unless ``use_index`` is False,
+    which reads the committed rows instead (for checks made under the
+    reservation lock, where another process's booking must not be missed).
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    active = (
+        Order.worker_id == worker_id,
+        Order.status.in_(ACTIVE_ORDER_STATUSES),
+        Order.scheduled_date.isnot(None),
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = select(Order.id).where(
+            *active,
+            func.tsrange(Order.scheduled_date, Order.scheduled_end).op("&&")(func.tsrange(start, end)),
+        )
+        if exclude_order_id is not None:
+            query = query.where(Order.id != exclude_order_id)
+        return (await db.execute(query.limit(1))).scalar()
+    if not use_index:
+        query = select(Order.id).where(*active, Order.scheduled_date < end, Order.scheduled_end > start)
+        if exclude_order_id is not None:
+            query = query.where(Order.id != exclude_order_id)
+        return (await db.execute(query.limit(1))).scalar()
+
+    conflict = booking_index.find_conflict(worker_id, start, end, exclude_order_id)
+    if conflict is None:
+        generation = booking_index.generation(worker_id)
+        rows = (await db.execute(
+            select(Order.id, Order.scheduled_date, Order.scheduled_end).where(*active)
+        )).all()
+        booking_index.load(worker_id, rows, generation)
+        conflict = booking_index.find_conflict(worker_id, start, end, exclude_order_id)
+        if conflict is None:
+            # Evicted or raced a concurrent commit; answer from the rows just read
+            tree = IntervalTree()
+            for order_id, row_start, row_end in rows:
+                tree.add(row_start, row_end, order_id)
+            conflict = tree.find_overlap(start, end, exclude_order_id) or 0
+    return conflict or None
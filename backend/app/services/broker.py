@@ -0,0 +1,193 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+# Receives (topic, message) for every published event
+Handler = Callable[[str, str], Awaitable[None]]
+
+
+class Broker(ABC):
+    """Fans realtime events out to every app process.
+
+    ``publish`` sends a text ``message`` (serialized once by the caller) on a
+    ``topic`` such as ``chat:12``. Every process that started the broker,
+    the publishing one included, hands it to its handler exactly once; the
+    handler delivers it to the sockets that process holds.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    @abstractmethod
+    async def publish(self, topic: str, message: str):
+        pass
+
+    async def _deliver(self, topic: str, message: str):
+        if self._handler is None:
+            return
+        try:
+            await self._handler(topic, message)
+        except Exception as e:
+            print(f"Warning: failed to deliver {topic} event: {e}")
+
+
+class InProcessBroker(Broker):
+    """Delivers straight to this process; enough for a single worker."""
+
+    name = "memory"
+
+    async def publish(self, topic: str, message: str):
+        await self._deliver(topic, message)
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub, one channel per topic under ``prefix``.
+
+    Any server speaking the Redis protocol works, including a local stand-in
+    such as fakeredis's TcpFakeServer. Needs the ``redis`` package.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "helpmate:"):
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self._redis = None
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler):
+        import redis.asyncio as redis
+
+        await super().start(handler)
+        self._redis = redis.from_url(self.url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{self.prefix}*")
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    if item["type"] == "pmessage":
+                        topic = item["channel"].decode()[len(self.prefix):]
+                        await self._deliver(topic, item["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # redis-py reconnects and resubscribes on the next read
+                print(f"Warning: Redis broker connection lost, retrying: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, topic: str, message: str):
+        await self._redis.publish(f"{self.prefix}{topic}", message)
+
+    async def stop(self):
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+class PostgresBroker(Broker):
+    """Postgres LISTEN/NOTIFY on a single channel, with the topic framed into the payload.
+
+    NOTIFY payloads are limited to 8000 bytes; larger events are delivered to
+    this process only, with a warning.
+    """
+
+    name = "postgres"
+    channel = "helpmate_events"
+    max_payload_bytes = 7999
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self._listener = None
+        self._pool = None
+        self._tasks = set()
+
+    async def start(self, handler: Handler):
+        import asyncpg
+
+        await super().start(handler)
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        await self._listen()
+
+    async def _listen(self):
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_lost)
+        await self._listener.add_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        topic, _, message = payload.partition("\n")
+        self._spawn(self._deliver(topic, message))
+
+    def _on_lost(self, connection):
+        if self._handler is not None:
+            self._spawn(self._reconnect())
+
+    async def _reconnect(self):
+        while self._handler is not None:
+            try:
+                await self._listen()
+                return
+            except Exception as e:
+                print(f"Warning: Postgres broker connection lost, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def publish(self, topic: str, message: str):
+        payload = f"{topic}\n{message}"
+        if len(payload.encode()) > self.max_payload_bytes:
+            print(f"Warning: {topic} event too large for NOTIFY, delivered to this process only")
+            await self._deliver(topic, message)
+            return
+        async with self._pool.acquire() as connection:
+            await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self):
+        await super().stop()
+        if self._listener is not None:
+            self._listener.remove_termination_listener(self._on_lost)
+            await self._listener.close()
+        if self._pool is not None:
+            await self._pool.close()
+
+
+def create_broker(kind: str) -> Broker:
+    if kind == "redis":
+        return RedisBroker(settings.redis_url)
+    if kind == "postgres":
+        # asyncpg takes a plain postgresql:// DSN, without the SQLAlchemy driver suffix
+        dsn = make_url(settings.database_url).set(drivername="postgresql")
+        return PostgresBroker(dsn.render_as_string(hide_password=False))
+    return InProcessBroker()
+
+
+# Global broker instance
+broker = create_broker(settings.realtime_broker)
@@ -0,0 +1,161 @@
+import asyncio
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, insert, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.chat import Chat, Message
+from app.schemas.chat import MessageResponse
+from app.services.realtime import publish_chat_message
+
+
+class _Pending:
+    __slots__ = ("chat_id", "user_id", "worker_id", "sender_type", "sender_id", "content", "future")
+
+    def __init__(self, chat: Chat, sender_type: str, sender_id: int, content: str, future: asyncio.Future):
+        self.chat_id = chat.id
+        self.user_id = chat.user_id
+        self.worker_id = chat.worker_id
+        self.sender_type = sender_type
+        self.sender_id = sender_id
+        self.content = content
+        self.future = future
+
+
+class ChatWriter:
+    """Inserts chat messages sent over WebSockets in small group commits.
+
+    ``submit`` queues a message and returns a future that resolves, once its
+    batch has committed, to the message's serialized MessageResponse. A batch
+    is written when it reaches ``max_batch`` messages or ``max_delay`` seconds
+    after it started filling: one multi-row INSERT, one summary UPDATE per
+    chat and a single commit. Committed messages are then broadcast.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float, max_pending: int):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: List[_Pending] = []
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        # Bounds queued messages; a full writer makes submitters wait
+        self._slots = asyncio.Semaphore(max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.batches = 0
+        self.messages = 0
+        self.failed_batches = 0
+
+    async def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write whatever is still queued, then stop."""
+        self._stopping = True
+        self._arrived.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def submit(self, chat: Chat, sender_type: str, sender_id: int, content: str) -> asyncio.Future:
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(_Pending(chat, sender_type, sender_id, content, future))
+        self._arrived.set()
+        if len(self._queue) >= self.max_batch:
+            self._full.set()
+        return future
+
+    async def _run(self):
+        while self._queue or not self._stopping:
+            await self._arrived.wait()
+            if len(self._queue) < self.max_batch and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            if self._queue:
+                await self._flush()
+
+    async def _flush(self):
+        batch = self._queue[:self.max_batch]
+        del self._queue[:self.max_batch]
+        if len(self._queue) < self.max_batch:
+            self._full.clear()
+        if not self._queue:
+            self._arrived.clear()
+        try:
+            frames = await self._write(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Warning: failed to write {len(batch)} chat messages: {e}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finally:
+            for _ in batch:
+                self._slots.release()
+        self.batches += 1
+        self.messages += len(batch)
+        for pending, frame in zip(batch, frames):
+            if not pending.future.done():
+                pending.future.set_result(frame)
+        for pending, frame in zip(batch, frames):
+            try:
+                await publish_chat_message(pending.chat_id, pending.user_id, pending.worker_id, frame)
+            except Exception as e:
+                print(f"Warning: failed to broadcast chat message: {e}")
+
+    async def _write(self, batch: List[_Pending]) -> List[str]:
+        async with AsyncSessionLocal() as db:
+            messages = (await db.execute(
+                insert(Message).returning(Message, sort_by_parameter_order=True),
+                [
+                    {
+                        "chat_id": pending.chat_id,
+                        "sender_type": pending.sender_type,
+                        "sender_id": pending.sender_id,
+                        "content": pending.content,
+                    }
+                    for pending in batch
+                ],
+            )).scalars().all()
+
+            # Same summary columns _add_message maintains, one row per chat in the batch
+            summaries: Dict[int, dict] = {}
+            for message in messages:
+                summary = summaries.setdefault(
+                    message.chat_id, {"chat": message.chat_id, "last": 0, "to_user": 0, "to_worker": 0}
+                )
+                summary["last"] = max(summary["last"], message.id)
+                summary["to_worker" if message.sender_type == "user" else "to_user"] += 1
+            chats = Chat.__table__
+            await db.execute(
+                update(chats).where(chats.c.id == bindparam("chat")).values(
+                    last_message_id=bindparam("last"),
+                    last_message_at=func.now(),
+                    user_unread_count=chats.c.user_unread_count + bindparam("to_user"),
+                    worker_unread_count=chats.c.worker_unread_count + bindparam("to_worker"),
+                ),
+                list(summaries.values()),
+            )
+            frames = [MessageResponse.from_orm(message).json() for message in messages]
+            await db.commit()
+            return frames
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "batches": self.batches,
+            "messages": self.messages,
+            "failed_batches": self.failed_batches,
+        }
+
+
+# Global chat writer instance
+chat_writer = ChatWriter(
+    max_batch=settings.chat_write_batch_size,
+    max_delay=settings.chat_write_batch_delay_ms / 1000,
+    max_pending=settings.chat_write_max_pending,
+)
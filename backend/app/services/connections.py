@@ -0,0 +1,308 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+from fastapi import WebSocket, WebSocketDisconnect
+from app.core.config import settings
+from app.services.framing import decode_message, pack_frame
+
+# Close code sent to evicted slow consumers ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code sent to reaped idle connections ("going away")
+IDLE_CLOSE_CODE = 1001
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident memory of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Connection:
+    """A WebSocket with a bounded outbound queue drained by its own task.
+
+    Frames are offered without waiting, so a slow client only ever delays
+    itself. The hub evicts it when its queue overflows, a single send stalls
+    for longer than the hub's send timeout or the client has been silent for
+    the hub's idle timeout; ``serve`` then returns so the endpoint ends and
+    the socket is closed.
+
+    Frames are offered as serialized JSON; a ``packed`` connection (one that
+    negotiated MessagePack) is sent them as MessagePack binary frames.
+    """
+
+    def __init__(self, websocket: WebSocket, hub: "ConnectionHub", packed: bool = False):
+        self.websocket = websocket
+        self.hub = hub
+        self.packed = packed
+        self.queue: "asyncio.Queue[Tuple[Union[str, bytes], int]]" = asyncio.Queue(maxsize=hub.max_queue)
+        self.topics: Set[str] = set()
+        self.closed = False
+        self.last_seen = time.monotonic()
+        self.queued_bytes = 0
+        self.bytes_sent = 0
+        self._evicted = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    def offer(self, frame: str, size: Optional[int] = None, packed: Optional[bytes] = None):
+        """Queue a JSON frame; ``size`` and ``packed`` pass in its byte length and MessagePack form when known."""
+        if self.closed:
+            return
+        if self.packed:
+            data = packed if packed is not None else pack_frame(frame)
+            size = len(data)
+        else:
+            data = frame
+            if size is None:
+                size = len(frame.encode())
+        try:
+            self.queue.put_nowait((data, size))
+        except asyncio.QueueFull:
+            self.hub.evict(self, "overflow")
+            return
+        self.queued_bytes += size
+
+    async def _drain(self):
+        while True:
+            data, size = await self.queue.get()
+            self.queued_bytes -= size
+            send = self.websocket.send_bytes(data) if self.packed else self.websocket.send_text(data)
+            try:
+                await asyncio.wait_for(send, timeout=self.hub.send_timeout)
+            except asyncio.TimeoutError:
+                self.hub.evict(self, "stalled")
+                return
+            except Exception:
+                # The client went away; the endpoint's receive loop unregisters it
+                self.hub.remove(self)
+                return
+            self.bytes_sent += size
+            self.hub.frames_sent += 1
+            self.hub.bytes_sent += size
+
+    async def receive_frame(self) -> Optional[dict]:
+        """The client's next frame, JSON text or MessagePack bytes, as a dict (None if it is neither).
+
+        Any frame, heartbeats included, keeps the connection alive.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+        self.last_seen = time.monotonic()
+        return decode_message(message)
+
+    async def serve(self, receiver: Awaitable):
+        """Run the endpoint's ``receiver`` until it returns or this connection is evicted."""
+        receiving = asyncio.ensure_future(receiver)
+        evicted = asyncio.ensure_future(self._evicted.wait())
+        try:
+            await asyncio.wait({receiving, evicted}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            receiving.cancel()
+            evicted.cancel()
+        if receiving.done() and not receiving.cancelled():
+            receiving.result()
+
+    async def close(self, code: int):
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.hub.send_timeout)
+        except Exception:
+            pass
+
+
+class EventStream(Connection):
+    """A Server-Sent Events client, subscribed and evicted like a socket.
+
+    ``render`` turns each broker frame into an SSE event, or None to skip
+    it; ``events`` is the streaming response body. Keepalive comments count
+    as the client's sign of life, since an event stream never sends
+    anything back; a client that went away surfaces as a failed write.
+    """
+
+    def __init__(self, hub: "ConnectionHub", render: Callable[[str], Optional[str]]):
+        super().__init__(None, hub)
+        self.render = render
+
+    def start(self):
+        # The streaming response drains the queue
+        pass
+
+    def offer(self, frame: str, size: Optional[int] = None, packed: Optional[bytes] = None):
+        event = self.render(frame)
+        if event is not None:
+            super().offer(event)
+
+    async def events(self, keepalive: float, lifetime: float) -> AsyncIterator[str]:
+        """The response body; it ends after ``lifetime`` seconds so server shutdowns never wait on it."""
+        deadline = time.monotonic() + lifetime
+        try:
+            while not self.closed:
+                try:
+                    event, size = await asyncio.wait_for(
+                        self.queue.get(), timeout=max(min(keepalive, deadline - time.monotonic()), 0)
+                    )
+                except asyncio.TimeoutError:
+                    if time.monotonic() >= deadline:
+                        return
+                    event, size = ": keepalive\n\n", 0
+                else:
+                    self.queued_bytes -= size
+                yield event
+                self.last_seen = time.monotonic()
+                if size:
+                    self.bytes_sent += size
+                    self.hub.frames_sent += 1
+                    self.hub.bytes_sent += size
+        finally:
+            self.hub.remove(self)
+
+    async def close(self, code: int):
+        pass
+
+
+class ConnectionHub:
+    """This process's WebSocket connections, grouped by broker topic.
+
+    Half-open sockets are dropped by the server's protocol-level ping/pong
+    (``websocket_ping_interval_seconds``, applied by ``python main.py`` or the
+    uvicorn ``--ws-ping-interval``/``--ws-ping-timeout`` flags; an ASGI app
+    cannot send pings itself); the reaper started by ``start``
+    also closes sockets whose client has sent nothing for ``idle_timeout``
+    seconds.
+    """
+
+    def __init__(self, max_queue: int, send_timeout: float, idle_timeout: float, reap_interval: float):
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._topics: Dict[str, Set[Connection]] = {}
+        self._connections: Set[Connection] = set()
+        self._tasks = set()
+        self._reaper: Optional[asyncio.Task] = None
+        self._baseline_rss: Optional[int] = None
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.peak_connections = 0
+        self.evictions = {"overflow": 0, "stalled": 0, "idle": 0}
+
+    async def start(self):
+        self._baseline_rss = _rss_bytes()
+        if self.idle_timeout > 0:
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for connection in [c for c in self._connections if c.last_seen < deadline]:
+                self.evict(connection, "idle", IDLE_CLOSE_CODE)
+
+    def connect(self, websocket: WebSocket, packed: bool = False) -> Connection:
+        return self.register(Connection(websocket, self, packed))
+
+    def register(self, connection: Connection) -> Connection:
+        connection.start()
+        self._connections.add(connection)
+        self.peak_connections = max(self.peak_connections, len(self._connections))
+        return connection
+
+    def subscribe(self, connection: Connection, topic: str):
+        connection.topics.add(topic)
+        self._topics.setdefault(topic, set()).add(connection)
+
+    def remove(self, connection: Connection):
+        if connection.closed:
+            return
+        connection.closed = True
+        self._connections.discard(connection)
+        for topic in connection.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self._topics[topic]
+        if connection._task is not None and connection._task is not asyncio.current_task():
+            connection._task.cancel()
+
+    def evict(self, connection: Connection, reason: str, code: int = SLOW_CONSUMER_CLOSE_CODE):
+        if connection.closed:
+            return
+        self.evictions[reason] += 1
+        self.remove(connection)
+        connection._evicted.set()
+        task = asyncio.get_running_loop().create_task(connection.close(code))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def deliver(self, topic: str, message: str):
+        """Broker handler: queue one already-serialized frame for every local subscriber."""
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return
+        size = len(message.encode())
+        packed = None
+        for connection in list(subscribers):
+            # Pack at most once per message, however many subscribers asked for MessagePack
+            if connection.packed and packed is None:
+                packed = pack_frame(message)
+            connection.offer(message, size, packed)
+
+    def _fanout(self) -> Dict[str, dict]:
+        """Subscribers per topic, grouped by topic kind (chat, user, worker)."""
+        kinds: Dict[str, list] = {}
+        for topic, subscribers in self._topics.items():
+            kinds.setdefault(topic.partition(":")[0], []).append(len(subscribers))
+        return {
+            kind: {"topics": len(counts), "max": max(counts), "mean": round(sum(counts) / len(counts), 2)}
+            for kind, counts in kinds.items()
+        }
+
+    def stats(self) -> dict:
+        depths = [connection.queue.qsize() for connection in self._connections]
+        count = len(self._connections)
+        rss = _rss_bytes()
+        per_connection = None
+        if count and rss is not None and self._baseline_rss is not None:
+            # Growth in process memory since startup, spread over the open sockets
+            per_connection = max(rss - self._baseline_rss, 0) // count
+        return {
+            "connections": count,
+            "peak_connections": self.peak_connections,
+            "topics": len(self._topics),
+            "fanout": self._fanout(),
+            "queued_frames": sum(depths),
+            "queued_bytes": sum(connection.queued_bytes for connection in self._connections),
+            "max_queue_depth": max(depths, default=0),
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "rss_bytes": rss,
+            "estimated_bytes_per_connection": per_connection,
+            "evictions": dict(self.evictions),
+        }
+
+
+# Global connection hub instance
+connection_hub = ConnectionHub(
+    max_queue=settings.websocket_send_queue_size,
+    send_timeout=settings.websocket_send_timeout_seconds,
+    idle_timeout=settings.websocket_idle_timeout_seconds,
+    reap_interval=settings.websocket_reap_interval_seconds,
+)
@@ -0,0 +1,247 @@
+import asyncio
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.policy import SMTP
+from email.utils import formatdate, make_msgid
+from typing import List, Optional
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.outbound_email import OutboundEmail
+from app.services.smtp_client import SMTPConnection, SMTPError
+
+
+class _Claimed:
+    __slots__ = ("id", "recipient", "subject", "html_body", "text_body", "attempts")
+
+    def __init__(self, row):
+        self.id = row.id
+        self.recipient = row.recipient
+        self.subject = row.subject
+        self.html_body = row.html_body
+        self.text_body = row.text_body
+        self.attempts = row.attempts
+
+
+class EmailQueue:
+    """Sends queued emails over a small pool of long-lived SMTP connections.
+
+    Batches are claimed from outbound_emails with a lease, the same way the
+    outbox dispatcher claims events, and split across the pool; each
+    connection pipelines its share. Accepted emails are deleted, temporary
+    failures retried with exponential backoff, and permanent rejections or
+    emails out of attempts are marked dead.
+    """
+
+    def __init__(self, pool_size: int, batch_size: int, poll_interval: float, max_attempts: int,
+                 retry_base: float, retry_max: float, lease: float, idle_timeout: float):
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self.idle_timeout = idle_timeout
+        self._connections: List[SMTPConnection] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.connections_opened = 0
+
+    @property
+    def sender(self) -> str:
+        return settings.smtp_sender or settings.smtp_username or "noreply@localhost"
+
+    def _new_connection(self) -> SMTPConnection:
+        return SMTPConnection(
+            host=settings.smtp_server or "smtp.gmail.com",
+            port=settings.smtp_port or 587,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            starttls=settings.smtp_starttls,
+            timeout=settings.smtp_timeout_seconds,
+        )
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Finish the batch being sent, close the SMTP connections and stop."""
+        self._stopping = True
+        self._loop = None
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await asyncio.gather(*(connection.close() for connection in self._connections))
+        self._connections = []
+
+    def wake(self):
+        """Send newly queued emails now instead of at the next poll; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                print(f"Warning: email queue failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """Claim and send one batch; returns the number of emails claimed."""
+        lease, claimed = await self._claim()
+        if not claimed:
+            return 0
+        self.batches += 1
+        while len(self._connections) < min(self.pool_size, len(claimed)):
+            self._connections.append(self._new_connection())
+        shares = [claimed[i::len(self._connections)] for i in range(len(self._connections))]
+        outcomes = await asyncio.gather(*(
+            self._send(connection, share) for connection, share in zip(self._connections, shares) if share
+        ))
+        results = [(item, error) for share, errors in zip(shares, outcomes) for item, error in zip(share, errors)]
+        await self._record(lease, results)
+        return len(claimed)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=self.lease)
+        due = (
+            select(OutboundEmail.id)
+            .where(OutboundEmail.status == "pending", OutboundEmail.available_at <= now)
+            .order_by(OutboundEmail.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                update(OutboundEmail)
+                .where(OutboundEmail.id.in_(due), OutboundEmail.available_at <= now)
+                .values(available_at=lease)
+                .returning(OutboundEmail.id, OutboundEmail.recipient, OutboundEmail.subject,
+                           OutboundEmail.html_body, OutboundEmail.text_body, OutboundEmail.attempts)
+            )).all()
+            await db.commit()
+        return lease, sorted((_Claimed(row) for row in rows), key=lambda item: item.id)
+
+    def _message(self, item: _Claimed) -> bytes:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = item.recipient
+        message["Subject"] = item.subject
+        message["Date"] = formatdate(usegmt=True)
+        message["Message-ID"] = make_msgid(domain=self.sender.rpartition("@")[2] or None)
+        if item.text_body:
+            # multipart/alternative: clients that do not render HTML show the text part
+            message.set_content(item.text_body)
+            message.add_alternative(item.html_body, subtype="html")
+        else:
+            message.set_content(item.html_body, subtype="html")
+        return message.as_bytes(policy=SMTP)
+
+    async def _send(self, connection: SMTPConnection, share: List[_Claimed]) -> List[Optional[Exception]]:
+        loop = asyncio.get_running_loop()
+        if connection.is_open and loop.time() - connection.last_used > self.idle_timeout:
+            await connection.close()
+        if not connection.is_open:
+            try:
+                await connection.open()
+            except Exception as e:
+                # Not the messages' fault (bad credentials included): retry them later
+                return [ConnectionError(f"SMTP connection failed: {e}")] * len(share)
+            self.connections_opened += 1
+        return await connection.send_batch(self.sender, [(item.recipient, self._message(item)) for item in share])
+
+    async def _record(self, lease: datetime, results):
+        now = datetime.utcnow()
+        sent = [item.id for item, error in results if error is None]
+        async with AsyncSessionLocal() as db:
+            if sent:
+                await db.execute(
+                    delete(OutboundEmail).where(OutboundEmail.id.in_(sent), OutboundEmail.available_at == lease)
+                )
+            for item, error in results:
+                if error is None:
+                    continue
+                attempts = item.attempts + 1
+                dead = (isinstance(error, SMTPError) and error.permanent) or attempts >= self.max_attempts
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+                await db.execute(
+                    update(OutboundEmail)
+                    .where(OutboundEmail.id == item.id, OutboundEmail.available_at == lease)
+                    .values(
+                        attempts=attempts,
+                        last_error=str(error)[:1000],
+                        available_at=now + timedelta(seconds=delay),
+                        status="dead" if dead else "pending",
+                    )
+                )
+                if dead:
+                    self.dead += 1
+                    print(f"Warning: email {item.id} to {item.recipient} is dead after {attempts} attempts: {error}")
+                else:
+                    self.retried += 1
+            await db.commit()
+        self.sent += len(sent)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+            "open_connections": sum(1 for connection in self._connections if connection.is_open),
+            "connections_opened": self.connections_opened,
+        }
+
+
+# Global email queue instance
+email_queue = EmailQueue(
+    pool_size=settings.smtp_pool_size,
+    batch_size=settings.email_batch_size,
+    poll_interval=settings.email_poll_interval_seconds,
+    max_attempts=settings.email_max_attempts,
+    retry_base=settings.email_retry_base_seconds,
+    retry_max=settings.email_retry_max_seconds,
+    lease=settings.email_lease_seconds,
+    idle_timeout=settings.smtp_idle_seconds,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_outbound_emails(session, flush_context):
+    if any(isinstance(instance, OutboundEmail) for instance in session.new):
+        session.info["outbound_emails"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_email_queue(session):
+    if session.info.pop("outbound_emails", None):
+        email_queue.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_outbound_emails(session):
+    session.info.pop("outbound_emails", None)
@@ -0,0 +1,132 @@
+import os
+import re
+from html.parser import HTMLParser
+from typing import Dict, Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+from markupsafe import Markup
+from app.core.config import settings
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email")
+LAYOUT = "layout.html"
+
+_INDENT = re.compile(r"\s*\n\s*")
+_BETWEEN_TAGS = re.compile(r">\s+<")
+_SPACES = re.compile(r"[ \t\r\n]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Stands in for the body when the layout is rendered once at load
+_CONTENT_MARKER = "\x1acontent\x1a"
+
+
+class _CompactLoader(FileSystemLoader):
+    # Indentation and whitespace between tags are dropped once, before compiling
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return _BETWEEN_TAGS.sub("><", _INDENT.sub(" ", source)).strip(), filename, uptodate
+
+
+class _TextConverter(HTMLParser):
+    _BLOCKS = {"p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "table", "tr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._href: Optional[str] = None
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("style", "script", "head"):
+            self._skip += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag in self._BLOCKS:
+            self.parts.append("\n\n")
+        elif tag == "a":
+            self._href = dict(attrs).get("href")
+
+    def handle_endtag(self, tag):
+        if tag in ("style", "script", "head"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self._BLOCKS:
+            self.parts.append("\n\n")
+        elif tag == "a" and self._href:
+            self.parts.append(f" ({self._href})")
+            self._href = None
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(_SPACES.sub(" ", data))
+
+
+def html_to_text(html: str) -> str:
+    """Plain-text version of an email body: blocks become paragraphs, list items dashes, links 'text (url)'."""
+    converter = _TextConverter()
+    converter.feed(html)
+    converter.close()
+    lines = (line.strip() for line in "".join(converter.parts).split("\n"))
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+class RenderedEmail:
+    __slots__ = ("html", "text")
+
+    def __init__(self, html: str, text: str):
+        self.html = html
+        self.text = text
+
+
+class EmailTemplates:
+    """Email bodies rendered from the Jinja2 templates in app/templates/email.
+
+    Templates are compiled once by load(), each body template twice: as HTML
+    and as a plain-text template converted from its source. The shared layout
+    (header, footer) does not vary per email, so it is rendered once as well
+    and cached as the HTML and text around the body; a send renders only the
+    two body templates.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR):
+        self.environment = Environment(
+            loader=_CompactLoader(directory),
+            autoescape=True,
+            auto_reload=False,
+            undefined=StrictUndefined,
+        )
+        self.text_environment = Environment(autoescape=False, undefined=StrictUndefined)
+        self._templates: Dict[str, Tuple[Template, Template]] = {}
+        self._html_chrome: Optional[tuple] = None
+        self._text_chrome: Optional[tuple] = None
+
+    def load(self):
+        """Compile every template and render the layout; call at startup."""
+        self.environment.globals["app_name"] = settings.app_name
+        self.text_environment.globals["app_name"] = settings.app_name
+        templates = {}
+        for name in self.environment.list_templates(extensions=["html"]):
+            if name == LAYOUT:
+                continue
+            source = self.environment.loader.get_source(self.environment, name)[0]
+            # Tags become line breaks and expressions stay put, so values are filled in unescaped
+            templates[name] = (
+                self.environment.get_template(name),
+                self.text_environment.from_string(html_to_text(source)),
+            )
+        layout = self.environment.get_template(LAYOUT).render(content=Markup(_CONTENT_MARKER))
+        head, tail = layout.split(_CONTENT_MARKER)
+        text_head, text_tail = html_to_text(layout).split(_CONTENT_MARKER)
+        self._templates = templates
+        self._html_chrome = (head, tail)
+        self._text_chrome = (text_head.rstrip() + "\n\n", "\n\n" + text_tail.lstrip())
+
+    def render(self, name: str, **context) -> RenderedEmail:
+        if self._html_chrome is None:
+            self.load()
+        html, text = self._templates[name]
+        head, tail = self._html_chrome
+        text_head, text_tail = self._text_chrome
+        return RenderedEmail(head + html.render(context) + tail, text_head + text.render(context) + text_tail)
+
+
+# Global email templates instance
+email_templates = EmailTemplates()
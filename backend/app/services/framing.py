@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional
+import msgpack
+
+# WebSocket subprotocol a client offers to receive MessagePack frames instead of JSON
+MSGPACK_SUBPROTOCOL = "helpmate.msgpack.v1"
+
+# Field names shortened on MessagePack frames; anything not listed keeps its name
+SHORT_KEYS = {
+    "type": "t",
+    "id": "i",
+    "chat_id": "c",
+    "client_id": "k",
+    "content": "b",
+    "created_at": "ts",
+    "detail": "d",
+    "is_read": "r",
+    "last_read_message_id": "lr",
+    "message": "m",
+    "notification": "n",
+    "order_id": "o",
+    "previous_status": "ps",
+    "reader": "rd",
+    "sender_id": "s",
+    "sender_type": "st",
+    "status": "S",
+    "title": "ti",
+    "token": "tk",
+    "up_to_message_id": "u",
+}
+LONG_KEYS = {short: key for key, short in SHORT_KEYS.items()}
+
+# ISO 8601 fields sent as integer Unix timestamps on MessagePack frames
+TIMESTAMP_KEYS = {"created_at"}
+
+
+def _epoch(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        # The database stores naive UTC; without this, timestamp() would read it as local time
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _shorten(value):
+    if isinstance(value, dict):
+        return {
+            SHORT_KEYS.get(key, key): _epoch(item) if key in TIMESTAMP_KEYS else _shorten(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_shorten(item) for item in value]
+    return value
+
+
+def _lengthen(value):
+    if isinstance(value, dict):
+        return {LONG_KEYS.get(key, key): _lengthen(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_lengthen(item) for item in value]
+    return value
+
+
+def pack_frame(frame: str) -> bytes:
+    """MessagePack form of a serialized JSON frame: short keys, epoch timestamps."""
+    return msgpack.packb(_shorten(json.loads(frame)))
+
+
+def unpack_frame(data: bytes) -> Optional[dict]:
+    """A client's MessagePack frame with its keys expanded, or None if it is not a map."""
+    try:
+        frame = msgpack.unpackb(data)
+    except (ValueError, TypeError):
+        return None
+    return _lengthen(frame) if isinstance(frame, dict) else None
+
+
+def decode_message(message: dict) -> Optional[dict]:
+    """A received ASGI WebSocket message as a dict: JSON text or MessagePack bytes; None if neither."""
+    if message.get("text") is not None:
+        try:
+            frame = json.loads(message["text"])
+        except ValueError:
+            return None
+        return frame if isinstance(frame, dict) else None
+    if message.get("bytes") is not None:
+        return unpack_frame(message["bytes"])
+    return None
@@ -0,0 +1,226 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.notification import Notification
+from app.models.order import Order
+from app.models.outbox import OutboxEvent
+from app.models.user import User
+from app.models.worker import Worker
+from app.services.email_service import email_service
+
+# Notification written to both sides of an order for each order event
+ORDER_NOTIFICATIONS = {
+    "order_booked": ("Order Booked", "Your order (ID: {id}) has been booked. Description: {description}"),
+    "order_completed": (
+        "Order Completed", "Your order (ID: {id}) has been marked as completed. Description: {description}"
+    ),
+}
+
+
+def order_event(kind: str, order: Order) -> OutboxEvent:
+    """Outbox row for an order event; add it to the session that changes the (flushed) order."""
+    return OutboxEvent(kind=kind, payload={"order_id": order.id})
+
+
+async def _deliver_order_event(db: AsyncSession, kind: str, payload: dict):
+    """Both sides' notifications and emails, committed with the event's removal."""
+    order = await db.get(Order, payload["order_id"])
+    if order is None:
+        return
+    title, message = ORDER_NOTIFICATIONS[kind]
+    message = message.format(id=order.id, description=order.description)
+    db.add(Notification(type=kind, title=title, message=message, user_id=order.user_id))
+    db.add(Notification(type=kind, title=title, message=message, worker_id=order.worker_id))
+    queue_email = (
+        email_service.queue_order_booked_email if kind == "order_booked" else email_service.queue_order_completed_email
+    )
+    for recipient in (await db.get(User, order.user_id), await db.get(Worker, order.worker_id)):
+        if recipient is not None:
+            queue_email(db, recipient.email, order)
+
+
+class _Claimed:
+    __slots__ = ("id", "kind", "payload", "attempts", "lease")
+
+    def __init__(self, row, lease: datetime):
+        self.id = row.id
+        self.kind = row.kind
+        self.payload = row.payload
+        self.attempts = row.attempts
+        self.lease = lease
+
+
+class OutboxDispatcher:
+    """Delivers pending outbox events in batches, retrying failures with exponential backoff.
+
+    A batch is claimed by pushing its ``available_at`` past a lease, so other
+    dispatchers (other API processes, ``outbox_worker.py``) skip it. Each
+    event is then delivered in its own transaction that also deletes the row,
+    which only succeeds while the lease is still held, so its notifications
+    and queued emails are written once. Commits that add outbox events wake
+    the dispatcher of their process; others find them on the next poll.
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float, max_attempts: int,
+                 retry_base: float, retry_max: float, lease: float):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.batches = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Finish the event being delivered, then stop; the rest stays in the outbox."""
+        self._stopping = True
+        self._loop = None
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def wake(self):
+        """Deliver new events now instead of at the next poll; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                delivered = await self.run_once()
+            except Exception as e:
+                print(f"Warning: outbox dispatch failed: {e}")
+                delivered = 0
+            if delivered < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self) -> int:
+        """Claim and deliver one batch; returns the number of events claimed."""
+        claimed = await self._claim()
+        if claimed:
+            self.batches += 1
+        for item in claimed:
+            if self._stopping:
+                break
+            await self._deliver(item)
+        return len(claimed)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        lease = now + timedelta(seconds=self.lease)
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.status == "pending", OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due), OutboxEvent.available_at <= now)
+                .values(available_at=lease)
+                .returning(OutboxEvent.id, OutboxEvent.kind, OutboxEvent.payload, OutboxEvent.attempts)
+            )).all()
+            await db.commit()
+        return sorted((_Claimed(row, lease) for row in rows), key=lambda item: item.id)
+
+    def _held(self, item: _Claimed):
+        return (OutboxEvent.id == item.id, OutboxEvent.available_at == item.lease)
+
+    async def _deliver(self, item: _Claimed):
+        async with AsyncSessionLocal() as db:
+            try:
+                await _deliver_order_event(db, item.kind, item.payload)
+                removed = await db.execute(delete(OutboxEvent).where(*self._held(item)))
+                if removed.rowcount != 1:
+                    # Lease expired and another dispatcher took the event over
+                    await db.rollback()
+                    return
+                await db.commit()
+                self.delivered += 1
+            except Exception as e:
+                await db.rollback()
+                await self._retry(db, item, e)
+
+    async def _retry(self, db: AsyncSession, item: _Claimed, error: Exception):
+        attempts = item.attempts + 1
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        exhausted = attempts >= self.max_attempts
+        print(f"Warning: outbox event {item.id} ({item.kind}) failed, attempt {attempts}: {error}")
+        await db.execute(
+            update(OutboxEvent).where(*self._held(item)).values(
+                attempts=attempts,
+                last_error=str(error)[:1000],
+                available_at=datetime.utcnow() + timedelta(seconds=delay),
+                status="failed" if exhausted else "pending",
+            )
+        )
+        await db.commit()
+        if exhausted:
+            self.failed += 1
+        else:
+            self.retried += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+# Global outbox dispatcher instance
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval_seconds,
+    max_attempts=settings.outbox_max_attempts,
+    retry_base=settings.outbox_retry_base_seconds,
+    retry_max=settings.outbox_retry_max_seconds,
+    lease=settings.outbox_lease_seconds,
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_outbox_events(session, flush_context):
+    if any(isinstance(instance, OutboxEvent) for instance in session.new):
+        session.info["outbox_events"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_outbox_dispatcher(session):
+    if session.info.pop("outbox_events", None):
+        outbox_dispatcher.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_outbox_events(session):
+    session.info.pop("outbox_events", None)
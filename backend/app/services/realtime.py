@@ -0,0 +1,193 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.notification import BroadcastNotification, Notification
+from app.models.order import Order
+from app.models.service import Service
+from app.services.broker import broker
+
+
+def principal_topic(user_type: str, principal_id: int) -> str:
+    """Broker topic of one signed-in user or worker, e.g. ``worker:7``."""
+    return f"{user_type}:{principal_id}"
+
+
+def broadcast_topic(audience: str, category_id: Optional[int] = None) -> str:
+    """Broker topic of a broadcast audience, e.g. ``broadcast:workers`` or ``broadcast:category:3``."""
+    if audience == "category_workers":
+        return f"broadcast:category:{category_id}"
+    return f"broadcast:{audience}"
+
+
+async def audience_topics(db: AsyncSession, user_type: str, principal_id: int) -> List[str]:
+    """Broadcast topics a user's or worker's sockets and event streams subscribe to."""
+    if user_type == "user":
+        return [broadcast_topic("users")]
+    category_ids = (await db.execute(
+        select(Service.category_id).where(Service.worker_id == principal_id).distinct()
+    )).scalars().all()
+    return [broadcast_topic("workers")] + [broadcast_topic("category_workers", c) for c in category_ids]
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    # Same wire format as the response schemas' datetime encoders
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+async def publish_chat_message(chat_id: int, user_id: int, worker_id: int, frame: str):
+    """Fan a serialized MessageResponse out to the chat's sockets and both participants' sockets.
+
+    Chat sockets get the message as is; principal sockets get it wrapped as
+    {"type": "message", "message": ...}.
+    """
+    await broker.publish(f"chat:{chat_id}", frame)
+    wrapped = f'{{"type": "message", "message": {frame}}}'
+    await broker.publish(principal_topic("user", user_id), wrapped)
+    await broker.publish(principal_topic("worker", worker_id), wrapped)
+
+
+async def publish_chat_event(chat_id: int, user_id: int, worker_id: int, payload: dict):
+    """Publish a typed chat event (such as a read receipt) to the chat's and both participants' sockets."""
+    frame = json.dumps(payload)
+    for topic in (f"chat:{chat_id}", principal_topic("user", user_id), principal_topic("worker", worker_id)):
+        await broker.publish(topic, frame)
+
+
+async def publish_principal_event(user_type: str, principal_id: int, payload: dict):
+    """Publish a typed event to every socket and event stream of one user or worker."""
+    await broker.publish(principal_topic(user_type, principal_id), json.dumps(payload))
+
+
+class RealtimeEvents:
+    """Publishes committed order status changes and new notifications to their principals or audiences.
+
+    Session hooks below collect the events at flush time and hand them over
+    after commit, from whichever thread committed; they are published from
+    the event loop captured by ``start``.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        self.published = 0
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self):
+        self._loop = None
+
+    def dispatch(self, events: List[Tuple[str, str]]):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._spawn, events)
+
+    def _spawn(self, events: List[Tuple[str, str]]):
+        task = asyncio.get_running_loop().create_task(self._publish(events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(self, events: List[Tuple[str, str]]):
+        for topic, frame in events:
+            try:
+                await broker.publish(topic, frame)
+                self.published += 1
+            except Exception as e:
+                print(f"Warning: failed to publish {topic} event: {e}")
+
+    def stats(self) -> dict:
+        return {"published": self.published, "pending": len(self._tasks)}
+
+
+# Global realtime events instance
+realtime_events = RealtimeEvents()
+
+
+def notification_frame(notification: Notification) -> str:
+    """The {"type": "notification"} event pushed for a new notification."""
+    return json.dumps({
+        "type": "notification",
+        "notification": {
+            "id": notification.id,
+            "type": notification.type,
+            "title": notification.title,
+            "message": notification.message,
+            "is_read": bool(notification.is_read),
+            "created_at": _isoformat(notification.created_at),
+            "broadcast": False,
+        },
+    })
+
+
+def broadcast_frame(broadcast: BroadcastNotification) -> str:
+    """The {"type": "notification"} event pushed once to a broadcast's audience topic."""
+    return json.dumps({
+        "type": "notification",
+        "notification": {
+            "id": broadcast.id,
+            "type": broadcast.type,
+            "title": broadcast.title,
+            "message": broadcast.message,
+            "is_read": False,
+            "created_at": _isoformat(broadcast.created_at),
+            "broadcast": True,
+        },
+    })
+
+
+def _notification_events(notification: Notification) -> List[Tuple[str, str]]:
+    frame = notification_frame(notification)
+    events = []
+    if notification.user_id is not None:
+        events.append((principal_topic("user", notification.user_id), frame))
+    if notification.worker_id is not None:
+        events.append((principal_topic("worker", notification.worker_id), frame))
+    return events
+
+
+def _order_events(order: Order, previous_status: Optional[str]) -> List[Tuple[str, str]]:
+    frame = json.dumps({
+        "type": "order_status",
+        "order_id": order.id,
+        "status": order.status,
+        "previous_status": previous_status,
+    })
+    return [(principal_topic("user", order.user_id), frame), (principal_topic("worker", order.worker_id), frame)]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_realtime_events(session, flush_context):
+    events = session.info.setdefault("realtime_events", [])
+    for instance in session.new:
+        if isinstance(instance, Notification):
+            events.extend(_notification_events(instance))
+        elif isinstance(instance, BroadcastNotification):
+            events.append((broadcast_topic(instance.audience, instance.category_id), broadcast_frame(instance)))
+        elif isinstance(instance, Order):
+            events.extend(_order_events(instance, None))
+    for instance in session.dirty:
+        if isinstance(instance, Order):
+            history = inspect(instance).attrs.status.history
+            if history.added:
+                previous = history.deleted[0] if history.deleted else None
+                if previous != instance.status:
+                    events.extend(_order_events(instance, previous))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_realtime_events(session):
+    events = session.info.pop("realtime_events", None)
+    if events:
+        realtime_events.dispatch(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_realtime_events(session):
+    session.info.pop("realtime_events", None)
@@ -0,0 +1,135 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.order import BookingHold, BookingLock
+from app.services.booking_index import naive_utc, find_conflicting_order
+
+# First key of the two-key Postgres advisory lock; the second is the worker id
+BOOKING_LOCK_NAMESPACE = 7301
+
+
+async def lock_worker_schedule(db: AsyncSession, worker_id: int):
+    """Serialize reservations for ``worker_id`` until the current transaction ends.
+
+    Postgres takes a transaction-scoped advisory lock, so bookings for
+    different workers never wait on each other. SQLite upserts the worker's
+    ``booking_locks`` row, which takes the database write lock (or the
+    single-writer connection) up front; other databases lock that row with
+    SELECT ... FOR UPDATE. Any open transaction is committed first so the
+    checks that follow read a snapshot taken after the lock was granted.
+    """
+    if db.in_transaction():
+        await db.commit()
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(BOOKING_LOCK_NAMESPACE, worker_id)))
+    elif dialect == "sqlite":
+        await _lock_sqlite(db, worker_id)
+    else:
+        await _lock_row(db, worker_id)
+
+
+async def _lock_sqlite(db: AsyncSession, worker_id: int):
+    # An INSERT statement, so the single-writer session routes it to the writer connection
+    upsert = (
+        sqlite_insert(BookingLock).values(worker_id=worker_id)
+        .on_conflict_do_update(index_elements=["worker_id"], set_={"locked_at": func.now()})
+    )
+    connection = await db.connection(bind_arguments={"clause": upsert})
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.booking_lock_timeout_seconds
+    delay = 0.01
+    while True:
+        try:
+            # Asks for the write lock before taking a read lock, so SQLite waits out the
+            # busy timeout instead of failing at once to avoid a deadlock; a failed
+            # BEGIN leaves no transaction behind and can simply be retried
+            await connection.exec_driver_sql("BEGIN IMMEDIATE")
+            break
+        except OperationalError as e:
+            if "database is locked" not in str(e.orig) or loop.time() >= deadline:
+                raise
+        await asyncio.sleep(random.uniform(0, delay))
+        delay = min(delay * 2, 0.5)
+    await db.execute(upsert)
+
+
+async def _lock_row(db: AsyncSession, worker_id: int):
+    locked = select(BookingLock.worker_id).where(BookingLock.worker_id == worker_id).with_for_update()
+    if (await db.execute(locked)).scalar() is not None:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(BookingLock).values(worker_id=worker_id))
+    except IntegrityError:
+        # Another booking created the row first; wait for its lock below
+        pass
+    await db.execute(locked)
+
+
+async def find_conflicting_hold(db: AsyncSession, worker_id: int, start: datetime, end: datetime,
+                                user_id: Optional[int] = None) -> Optional[int]:
+    """Id of an unexpired hold by someone other than ``user_id`` overlapping [start, end)."""
+    query = select(BookingHold.id).where(
+        BookingHold.worker_id == worker_id,
+        BookingHold.expires_at > datetime.utcnow(),
+        BookingHold.scheduled_date < naive_utc(end),
+        BookingHold.scheduled_end > naive_utc(start),
+    )
+    if user_id is not None:
+        query = query.where(BookingHold.user_id != user_id)
+    return (await db.execute(query.limit(1))).scalar()
+
+
+async def slot_is_taken(db: AsyncSession, worker_id: int, start: datetime, end: datetime,
+                        user_id: Optional[int] = None, exclude_order_id: Optional[int] = None) -> bool:
+    """Authoritative check for use under lock_worker_schedule: committed orders and live holds."""
+    if await find_conflicting_order(db, worker_id, start, end, exclude_order_id, use_index=False):
+        return True
+    return await find_conflicting_hold(db, worker_id, start, end, user_id) is not None
+
+
+async def create_hold(db: AsyncSession, user_id: int, worker_id: int, service_id: int,
+                      start: datetime, end: datetime) -> Optional[BookingHold]:
+    """Hold [start, end) for ``user_id`` for booking_hold_seconds, or None if the slot is taken.
+
+    Must be called under lock_worker_schedule; the caller commits.
+    """
+    now = datetime.utcnow()
+    # Expired holds are ignored by every check; clear them while we hold the lock
+    await db.execute(delete(BookingHold).where(BookingHold.worker_id == worker_id, BookingHold.expires_at <= now))
+    if await slot_is_taken(db, worker_id, start, end, user_id=user_id):
+        return None
+    hold = BookingHold(
+        user_id=user_id,
+        worker_id=worker_id,
+        service_id=service_id,
+        scheduled_date=naive_utc(start),
+        scheduled_end=naive_utc(end),
+        expires_at=now + timedelta(seconds=settings.booking_hold_seconds),
+    )
+    db.add(hold)
+    return hold
+
+
+async def claim_hold(db: AsyncSession, hold_id: int, user_id: int, worker_id: int,
+                     start: datetime, end: datetime) -> bool:
+    """Consume the user's unexpired hold covering [start, end); the caller commits."""
+    hold = await db.get(BookingHold, hold_id)
+    if (
+        hold is None
+        or hold.user_id != user_id
+        or hold.worker_id != worker_id
+        or hold.expires_at <= datetime.utcnow()
+        or hold.scheduled_date > naive_utc(start)
+        or hold.scheduled_end < naive_utc(end)
+    ):
+        return False
+    await db.delete(hold)
+    return True
@@ -0,0 +1,337 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.order import ACTIVE_ORDER_STATUSES, Order
+from app.models.service import Service
+from app.models.worker import Worker, WorkerWorkingHours
+from app.services.booking_index import booking_index, naive_utc
+
+SLOT_MINUTES = 15
+SLOT = timedelta(minutes=SLOT_MINUTES)
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+
+
+def _merge_runs(runs) -> List[List[int]]:
+    """Sort [start, end) slot runs and merge the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(runs):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _run_mask(start: int, end: int) -> int:
+    return ((1 << (end - start)) - 1) << start
+
+
+def _sweep(runs_by_position, size: int, nbytes: int) -> List[int]:
+    """Slot-major bitmaps from the slot runs of each bit position.
+
+    A run toggles its position's bit in the slot where it starts and in the
+    slot where it ends; XOR-accumulating the toggles slot by slot yields one
+    integer per slot with the bits of every position covered there. The runs
+    of one position must not overlap (see _merge_runs).
+    """
+    toggles: Dict[int, bytearray] = {}
+    for position, runs in runs_by_position:
+        byte, bit = position >> 3, 1 << (position & 7)
+        for start, end in runs:
+            for edge in (start, end):
+                if edge >= size:
+                    continue
+                toggle = toggles.get(edge)
+                if toggle is None:
+                    toggle = toggles[edge] = bytearray(nbytes)
+                toggle[byte] ^= bit
+    bitmaps = []
+    current = 0
+    for slot in range(size):
+        toggle = toggles.get(slot)
+        if toggle is not None:
+            current ^= int.from_bytes(toggle, "little")
+        bitmaps.append(current)
+    return bitmaps
+
+
+def _weekly_runs(rows) -> List[List[int]]:
+    """Working-hours rows of one worker as merged runs of week slots (Monday 00:00 = 0)."""
+    runs = []
+    for weekday, start_time, end_time in rows:
+        day = weekday * SLOTS_PER_DAY
+        # Only whole slots inside the working hours count
+        start = -(-(start_time.hour * 60 + start_time.minute) // SLOT_MINUTES)
+        end = (end_time.hour * 60 + end_time.minute) // SLOT_MINUTES
+        if start < end:
+            runs.append((day + start, day + end))
+    return _merge_runs(runs)
+
+
+class _CategorySlots:
+    def __init__(self, origin: datetime, size: int, worker_ids: List[int], hours: Dict[int, int],
+                 orders: Dict[int, Dict[int, Tuple[int, int]]], slots: List[int], expires_at: float):
+        self.origin = origin          # UTC midnight the horizon starts at
+        self.size = size              # slots in the horizon
+        self.worker_ids = worker_ids  # bit position -> worker id, best rated first
+        self.positions = {worker_id: position for position, worker_id in enumerate(worker_ids)}
+        self.hours = hours            # worker id -> bitmap of working slots in a week
+        self.orders = orders          # worker id -> {order id: (first slot, end slot)}
+        self.slots = slots            # horizon slot -> bitmap of free workers
+        self.expires_at = expires_at
+        self.week_offset = origin.weekday() * SLOTS_PER_DAY
+
+    def slot_range(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """Horizon slots covering [start, end), clipped to the horizon."""
+        first = (start - self.origin) // SLOT
+        last = -((self.origin - end) // SLOT)
+        return max(first, 0), min(last, self.size)
+
+    def refresh(self, worker_id: int, first: int, last: int):
+        """Recompute one worker's bit in slots [first, last) from its hours and orders."""
+        position = self.positions[worker_id]
+        bit = 1 << position
+        hours = self.hours[worker_id]
+        busy = 0
+        for run_first, run_last in self.orders.get(worker_id, {}).values():
+            busy |= _run_mask(run_first, run_last)
+        for slot in range(first, last):
+            working = hours >> ((self.week_offset + slot) % SLOTS_PER_WEEK) & 1
+            if working and not busy >> slot & 1:
+                self.slots[slot] |= bit
+            else:
+                self.slots[slot] &= ~bit
+
+    def apply(self, order_id: int, worker_id: int, active: bool, start: Optional[datetime],
+              end: Optional[datetime]):
+        if worker_id not in self.positions:
+            return
+        runs = self.orders.setdefault(worker_id, {})
+        affected = []
+        old = runs.pop(order_id, None)
+        if old is not None:
+            affected.append(old)
+        if active and start is not None:
+            first, last = self.slot_range(start, end)
+            if first < last:
+                runs[order_id] = (first, last)
+                affected.append((first, last))
+        for first, last in affected:
+            self.refresh(worker_id, first, last)
+
+
+class SlotIndex:
+    """Per-category bitmaps of 15-minute slots over a rolling horizon.
+
+    Each worker gets a bit position within the category (best rated first)
+    and every slot of the horizon one integer with the bits of the workers
+    who work then and have no active order. "Who is free from 10:00 to
+    12:00" is then the bitwise AND of eight integers, each covering every
+    worker of the category in a handful of machine words per operation.
+
+    A category is built from the database on its first search and kept
+    current from the order changes committed in this process. It is rebuilt
+    when the horizon rolls over to the next day, and in the background once
+    it is ``ttl_seconds`` old (changes made by other processes, new services,
+    profile changes). Live booking holds are left to the booking checks.
+    """
+
+    def __init__(self, horizon_days: int, ttl_seconds: int, max_categories: int):
+        self.horizon_days = horizon_days
+        self.ttl_seconds = ttl_seconds
+        self.max_categories = max_categories
+        self._categories: "OrderedDict[int, _CategorySlots]" = OrderedDict()
+        # Changes committed while categories are being built, replayed onto them afterwards
+        self._building: List[list] = []
+        self._refreshing = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def horizon(self) -> Tuple[datetime, datetime]:
+        """[start, end) covered by the bitmaps right now."""
+        origin = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return origin, origin + timedelta(days=self.horizon_days)
+
+    def apply(self, changes):
+        """Fold committed ``(order_id, worker_id, active, start, end)`` rows into built categories."""
+        with self._lock:
+            for pending in self._building:
+                pending.extend(changes)
+            for category in self._categories.values():
+                for change in changes:
+                    category.apply(*change)
+
+    def invalidate_category(self, category_id: int):
+        with self._lock:
+            self._categories.pop(category_id, None)
+
+    def invalidate_worker(self, worker_id: int):
+        with self._lock:
+            for category_id in [c for c, slots in self._categories.items() if worker_id in slots.positions]:
+                del self._categories[category_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "categories": len(self._categories),
+                "workers": sum(len(c.worker_ids) for c in self._categories.values()),
+                "hits": self.hits,
+                "builds": self.builds,
+            }
+
+    async def _category(self, db: AsyncSession, category_id: int, origin: datetime) -> _CategorySlots:
+        with self._lock:
+            category = self._categories.get(category_id)
+            if category is not None and category.origin == origin:
+                if category.expires_at <= time.monotonic() and category_id not in self._refreshing:
+                    # Keep answering from the current bitmaps while a fresh copy is built
+                    self._refreshing.add(category_id)
+                    task = asyncio.get_running_loop().create_task(self._refresh(category_id, origin))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                self._categories.move_to_end(category_id)
+                self.hits += 1
+                return category
+        return await self._load(db, category_id, origin)
+
+    async def _refresh(self, category_id: int, origin: datetime):
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._load(db, category_id, origin)
+        except Exception as e:
+            print(f"Warning: could not rebuild slot bitmaps of category {category_id}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(category_id)
+
+    async def _load(self, db: AsyncSession, category_id: int, origin: datetime) -> _CategorySlots:
+        with self._lock:
+            pending = []
+            self._building.append(pending)
+        try:
+            category = await self._build(db, category_id, origin)
+        finally:
+            with self._lock:
+                self._building = [other for other in self._building if other is not pending]
+        with self._lock:
+            self.builds += 1
+            for change in pending:
+                category.apply(*change)
+            self._categories[category_id] = category
+            self._categories.move_to_end(category_id)
+            while len(self._categories) > self.max_categories:
+                self._categories.popitem(last=False)
+        return category
+
+    async def _build(self, db: AsyncSession, category_id: int, origin: datetime) -> _CategorySlots:
+        horizon_end = origin + timedelta(days=self.horizon_days)
+        members = select(Service.worker_id).where(
+            Service.category_id == category_id,
+            Service.is_available == True,
+        )
+        worker_ids = (await db.execute(
+            select(Worker.id).where(
+                Worker.id.in_(members),
+                Worker.is_active == True,
+                Worker.is_available == True,
+            ).order_by(Worker.rating.desc(), Worker.id)
+        )).scalars().all()
+        hours_rows = (await db.execute(
+            select(WorkerWorkingHours.worker_id, WorkerWorkingHours.weekday,
+                   WorkerWorkingHours.start_time, WorkerWorkingHours.end_time)
+            .where(WorkerWorkingHours.worker_id.in_(members))
+        )).all()
+        order_rows = (await db.execute(
+            select(Order.id, Order.worker_id, Order.scheduled_date, Order.scheduled_end).where(
+                Order.worker_id.in_(members),
+                Order.status.in_(ACTIVE_ORDER_STATUSES),
+                Order.scheduled_date < horizon_end,
+                Order.scheduled_end > origin,
+            )
+        )).all()
+        # Large categories take a while to sweep; keep the event loop serving meanwhile
+        return await asyncio.to_thread(self._compute, origin, worker_ids, hours_rows, order_rows)
+
+    def _compute(self, origin: datetime, worker_ids, hours_rows, order_rows) -> _CategorySlots:
+        size = self.horizon_days * SLOTS_PER_DAY
+
+        category = _CategorySlots(origin, size, list(worker_ids), {}, {}, [], time.monotonic() + self.ttl_seconds)
+        nbytes = (len(worker_ids) + 7) // 8
+
+        hours_by_worker: Dict[int, list] = {}
+        for worker_id, weekday, start_time, end_time in hours_rows:
+            hours_by_worker.setdefault(worker_id, []).append((weekday, start_time, end_time))
+        weekly_runs = []
+        for position, worker_id in enumerate(worker_ids):
+            rows = hours_by_worker.get(worker_id)
+            # Workers who have not set working hours are treated as always working
+            runs = _weekly_runs(rows) if rows else [[0, SLOTS_PER_WEEK]]
+            category.hours[worker_id] = sum(_run_mask(start, end) for start, end in runs)
+            weekly_runs.append((position, runs))
+        weekly = _sweep(weekly_runs, SLOTS_PER_WEEK, nbytes)
+
+        orders_by_worker: Dict[int, list] = {}
+        for order_id, worker_id, start, end in order_rows:
+            if worker_id not in category.positions:
+                continue
+            first, last = category.slot_range(start, end)
+            if first < last:
+                category.orders.setdefault(worker_id, {})[order_id] = (first, last)
+                orders_by_worker.setdefault(worker_id, []).append((first, last))
+        busy = _sweep(
+            ((category.positions[worker_id], _merge_runs(runs)) for worker_id, runs in orders_by_worker.items()),
+            size, nbytes,
+        )
+
+        category.slots = [
+            weekly[(category.week_offset + slot) % SLOTS_PER_WEEK] & ~busy[slot]
+            for slot in range(size)
+        ]
+        return category
+
+    async def find_available(self, db: AsyncSession, category_id: int, start: datetime, end: datetime,
+                             skip: int = 0, limit: int = 20) -> Tuple[int, List[int]]:
+        """Number of workers of the category free for all of [start, end) and a page of their ids.
+
+        [start, end) must lie within ``horizon()``; partial slots at either end count as needed.
+        """
+        start, end = naive_utc(start), naive_utc(end)
+        origin, _ = self.horizon()
+        category = await self._category(db, category_id, origin)
+        first, last = category.slot_range(start, end)
+        with self._lock:
+            free = -1 if first < last else 0
+            for slot in range(first, last):
+                free &= category.slots[slot]
+                if not free:
+                    break
+        if free <= 0:
+            return 0, []
+        # Bit positions of the free workers, lowest (best rated) first
+        bits = bin(free)[:1:-1]
+        total = bits.count("1")
+        worker_ids = []
+        position = -1
+        for _ in range(min(skip + limit, total)):
+            position = bits.find("1", position + 1)
+            worker_ids.append(category.worker_ids[position])
+        return total, worker_ids[skip:]
+
+
+# Global slot index instance
+slot_index = SlotIndex(
+    horizon_days=settings.slot_index_horizon_days,
+    ttl_seconds=settings.slot_index_ttl_seconds,
+    max_categories=settings.slot_index_max_categories,
+)
+booking_index.subscribe(slot_index.apply)
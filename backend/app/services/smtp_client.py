@@ -0,0 +1,178 @@
+import asyncio
+import base64
+import re
+import ssl
+from typing import List, Optional, Sequence, Tuple
+
+_LEADING_DOT = re.compile(rb"^\.", re.MULTILINE)
+
+
+class SMTPError(Exception):
+    """A reply the server refused a command or message with."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+    @property
+    def permanent(self) -> bool:
+        return 500 <= self.code < 600
+
+
+def _data(message: bytes) -> bytes:
+    # DATA payload: CRLF-terminated, lines starting with "." doubled, then the end marker
+    if not message.endswith(b"\r\n"):
+        message += b"\r\n"
+    return _LEADING_DOT.sub(b"..", message) + b".\r\n"
+
+
+class SMTPConnection:
+    """An SMTP session kept open to send many messages.
+
+    When the server advertises PIPELINING (RFC 2920) a message's MAIL, RCPT
+    and DATA commands are written together with the previous message's
+    content, so each message costs one round trip instead of four.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 starttls: bool = True, timeout: float = 30.0, local_hostname: str = "localhost"):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.local_hostname = local_hostname
+        self.extensions = set()
+        self.last_used = 0.0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def open(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            await self._expect(220)
+            await self._ehlo()
+            if self.starttls:
+                await self._command(b"STARTTLS", 220)
+                await self._writer.start_tls(ssl.create_default_context(), server_hostname=self.host)
+                await self._ehlo()
+            if self.username:
+                credentials = base64.b64encode(f"\0{self.username}\0{self.password or ''}".encode()).decode()
+                await self._command(f"AUTH PLAIN {credentials}".encode(), 235)
+        except BaseException:
+            self.abort()
+            raise
+        self.last_used = asyncio.get_running_loop().time()
+
+    async def close(self):
+        if self.is_open:
+            try:
+                await asyncio.wait_for(self._command(b"QUIT", 221), self.timeout)
+            except Exception:
+                pass
+        self.abort()
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _reply(self) -> Tuple[int, str]:
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            lines.append(line[4:].strip().decode("utf-8", "replace"))
+            if line[3:4] != b"-":
+                return int(line[:3]), "\n".join(lines)
+
+    async def _expect(self, code: int) -> str:
+        reply_code, text = await self._reply()
+        if reply_code != code:
+            raise SMTPError(reply_code, text)
+        return text
+
+    async def _command(self, line: bytes, code: int) -> str:
+        self._writer.write(line + b"\r\n")
+        return await self._expect(code)
+
+    async def _ehlo(self):
+        text = await self._command(f"EHLO {self.local_hostname}".encode(), 250)
+        self.extensions = {line.split()[0].upper() for line in text.splitlines()[1:] if line.strip()}
+
+    async def send_batch(self, sender: str, messages: Sequence[Tuple[str, bytes]]) -> List[Optional[Exception]]:
+        """Send (recipient, message bytes) pairs in order.
+
+        Returns one entry per message: None once the server accepted it, the
+        SMTPError it was refused with, or the connection error that cut the
+        batch short (the connection is then closed).
+        """
+        results: List[Optional[Exception]] = [None] * len(messages)
+        settled = [False] * len(messages)
+
+        def settle(index: int, outcome: Optional[Exception]):
+            results[index] = outcome
+            settled[index] = True
+
+        pipelining = "PIPELINING" in self.extensions
+        # Message whose DATA the server accepted and whose content is still to be written
+        content: Optional[Tuple[int, bytes]] = None
+        try:
+            for index, (recipient, message) in enumerate(messages):
+                if any(c in recipient for c in "\r\n<>"):
+                    settle(index, SMTPError(501, f"Invalid recipient address: {recipient!r}"))
+                    continue
+                envelope = [f"MAIL FROM:<{sender}>".encode(), f"RCPT TO:<{recipient}>".encode(), b"DATA"]
+                if pipelining:
+                    self._writer.write((content[1] if content else b"") + b"".join(c + b"\r\n" for c in envelope))
+                    if content:
+                        settle(content[0], await self._accepted())
+                        content = None
+                    replies = [await self._reply() for _ in envelope]
+                else:
+                    if content:
+                        self._writer.write(content[1])
+                        settle(content[0], await self._accepted())
+                        content = None
+                    replies = []
+                    for command in envelope:
+                        self._writer.write(command + b"\r\n")
+                        replies.append(await self._reply())
+                        if replies[-1][0] >= 400:
+                            break
+                refused = next(((code, text) for code, text in replies[:2] if code not in (250, 251)), None)
+                data_code, data_text = replies[-1]
+                if refused is None and data_code == 354:
+                    content = (index, _data(message))
+                    continue
+                if data_code == 354:
+                    # A pipelined DATA accepted despite a refused envelope: end it empty
+                    self._writer.write(b".\r\n")
+                    await self._reply()
+                settle(index, SMTPError(*(refused or (data_code, data_text))))
+                self._writer.write(b"RSET\r\n")
+                await self._reply()
+            if content:
+                self._writer.write(content[1])
+                settle(content[0], await self._accepted())
+        except (ConnectionError, OSError, ValueError, asyncio.TimeoutError) as e:
+            self.abort()
+            error = e if str(e) else ConnectionError("SMTP server timed out")
+            for index, done in enumerate(settled):
+                if not done:
+                    results[index] = error
+        self.last_used = asyncio.get_running_loop().time()
+        return results
+
+    async def _accepted(self) -> Optional[SMTPError]:
+        code, text = await self._reply()
+        return None if code == 250 else SMTPError(code, text)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Async database throughput benchmark for HelpMate
+
+Compares the old pattern (``async def`` handler calling a blocking
+``Session``) with the ``AsyncSession`` dependency, issuing the same worker
+listing query from many concurrent clients:
+
+    python benchmarks/async_db_throughput.py --clients 500
+    python benchmarks/async_db_throughput.py --database-url postgresql://...
+
+Without --database-url a temporary SQLite database is seeded and used. The
+gap only shows up when queries wait on the network, so point it at Postgres
+for meaningful numbers. The blocking variant closes its session inside the
+handler; holding it across the response lets 500 clients exhaust the pool,
+and a blocking checkout then freezes the whole event loop until
+pool_timeout expires.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def seed(workers: int):
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Worker
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    if db.query(Worker).count() == 0:
+        db.add_all([
+            Worker(
+                email=f"bench-worker-{i}@example.com",
+                full_name=f"Bench Worker {i}",
+                hashed_password="x",
+                hourly_rate=20.0,
+                skills=[],
+                is_active=True,
+            )
+            for i in range(workers)
+        ])
+        db.commit()
+    db.close()
+
+
+def build_app():
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.core.database import get_db, get_async_db
+    from app.models import Worker
+
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking(db: Session = Depends(get_db)):
+        workers = db.query(Worker).filter(Worker.is_active == True).limit(50).all()
+        db.close()
+        return {"count": len(workers)}
+
+    @app.get("/async")
+    async def non_blocking(db: AsyncSession = Depends(get_async_db)):
+        result = await db.execute(select(Worker).filter(Worker.is_active == True).limit(50))
+        return {"count": len(result.scalars().all())}
+
+    return app
+
+
+async def hammer(app, path: str, clients: int, requests_per_client: int):
+    import httpx
+
+    latencies = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    total = clients * requests_per_client
+    print(f"{path:<10} {total / elapsed:>9.1f} req/s   p50 {statistics.median(latencies):>8.2f} ms   "
+          f"p99 {percentile(latencies, 99):>8.2f} ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="database to benchmark (defaults to a temporary SQLite file)")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--workers", type=int, default=200, help="worker rows to seed")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    seed(args.workers)
+    app = build_app()
+    print(f"{args.clients} concurrent clients x {args.requests} requests")
+    for path in ("/blocking", "/async"):
+        asyncio.run(hammer(app, path, args.clients, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Concurrent booking check for HelpMate
+
+Phase 1 sends --contenders simultaneous POST /orders for the same worker and
+time slot and fails unless exactly one of them succeeds. Phase 2 books
+--bookings distinct slots spread over a few popular workers as fast as
+possible and reports throughput. Phase 3 cancels a booking, books the freed
+slot for another user and fails unless reactivating the cancelled order is
+rejected, both by its owner and by an admin. The run ends by checking the
+orders table for overlapping active bookings of any worker:
+
+    python benchmarks/booking_concurrency.py
+    python benchmarks/booking_concurrency.py --database-url postgresql://...
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SLOT = datetime(2031, 1, 1, 10, 0)
+
+
+def seed(users: int, workers: int):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Category, Service, User, Worker
+
+    db = SessionLocal()
+    category = Category(name=f"Bench {time.time()}")
+    db.add(category)
+    db.flush()
+    service_ids = []
+    for w in range(workers):
+        worker = Worker(email=f"bench-worker-{w}-{time.time()}@example.com", full_name=f"Bench Worker {w}",
+                        hashed_password="x", hourly_rate=20.0, skills=[], is_active=True)
+        db.add(worker)
+        db.flush()
+        service = Service(title="Bench", category_id=category.id, worker_id=worker.id, hourly_rate=20.0)
+        db.add(service)
+        db.flush()
+        service_ids.append(service.id)
+    tokens = []
+    for u in range(users):
+        user = User(email=f"bench-user-{u}-{time.time()}@example.com", full_name=f"Bench User {u}",
+                    hashed_password="x", is_active=True, is_verified=True, is_admin=u == 0)
+        db.add(user)
+        db.flush()
+        tokens.append(create_access_token(data={"sub": user.email, "user_type": "user", "user_id": user.id}))
+    db.commit()
+    db.close()
+    return service_ids, tokens
+
+
+def count_overlaps() -> int:
+    from sqlalchemy import and_, func, select
+    from sqlalchemy.orm import aliased
+    from app.core.database import SessionLocal
+    from app.models.order import ACTIVE_ORDER_STATUSES, Order
+
+    other = aliased(Order)
+    db = SessionLocal()
+    overlaps = db.execute(select(func.count()).select_from(Order).join(other, and_(
+        other.worker_id == Order.worker_id,
+        other.id > Order.id,
+        other.scheduled_date < Order.scheduled_end,
+        other.scheduled_end > Order.scheduled_date,
+    )).where(Order.status.in_(ACTIVE_ORDER_STATUSES), other.status.in_(ACTIVE_ORDER_STATUSES))).scalar()
+    db.close()
+    return overlaps
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    service_ids, tokens = seed(max(args.contenders, args.users), args.workers)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def book(token, service_id, start):
+            response = await client.post(
+                "/api/v1/orders/",
+                json={"service_id": service_id, "hours": 1, "scheduled_date": start.isoformat()},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            return response
+
+        responses = await asyncio.gather(*[book(token, service_ids[0], SLOT) for token in tokens[:args.contenders]])
+        statuses = [response.status_code for response in responses]
+        winners = statuses.count(200)
+        print(f"same slot: {args.contenders} contenders -> {winners} booked, "
+              f"statuses {dict((s, statuses.count(s)) for s in sorted(set(statuses)))}")
+
+        rng = random.Random(1)
+        jobs = []
+        for i in range(args.bookings):
+            start = SLOT + timedelta(days=1, hours=i // args.workers)
+            jobs.append((rng.choice(tokens[:args.users]), service_ids[i % args.workers], start))
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def limited(job):
+            async with semaphore:
+                return (await book(*job)).status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*[limited(job) for job in jobs])
+        elapsed = time.perf_counter() - started
+        print(f"distinct slots: {statuses.count(200)}/{args.bookings} booked over {args.workers} workers "
+              f"in {elapsed:.2f}s ({args.bookings / elapsed:.0f} bookings/s)")
+
+        # tokens[0] is an admin, tokens[1] a plain user
+        start = SLOT + timedelta(days=400)
+        order_id = (await book(tokens[1], service_ids[0], start)).json()["id"]
+        owner = {"Authorization": f"Bearer {tokens[1]}"}
+        await client.put(f"/api/v1/orders/{order_id}", json={"status": "cancelled"}, headers=owner)
+        rebooked = (await book(tokens[2], service_ids[0], start)).status_code
+        by_owner = (await client.put(f"/api/v1/orders/{order_id}", json={"status": "pending"},
+                                     headers=owner)).status_code
+        by_admin = (await client.put(f"/api/v1/admin/orders/{order_id}/status", params={"status": "pending"},
+                                     headers={"Authorization": f"Bearer {tokens[0]}"})).status_code
+        reactivation_rejected = rebooked == 200 and by_owner == 400 and by_admin == 400
+        print(f"reactivate after rebooking: rebooked {rebooked}, owner {by_owner}, admin {by_admin}")
+
+
+    overlaps = count_overlaps()
+    print(f"overlapping active bookings: {overlaps}")
+    if winners != 1 or overlaps or not reactivation_rejected:
+        sys.exit("FAILED: double booking detected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a migrated temporary SQLite database")
+    parser.add_argument("--contenders", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(BACKEND_DIR)
+    from migrate_db import migrate_database
+    migrate_database()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Booking conflict check benchmark for HelpMate
+
+Seeds workers that each hold --bookings scheduled orders in a fresh SQLite
+file and times find_conflicting_order (per-process interval tree) against a
+plain SQL overlap query on scheduled_date/scheduled_end, for random slots
+that are half free and half taken:
+
+    python benchmarks/booking_conflicts.py --workers 3 --bookings 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EPOCH = datetime(2030, 1, 1)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def seed(workers: int, bookings: int):
+    from sqlalchemy import insert
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Category, Order, Service, User, Worker
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", full_name="Bench User", hashed_password="x"))
+    db.add(Category(name="Bench"))
+    db.flush()
+    for w in range(workers):
+        worker = Worker(email=f"bench-worker-{w}@example.com", full_name=f"Bench Worker {w}",
+                        hashed_password="x", hourly_rate=20.0, skills=[])
+        db.add(worker)
+        db.flush()
+        service = Service(title="Bench", category_id=1, worker_id=worker.id, hourly_rate=20.0)
+        db.add(service)
+        db.flush()
+        # One 2-hour booking every 3 hours, so every third hour is free
+        rows = []
+        for i in range(bookings):
+            start = EPOCH + timedelta(hours=3 * i)
+            rows.append({
+                "user_id": 1, "worker_id": worker.id, "service_id": service.id, "hours": 2,
+                "total_amount": 40.0, "status": "accepted",
+                "scheduled_date": start, "scheduled_end": start + timedelta(hours=2),
+            })
+        db.execute(insert(Order), rows)
+    db.commit()
+    db.close()
+
+
+async def run(args):
+    from sqlalchemy import select
+    from app.core.database import AsyncSessionLocal
+    from app.models.order import ACTIVE_ORDER_STATUSES, Order
+    from app.services.booking_index import find_conflicting_order
+
+    rng = random.Random(7)
+    slots = [
+        (rng.randint(1, args.workers), EPOCH + timedelta(hours=3 * rng.randrange(args.bookings) + rng.choice((1, 2))))
+        for _ in range(args.checks)
+    ]
+
+    async def sql_overlap(db, worker_id, start, end):
+        result = await db.execute(select(Order.id).where(
+            Order.worker_id == worker_id,
+            Order.status.in_(ACTIVE_ORDER_STATUSES),
+            Order.scheduled_date < end,
+            Order.scheduled_end > start,
+        ).limit(1))
+        return result.scalar()
+
+    results = {}
+    for label, check in (("sql", sql_overlap), ("interval_tree", find_conflicting_order)):
+        async with AsyncSessionLocal() as db:
+            # Warm up: loads each worker's tree once
+            for worker_id in range(1, args.workers + 1):
+                await check(db, worker_id, EPOCH, EPOCH + timedelta(hours=1))
+            latencies = []
+            conflicts = 0
+            for worker_id, start in slots:
+                started = time.perf_counter()
+                if await check(db, worker_id, start, start + timedelta(hours=1)):
+                    conflicts += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+        results[label] = (latencies, conflicts)
+
+    print(f"workers={args.workers} bookings/worker={args.bookings} checks={args.checks}")
+    for label, (latencies, conflicts) in results.items():
+        print(f"  {label:<14} conflicts {conflicts:6d}  p50 {statistics.median(latencies):7.3f} ms"
+              f"  p99 {percentile(latencies, 99):7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--bookings", type=int, default=10000, help="scheduled orders per worker")
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    seed(args.workers, args.bookings)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Cross-process chat fan-out check for HelpMate
+
+Starts --processes uvicorn servers sharing one database and one broker,
+opens a chat WebSocket on each of them, posts --messages chat messages
+round-robin through the HTTP API of every process and fails unless every
+socket receives every message. Reports delivery latency from POST to
+receipt:
+
+    python benchmarks/chat_fanout.py --broker redis
+    python benchmarks/chat_fanout.py --broker redis --redis-url redis://localhost:6379/0
+    python benchmarks/chat_fanout.py --broker postgres --database-url postgresql://...
+
+Without --redis-url a local Redis stand-in is started (pip install fakeredis).
+Needs the websockets package (part of uvicorn[standard]).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_redis_stand_in() -> str:
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"redis://127.0.0.1:{port}/0"
+
+
+def seed():
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Chat, User, Worker
+
+    db = SessionLocal()
+    user = User(email=f"fanout-{time.time()}@example.com", full_name="Fanout User", hashed_password="x",
+                is_active=True, is_verified=True)
+    worker = Worker(email=f"fanout-{time.time()}@example.com", full_name="Fanout Worker", hashed_password="x",
+                    hourly_rate=20.0, skills=[], is_active=True)
+    db.add_all([user, worker])
+    db.flush()
+    chat = Chat(user_id=user.id, worker_id=worker.id)
+    db.add(chat)
+    db.commit()
+    token = create_access_token(data={"sub": user.email, "user_type": "user", "user_id": user.id})
+    chat_id = chat.id
+    db.close()
+    return chat_id, token
+
+
+async def run(args, ports, chat_id, token):
+    import httpx
+    import websockets
+
+    sent = {}
+    latencies = []
+    received = [0] * len(ports)
+
+    async def consume(index, ws):
+        while received[index] < args.messages:
+            event = json.loads(await ws.recv())
+            received[index] += 1
+            latencies.append((time.perf_counter() - sent[event["content"]]) * 1000)
+
+    sockets = [
+        await websockets.connect(f"ws://127.0.0.1:{port}/api/v1/chat/ws/chat/{chat_id}?token={token}")
+        for port in ports
+    ]
+    # Let every process finish subscribing before the first publish
+    await asyncio.sleep(0.5)
+    consumers = [asyncio.create_task(consume(i, ws)) for i, ws in enumerate(sockets)]
+    async with httpx.AsyncClient(timeout=30, headers={"Authorization": f"Bearer {token}"}) as client:
+        started = time.perf_counter()
+        for i in range(args.messages):
+            content = f"message {i}"
+            sent[content] = time.perf_counter()
+            port = ports[i % len(ports)]
+            response = await client.post(f"http://127.0.0.1:{port}/api/v1/chat/{chat_id}/messages",
+                                         json={"content": content})
+            response.raise_for_status()
+        try:
+            await asyncio.wait_for(asyncio.gather(*consumers), timeout=30)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started
+    for ws in sockets:
+        await ws.close()
+
+    print(f"broker={args.broker} processes={len(ports)} messages={args.messages} in {elapsed:.2f}s")
+    print(f"  received per socket: {received}")
+    if latencies:
+        latencies.sort()
+        print(f"  delivery latency p50 {statistics.median(latencies):.2f} ms"
+              f"  p99 {latencies[int(0.99 * (len(latencies) - 1))]:.2f} ms")
+    if any(count != args.messages for count in received):
+        sys.exit("FAILED: not every socket received every message")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--broker", choices=("memory", "redis", "postgres"), default="redis")
+    parser.add_argument("--processes", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--redis-url")
+    parser.add_argument("--database-url", help="defaults to a migrated temporary SQLite database")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REALTIME_BROKER"] = args.broker
+    if args.broker == "redis":
+        os.environ["REDIS_URL"] = args.redis_url or start_redis_stand_in()
+    os.chdir(BACKEND_DIR)
+    from migrate_db import migrate_database
+    migrate_database()
+    chat_id, token = seed()
+
+    ports = [free_port() for _ in range(args.processes)]
+    servers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=dict(os.environ, PASSWORD_HASH_WORKERS="0"),
+        )
+        for port in ports
+    ]
+    try:
+        import httpx
+        for port in ports:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+        asyncio.run(run(args, ports, chat_id, token))
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Chat message throughput benchmark for HelpMate
+
+Starts one uvicorn server on a fresh SQLite database (or --database-url)
+with --chats chats, then sends --messages messages per chat two ways and
+reports messages per second:
+
+  http       POST /chat/{id}/messages, --concurrency requests in flight
+  websocket  {"type": "message"} frames over each chat's socket, up to
+             --window unacknowledged per socket (group-committed server side)
+
+    python benchmarks/chat_throughput.py --chats 20 --messages 200
+
+Needs the websockets package (part of uvicorn[standard]).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(chats: int):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Chat, User, Worker
+
+    db = SessionLocal()
+    worker = Worker(email="throughput@example.com", full_name="Throughput Worker", hashed_password="x",
+                    hourly_rate=20.0, skills=[], is_active=True)
+    db.add(worker)
+    pairs = []
+    for c in range(chats):
+        user = User(email=f"throughput-{c}@example.com", full_name=f"Throughput User {c}", hashed_password="x",
+                    is_active=True, is_verified=True)
+        db.add(user)
+        db.flush()
+        chat = Chat(user_id=user.id, worker_id=worker.id)
+        db.add(chat)
+        db.flush()
+        pairs.append((chat.id, create_access_token(
+            data={"sub": user.email, "user_type": "user", "user_id": user.id}
+        )))
+    db.commit()
+    db.close()
+    return pairs
+
+
+async def over_http(args, port, pairs) -> float:
+    import httpx
+
+    jobs = [(chat_id, token, i) for i in range(args.messages) for chat_id, token in pairs]
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        async def sender(worker_index):
+            for chat_id, token, i in jobs[worker_index::args.concurrency]:
+                response = await client.post(
+                    f"http://127.0.0.1:{port}/api/v1/chat/{chat_id}/messages",
+                    json={"content": f"http {i}"}, headers={"Authorization": f"Bearer {token}"},
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*[sender(w) for w in range(args.concurrency)])
+        return len(jobs) / (time.perf_counter() - started)
+
+
+async def over_websocket(args, port, pairs) -> float:
+    import websockets
+
+    sockets = [
+        await websockets.connect(f"ws://127.0.0.1:{port}/api/v1/chat/ws/chat/{chat_id}?token={token}")
+        for chat_id, token in pairs
+    ]
+
+    async def chat(ws):
+        window = asyncio.Semaphore(args.window)
+        acked = 0
+
+        async def send():
+            for i in range(args.messages):
+                await window.acquire()
+                await ws.send(json.dumps({"type": "message", "content": f"ws {i}", "client_id": i}))
+
+        sending = asyncio.create_task(send())
+        while acked < args.messages:
+            frame = json.loads(await ws.recv())
+            if frame.get("type") == "ack":
+                acked += 1
+                window.release()
+            elif frame.get("type") == "error":
+                raise RuntimeError(frame)
+        await sending
+
+    started = time.perf_counter()
+    await asyncio.gather(*[chat(ws) for ws in sockets])
+    elapsed = time.perf_counter() - started
+    for ws in sockets:
+        await ws.close()
+    return len(sockets) * args.messages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=200, help="messages per chat and transport")
+    parser.add_argument("--concurrency", type=int, default=32, help="HTTP requests in flight")
+    parser.add_argument("--window", type=int, default=100, help="unacknowledged frames per socket")
+    parser.add_argument("--database-url", help="defaults to a migrated temporary SQLite database")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REALTIME_BROKER"] = "memory"
+    os.chdir(BACKEND_DIR)
+    from migrate_db import migrate_database
+    migrate_database()
+    pairs = seed(args.chats)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        # SQLite's production profile: WAL and one writer connection, so concurrent POSTs queue instead of failing
+        env=dict(os.environ, PASSWORD_HASH_WORKERS="0", SQLITE_TUNING="true"),
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health")
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        http_rate = asyncio.run(over_http(args, port, pairs))
+        ws_rate = asyncio.run(over_websocket(args, port, pairs))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"chats={args.chats} messages/chat={args.messages}")
+    print(f"  http       {http_rate:9.0f} msg/s  (concurrency {args.concurrency})")
+    print(f"  websocket  {ws_rate:9.0f} msg/s  (window {args.window}/socket)")
+    print(f"  speedup    {ws_rate / http_rate:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
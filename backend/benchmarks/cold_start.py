@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for HelpMate
+
+Starts a fresh interpreter per run, imports the Vercel entry point
+(api/index.py) and reports the import time, the lifespan startup time and the
+time to the first response of a database-backed endpoint. Pass --create-all
+to add the old import-time Base.metadata.create_all for comparison:
+
+    python benchmarks/cold_start.py --runs 10
+    python benchmarks/cold_start.py --runs 10 --create-all
+    python benchmarks/cold_start.py --database-url postgresql://...
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+from api.index import app
+imported = time.perf_counter()
+if "--create-all" in sys.argv:
+    from app.core.database import Base, engine
+    Base.metadata.create_all(bind=engine)
+
+async def first_request():
+    import httpx
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/api/v1/categories/")
+        return ready, response.status_code
+
+ready, status_code = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (done - ready) * 1000,
+    "total_ms": (done - started) * 1000,
+    "status": status_code,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="defaults to a migrated temporary SQLite database")
+    parser.add_argument("--create-all", action="store_true", help="also run create_all after import")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        subprocess.run([sys.executable, "migrate_db.py"], cwd=BACKEND_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    argv = [sys.executable, "-c", CHILD] + (["--create-all"] if args.create_all else [])
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(argv, cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    print(f"runs={args.runs} create_all={args.create_all} status={sorted({r['status'] for r in runs})}")
+    for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms"):
+        values = [r[key] for r in runs]
+        print(f"  {key:<17} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Email queue throughput benchmark for HelpMate
+
+Starts a local aiosmtpd sink (pip install aiosmtpd) behind a proxy that adds
+--latency-ms each way, like the round trip to a real relay, and measures
+messages per second for:
+
+  per-message  one SMTP session per email (connect, EHLO, MAIL, RCPT, DATA,
+               QUIT), as the old FastMail.send_message path did, run with
+               --pool-size sends at a time
+  pooled       the email queue: rows claimed from outbound_emails, sent over
+               --pool-size long-lived connections, then deleted; the sink
+               does not advertise PIPELINING, so commands go in lockstep
+  pipelined    the same with PIPELINING advertised (RFC 2920)
+
+The queue modes include the database work (claim, delete) on a throwaway
+SQLite file.
+
+    python benchmarks/email_queue.py --messages 2000 --pool-size 3 --latency-ms 5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class SinkHandler:
+    def __init__(self):
+        self.pipelining = False
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        if self.pipelining:
+            responses.insert(-1, "250-PIPELINING")
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+async def _pipe(reader, writer, delay: float):
+    # Forwards one direction, holding every chunk back by the simulated latency
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue()
+
+    async def forward():
+        while True:
+            due, data = await chunks.get()
+            if data is None:
+                break
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    sender = asyncio.create_task(forward())
+    try:
+        while data := await reader.read(65536):
+            chunks.put_nowait((loop.time() + delay, data))
+    except ConnectionError:
+        pass
+    chunks.put_nowait((0, None))
+    await sender
+
+
+async def start_latency_proxy(target_port: int, delay: float):
+    async def handle(client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", target_port)
+        await asyncio.gather(
+            _pipe(client_reader, upstream_writer, delay), _pipe(upstream_reader, client_writer, delay),
+            return_exceptions=True,
+        )
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def per_message(count: int, concurrency: int, port: int) -> float:
+    from app.services.email_queue import email_queue
+    from app.services.smtp_client import SMTPConnection
+
+    message = email_queue._message(_sample(0))
+    remaining = iter(range(count))
+
+    async def sender():
+        for index in remaining:
+            connection = SMTPConnection("127.0.0.1", port, starttls=False)
+            await connection.open()
+            [error] = await connection.send_batch(email_queue.sender, [(f"user{index}@example.com", message)])
+            assert error is None, error
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def _sample(index: int):
+    from app.services.email_queue import _Claimed
+
+    class Row:
+        id = index
+        recipient = f"user{index}@example.com"
+        subject = "Order Booked - HelpMate API"
+        html_body = "<html><body><p>An order has been booked.<br><b>Order ID:</b> %d</p></body></html>" % index
+        attempts = 0
+
+    return _Claimed(Row)
+
+
+async def queued(count: int) -> float:
+    from sqlalchemy import func, insert, select
+    from app.core.database import AsyncSessionLocal
+    from app.models.outbound_email import OutboundEmail
+    from app.services.email_queue import email_queue
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(OutboundEmail), [
+            {"recipient": f"user{i}@example.com", "subject": "Order Booked - HelpMate API",
+             "html_body": _sample(i).html_body}
+            for i in range(count)
+        ])
+        await db.commit()
+    started = time.perf_counter()
+    while await email_queue.run_once():
+        pass
+    elapsed = time.perf_counter() - started
+    async with AsyncSessionLocal() as db:
+        left = (await db.execute(select(func.count()).select_from(OutboundEmail))).scalar()
+    assert left == 0, f"{left} emails left in the queue"
+    for connection in email_queue._connections:
+        await connection.close()
+    email_queue._connections = []
+    return elapsed
+
+
+async def run(args):
+    from aiosmtpd.controller import Controller
+
+    handler = SinkHandler()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        sink_port = probe.getsockname()[1]
+    controller = Controller(handler, hostname="127.0.0.1", port=sink_port)
+    controller.start()
+    proxy, port = await start_latency_proxy(controller.port, args.latency_ms / 1000)
+    os.environ["SMTP_PORT"] = str(port)
+
+    from app.core.config import settings
+    settings.smtp_port = port
+
+    print(f"{args.messages} messages, pool of {args.pool_size}, {args.latency_ms} ms each way")
+    print(f"{'mode':<12} {'seconds':>8} {'msg/s':>8}")
+    modes = [("per-message", None), ("pooled", False), ("pipelined", True)]
+    for name, pipelining in modes:
+        handler.received = 0
+        if pipelining is None:
+            elapsed = await per_message(args.messages, args.pool_size, port)
+        else:
+            handler.pipelining = pipelining
+            elapsed = await queued(args.messages)
+        assert handler.received == args.messages, handler.received
+        print(f"{name:<12} {elapsed:>8.2f} {args.messages / elapsed:>8.0f}")
+    proxy.close()
+    controller.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="added to each direction")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), "email_queue.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ.update({
+        "SMTP_SERVER": "127.0.0.1", "SMTP_STARTTLS": "false", "SMTP_USERNAME": "", "SMTP_PASSWORD": "",
+        "SMTP_SENDER": "noreply@helpmate.test",
+        "SMTP_POOL_SIZE": str(args.pool_size), "EMAIL_BATCH_SIZE": str(args.batch_size),
+    })
+    from migrate_db import migrate_database
+    migrate_database()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
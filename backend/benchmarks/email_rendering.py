@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Email rendering benchmark for HelpMate
+
+Renders the order booked email --count times and reports microseconds per
+email for:
+
+  f-string     the old inline f-string with the whole page in it (HTML only)
+  full layout  the Jinja2 body template and the layout rendered on every send,
+               plus the whole page converted to plain text
+  cached       email_templates.render: the HTML and plain-text body templates
+               rendered, the layout's HTML and text taken from the cache
+               filled at load
+
+    python benchmarks/email_rendering.py --count 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class Order:
+    id = 1234
+    description = "Fix the kitchen sink & replace the tap"
+    scheduled_date = "2026-10-18 09:00:00"
+    total_amount = 45.5
+
+
+def f_string(order: Order, app_name: str) -> str:
+    return f"""
+        <html><body>
+        <div style='font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;'>
+            <div style='background-color: #1565C0; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0;'>
+                <h1 style='margin: 0;'>{app_name}</h1>
+            </div>
+            <div style='background-color: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px;'>
+                <h2 style='color: #333; margin-bottom: 20px;'>Order Booked</h2>
+                <p style='color: #666; line-height: 1.6;'>
+                    An order has been booked.<br><br>
+                    <b>Order ID:</b> {order.id}<br>
+                    <b>Description:</b> {order.description}<br>
+                    <b>Scheduled Date:</b> {order.scheduled_date}<br>
+                    <b>Total Amount:</b> ${order.total_amount}<br>
+                </p>
+                <div style='margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #999;'>
+                    <p>© 2025 {app_name}. All rights reserved.</p>
+                </div>
+            </div>
+        </div>
+        </body></html>
+        """
+
+
+def timed(count: int, render) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        render()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    from markupsafe import Markup
+    from app.core.config import settings
+    from app.services.email_templates import LAYOUT, email_templates, html_to_text
+
+    email_templates.load()
+    body = email_templates.environment.get_template("order_booked.html")
+    layout = email_templates.environment.get_template(LAYOUT)
+    order = Order()
+
+    def full_layout():
+        html = layout.render(content=Markup(body.render(order=order)))
+        return html, html_to_text(html)
+
+    def cached():
+        rendered = email_templates.render("order_booked.html", order=order)
+        return rendered.html, rendered.text
+
+    print(f"{args.count} emails")
+    print(f"{'mode':<12} {'us/email':>9} {'html bytes':>11}")
+    modes = [
+        ("f-string", lambda: (f_string(order, settings.app_name), "")),
+        ("full layout", full_layout),
+        ("cached", cached),
+    ]
+    for name, render in modes:
+        html, _ = render()
+        print(f"{name:<12} {timed(args.count, render):>9.1f} {len(html.encode()):>11}")
+
+
+if __name__ == "__main__":
+    main()
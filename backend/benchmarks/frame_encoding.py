@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+WebSocket frame encoding benchmark for HelpMate
+
+Compares the JSON frames sockets get by default with the MessagePack
+frames (short keys, epoch timestamps) sent to clients that negotiate the
+helpmate.msgpack.v1 subprotocol. For each kind of frame it reports the
+bytes on the wire and the time per message to:
+
+  encode  build the frame from a Message row (MessageResponse JSON; for
+          MessagePack also the JSON-to-MessagePack transcode, done once per
+          message per process however many sockets receive it)
+  decode  parse it back into a dict, as a client would
+
+    python benchmarks/frame_encoding.py --content-size 80 --iterations 20000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--content-size", type=int, default=80, help="chat message length in characters")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    import msgpack
+    from app.models.chat import Message
+    from app.schemas.chat import MessageResponse
+    from app.services.framing import pack_frame
+
+    message = Message(id=123456, chat_id=4321, sender_type="user", sender_id=98765,
+                      content=("Is tomorrow at ten still fine for the plumbing job? " * 10)[:args.content_size],
+                      is_read=False, created_at=datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc))
+    chat_frame = MessageResponse.from_orm(message).json()
+    frames = {
+        "chat message": (lambda: MessageResponse.from_orm(message).json(), chat_frame),
+        "principal message": (
+            lambda: f'{{"type": "message", "message": {MessageResponse.from_orm(message).json()}}}',
+            f'{{"type": "message", "message": {chat_frame}}}',
+        ),
+        "read receipt": (
+            lambda: json.dumps({"type": "read", "chat_id": 4321, "reader": "worker", "last_read_message_id": 123456}),
+            None,
+        ),
+        "order status": (
+            lambda: json.dumps({"type": "order_status", "order_id": 5555, "status": "accepted",
+                                "previous_status": "pending"}),
+            None,
+        ),
+        "notification": (
+            lambda: json.dumps({"type": "notification", "notification": {
+                "id": 777, "type": "order_booked", "title": "New Order Booked",
+                "message": "You have a new order (ID: 5555). Description: fix the kitchen sink",
+                "is_read": False, "created_at": "2026-10-18T09:30:00Z",
+            }}),
+            None,
+        ),
+    }
+
+    print(f"{'frame':<18} {'json B':>7} {'msgpack B':>9} {'saved':>6}"
+          f" {'json enc us':>11} {'msgpack enc us':>14} {'json dec us':>11} {'msgpack dec us':>14}")
+    for name, (encode, frame) in frames.items():
+        frame = frame or encode()
+        packed = pack_frame(frame)
+        json_encode = per_call_us(encode, args.iterations)
+        msgpack_encode = per_call_us(lambda: pack_frame(encode()), args.iterations)
+        json_decode = per_call_us(lambda: json.loads(frame), args.iterations)
+        msgpack_decode = per_call_us(lambda: msgpack.unpackb(packed), args.iterations)
+        json_bytes = len(frame.encode())
+        print(f"{name:<18} {json_bytes:>7} {len(packed):>9} {1 - len(packed) / json_bytes:>6.0%}"
+              f" {json_encode:>11.2f} {msgpack_encode:>14.2f} {json_decode:>11.2f} {msgpack_decode:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
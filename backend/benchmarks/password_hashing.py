@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Password hashing benchmark for HelpMate
+
+Fires a steady stream of logins at the API while probing an unrelated
+endpoint (/health) and reports the probe's latency percentiles. Run it once
+with the process pool and once inline to compare:
+
+    python benchmarks/password_hashing.py --workers 2
+    python benchmarks/password_hashing.py --workers 0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import get_password_hash, password_hasher
+    from app.models import User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(
+        email="bench@example.com",
+        full_name="Bench User",
+        hashed_password=get_password_hash("bench-password"),
+        is_active=True,
+        is_verified=True,
+    ))
+    db.commit()
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_payload = {"email": "bench@example.com", "password": "bench-password"}
+        login_statuses = {}
+        probe_latencies = []
+        deadline = time.perf_counter() + args.duration
+        logins = []
+
+        async def login():
+            response = await client.post("/api/v1/auth/login/user", json=login_payload)
+            login_statuses[response.status_code] = login_statuses.get(response.status_code, 0) + 1
+
+        async def fire_logins():
+            interval = 1.0 / args.rate
+            next_at = time.perf_counter()
+            while time.perf_counter() < deadline:
+                logins.append(asyncio.create_task(login()))
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(fire_logins(), probe())
+        await asyncio.gather(*logins)
+
+    password_hasher.shutdown()
+    print(f"workers={args.workers} rate={args.rate}/s duration={args.duration}s")
+    print(f"  login responses: {dict(sorted(login_statuses.items()))}")
+    print(f"  /health probes:  {len(probe_latencies)}")
+    print(f"  /health p50:     {statistics.median(probe_latencies):.2f} ms")
+    print(f"  /health p99:     {percentile(probe_latencies, 99):.2f} ms")
+    print(f"  /health max:     {max(probe_latencies):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="password hash pool size (0 = inline)")
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--rate", type=float, default=200, help="logins per second")
+    parser.add_argument("--duration", type=float, default=5, help="seconds")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(args.max_pending)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Slow WebSocket consumer check for HelpMate
+
+Starts one uvicorn server, opens --fast chat sockets that read everything
+and --slow sockets that never read, then posts --messages chat messages of
+--size bytes. Fails unless every fast socket receives every message and
+every slow socket is disconnected; reports fast-socket delivery latency and
+the websocket metrics from GET /admin/metrics:
+
+    python benchmarks/slow_consumers.py --fast 20 --slow 5
+
+Needs the websockets package (part of uvicorn[standard]).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed():
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Chat, User, Worker
+
+    db = SessionLocal()
+    user = User(email="slow-consumers@example.com", full_name="Slow Consumers", hashed_password="x",
+                is_active=True, is_verified=True, is_admin=True)
+    worker = Worker(email="slow-consumers@example.com", full_name="Slow Consumers", hashed_password="x",
+                    hourly_rate=20.0, skills=[], is_active=True)
+    db.add_all([user, worker])
+    db.flush()
+    chat = Chat(user_id=user.id, worker_id=worker.id)
+    db.add(chat)
+    db.commit()
+    token = create_access_token(data={"sub": user.email, "user_type": "user", "user_id": user.id})
+    chat_id = chat.id
+    db.close()
+    return chat_id, token
+
+
+def open_stalled_socket(port, chat_id, token) -> socket.socket:
+    """A WebSocket client that completes the handshake and then stops reading."""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    sock.sendall((
+        f"GET /api/v1/chat/ws/chat/{chat_id}?token={token} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(1)
+    assert response.startswith(b"HTTP/1.1 101"), response
+    return sock
+
+
+def drain_until_closed(sock: socket.socket, timeout: float):
+    """Read a stalled socket to EOF; returns the bytes read, or None if the server never closed it."""
+    sock.settimeout(timeout)
+    total = 0
+    try:
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return total
+            total += len(chunk)
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+async def run(args, port, chat_id, token):
+    import httpx
+    import websockets
+
+    url = f"ws://127.0.0.1:{port}/api/v1/chat/ws/chat/{chat_id}?token={token}"
+    sent = {}
+    latencies = []
+    received = [0] * args.fast
+
+    async def consume(index, ws):
+        while received[index] < args.messages:
+            event = json.loads(await ws.recv())
+            received[index] += 1
+            latencies.append((time.perf_counter() - sent[event["content"][:16]]) * 1000)
+
+    fast = [await websockets.connect(url, max_size=None) for _ in range(args.fast)]
+    slow = [open_stalled_socket(port, chat_id, token) for _ in range(args.slow)]
+    await asyncio.sleep(0.2)
+    consumers = [asyncio.create_task(consume(i, ws)) for i, ws in enumerate(fast)]
+    padding = "x" * args.size
+    async with httpx.AsyncClient(timeout=30, headers={"Authorization": f"Bearer {token}"}) as client:
+        started = time.perf_counter()
+        for i in range(args.messages):
+            key = f"{i:016d}"
+            sent[key] = time.perf_counter()
+            response = await client.post(f"http://127.0.0.1:{port}/api/v1/chat/{chat_id}/messages",
+                                         json={"content": key + padding})
+            response.raise_for_status()
+        try:
+            await asyncio.wait_for(asyncio.gather(*consumers), timeout=30)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(args.timeout + 1)
+        drained = [await asyncio.to_thread(drain_until_closed, sock, args.timeout * 2 + 5) for sock in slow]
+        metrics = (await client.get(f"http://127.0.0.1:{port}/api/v1/admin/metrics")).json()["websockets"]
+    for ws in fast:
+        await ws.close()
+    closed = sum(received_bytes is not None for received_bytes in drained)
+
+    print(f"fast={args.fast} slow={args.slow} messages={args.messages} size={args.size} in {elapsed:.2f}s")
+    print(f"  fast sockets complete: {sum(count == args.messages for count in received)}/{args.fast}")
+    print(f"  slow sockets disconnected: {closed}/{args.slow}"
+          f" after receiving {[b // 1024 if b is not None else None for b in drained]} KiB")
+    if latencies:
+        latencies.sort()
+        print(f"  fast delivery latency p50 {statistics.median(latencies):.2f} ms"
+              f"  p99 {latencies[int(0.99 * (len(latencies) - 1))]:.2f} ms")
+    print(f"  metrics: {metrics}")
+    if any(count != args.messages for count in received) or closed != args.slow:
+        sys.exit("FAILED: slow consumers held back fast ones or were not disconnected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fast", type=int, default=20)
+    parser.add_argument("--slow", type=int, default=5)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--size", type=int, default=32768, help="message content bytes")
+    parser.add_argument("--queue", type=int, default=64, help="WEBSOCKET_SEND_QUEUE_SIZE")
+    parser.add_argument("--timeout", type=float, default=2.0, help="WEBSOCKET_SEND_TIMEOUT_SECONDS")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REALTIME_BROKER"] = "memory"
+    os.chdir(BACKEND_DIR)
+    from migrate_db import migrate_database
+    migrate_database()
+    chat_id, token = seed()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ, PASSWORD_HASH_WORKERS="0", WEBSOCKET_SEND_QUEUE_SIZE=str(args.queue),
+                 WEBSOCKET_SEND_TIMEOUT_SECONDS=str(args.timeout)),
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health")
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        asyncio.run(run(args, port, chat_id, token))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
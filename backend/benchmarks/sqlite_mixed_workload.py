@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+SQLite mixed read/write benchmark for HelpMate
+
+Runs the same chat workload (mostly message list reads, some message
+inserts) from many threads against a fresh SQLite file, once with today's
+default engine and once with SQLITE_TUNING enabled (WAL, pragmas and the
+single-writer session), and reports throughput and lock errors:
+
+    python benchmarks/sqlite_mixed_workload.py --threads 16 --write-ratio 0.2
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def run_child(args):
+    from sqlalchemy.exc import OperationalError
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Chat, Message, User, Worker
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", full_name="Bench", hashed_password="x")
+    worker = Worker(email="bench-worker@example.com", full_name="Bench", hashed_password="x", skills=[])
+    db.add_all([user, worker])
+    db.commit()
+    chats = [Chat(user_id=user.id, worker_id=worker.id) for _ in range(args.chats)]
+    db.add_all(chats)
+    db.commit()
+    chat_ids = [chat.id for chat in chats]
+    db.close()
+
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            chat_id = rng.choice(chat_ids)
+            session = SessionLocal()
+            try:
+                if rng.random() < args.write_ratio:
+                    session.add(Message(chat_id=chat_id, sender_type="user", sender_id=1, content="benchmark"))
+                    session.commit()
+                    key = "writes"
+                else:
+                    session.query(Message).filter(Message.chat_id == chat_id) \
+                        .order_by(Message.created_at.desc()).limit(50).all()
+                    key = "reads"
+            except OperationalError:
+                session.rollback()
+                key = "locked"
+            finally:
+                session.close()
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    mode = "tuned" if os.environ.get("SQLITE_TUNING") == "1" else "default"
+    total = counts["reads"] + counts["writes"]
+    print(f"{mode:<8} {total / elapsed:>9.1f} ops/s   reads {counts['reads'] / elapsed:>9.1f}/s   "
+          f"writes {counts['writes'] / elapsed:>8.1f}/s   locked errors {counts['locked']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5, help="seconds per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.duration}s per mode")
+    for tuned in ("0", "1"):
+        workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            SQLITE_TUNING=tuned,
+        )
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", *sys.argv[1:]], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+WebSocket capacity harness for HelpMate
+
+Starts one uvicorn worker with a short protocol ping interval, then:
+
+  1. opens --sockets chat sockets spread over --chats chats, plus
+     --half-open raw sockets that complete the handshake and then never
+     read or answer a ping;
+  2. reads the websocket gauges from GET /admin/metrics (connections,
+     per-chat fan-out, bytes sent, estimated memory per connection);
+  3. posts one message to every chat and times delivery to every socket;
+  4. idles past one ping interval plus timeout and checks that every live
+     socket survived while every half-open one was dropped.
+
+    python benchmarks/websocket_capacity.py --sockets 10000 --chats 100
+
+Each socket holds a file descriptor in both processes; the harness raises
+its soft RLIMIT_NOFILE (inherited by the server) as far as the hard limit
+allows. Needs the websockets package (part of uvicorn[standard]).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def raise_fd_limit(needed: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    if target < needed:
+        print(f"Warning: RLIMIT_NOFILE hard limit {hard} is below the {needed} descriptors needed")
+
+
+def seed(chats: int):
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import Chat, User, Worker
+
+    db = SessionLocal()
+    worker = Worker(email="capacity@example.com", full_name="Capacity Worker", hashed_password="x",
+                    hourly_rate=20.0, skills=[], is_active=True)
+    db.add(worker)
+    pairs = []
+    for c in range(chats):
+        user = User(email=f"capacity-{c}@example.com", full_name=f"Capacity User {c}", hashed_password="x",
+                    is_active=True, is_verified=True, is_admin=c == 0)
+        db.add(user)
+        db.flush()
+        chat = Chat(user_id=user.id, worker_id=worker.id)
+        db.add(chat)
+        db.flush()
+        pairs.append((chat.id, create_access_token(
+            data={"sub": user.email, "user_type": "user", "user_id": user.id}
+        )))
+    db.commit()
+    db.close()
+    return pairs
+
+
+def open_half_open_socket(port, chat_id, token) -> socket.socket:
+    """A WebSocket client that completes the handshake and then goes silent, pongs included."""
+    sock = socket.socket()
+    sock.connect(("127.0.0.1", port))
+    sock.sendall((
+        f"GET /api/v1/chat/ws/chat/{chat_id}?token={token} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(1)
+    assert response.startswith(b"HTTP/1.1 101"), response
+    return sock
+
+
+def closed_by_server(sock: socket.socket) -> bool:
+    """Whether the server has closed a half-open socket (reads what it buffered up to EOF)."""
+    sock.settimeout(1)
+    try:
+        while sock.recv(65536):
+            pass
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def percentile(values, fraction):
+    return values[int(fraction * (len(values) - 1))]
+
+
+async def run(args, port, pairs):
+    import httpx
+    import websockets
+
+    admin_headers = {"Authorization": f"Bearer {pairs[0][1]}"}
+    gate = asyncio.Semaphore(args.connect_concurrency)
+    assignments = [pairs[i % len(pairs)] for i in range(args.sockets)]
+
+    async def connect(chat_id, token):
+        async with gate:
+            # The server pings; the client only answers, which the library does on its own
+            ws = await websockets.connect(
+                f"ws://127.0.0.1:{port}/api/v1/chat/ws/chat/{chat_id}?token={token}",
+                ping_interval=None, open_timeout=60,
+            )
+            # The pong arrives once the socket is authenticated and subscribed
+            await ws.send(json.dumps({"type": "ping"}))
+            pong = json.loads(await asyncio.wait_for(ws.recv(), timeout=60))
+            assert pong == {"type": "pong"}, pong
+            return ws
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[connect(c, t) for c, t in assignments], return_exceptions=True)
+    connect_seconds = time.perf_counter() - started
+    sockets = [(ws, chat_id) for ws, (chat_id, _) in zip(results, assignments) if not isinstance(ws, Exception)]
+    failures = [r for r in results if isinstance(r, Exception)]
+    half_open = [open_half_open_socket(port, *pairs[i % len(pairs)]) for i in range(args.half_open)]
+    print(f"opened {len(sockets)}/{args.sockets} sockets in {connect_seconds:.1f}s"
+          f" ({len(sockets) / connect_seconds:.0f}/s), {len(half_open)} half-open")
+    if failures:
+        print(f"  first connect failure: {failures[0]!r}")
+
+    async with httpx.AsyncClient(timeout=60, headers=admin_headers) as client:
+        await asyncio.sleep(1)
+        loaded = (await client.get(f"http://127.0.0.1:{port}/api/v1/admin/metrics")).json()["websockets"]
+
+        # One message per chat; every socket should receive exactly one frame
+        posted = {}
+        latencies = []
+
+        async def receive_one(ws, chat_id):
+            await ws.recv()
+            latencies.append((time.perf_counter() - posted[chat_id]) * 1000)
+
+        receivers = [asyncio.create_task(receive_one(ws, chat_id)) for ws, chat_id in sockets]
+        fanout_started = time.perf_counter()
+        for chat_id, token in pairs:
+            posted[chat_id] = time.perf_counter()
+            response = await client.post(f"http://127.0.0.1:{port}/api/v1/chat/{chat_id}/messages",
+                                         json={"content": "capacity probe"},
+                                         headers={"Authorization": f"Bearer {token}"})
+            response.raise_for_status()
+        done, pending = await asyncio.wait(receivers, timeout=120)
+        fanout_seconds = time.perf_counter() - fanout_started
+        for task in pending:
+            task.cancel()
+
+        # Idle long enough for every socket to be pinged and every missed pong to time out
+        idle = args.ping_interval + args.ping_timeout + 2
+        await asyncio.sleep(idle)
+        after_idle = (await client.get(f"http://127.0.0.1:{port}/api/v1/admin/metrics")).json()["websockets"]
+
+    alive = sum(ws.state is websockets.protocol.State.OPEN for ws, _ in sockets)
+    dropped = sum([await asyncio.to_thread(closed_by_server, sock) for sock in half_open])
+    for ws, _ in sockets:
+        await ws.close()
+
+    per_connection = loaded["estimated_bytes_per_connection"]
+    print(f"  server: {loaded['connections']} connections, rss {loaded['rss_bytes'] / 2**20:.0f} MiB,"
+          f" ~{(per_connection or 0) / 1024:.1f} KiB per connection, fan-out {loaded['fanout']}")
+    latencies.sort()
+    print(f"  fan-out: {len(latencies)}/{len(sockets)} sockets got the probe in {fanout_seconds:.2f}s")
+    if latencies:
+        print(f"           latency p50 {statistics.median(latencies):.1f} ms  p99 {percentile(latencies, 0.99):.1f} ms"
+              f"  max {latencies[-1]:.1f} ms; {after_idle['bytes_sent']} bytes sent")
+    print(f"  after {idle:.0f}s idle: {alive}/{len(sockets)} live sockets open,"
+          f" {dropped}/{len(half_open)} half-open sockets dropped, server holds {after_idle['connections']}")
+    print(f"  metrics: {after_idle}")
+    if failures or len(latencies) != len(sockets) or alive != len(sockets) or dropped != len(half_open):
+        sys.exit("FAILED")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--half-open", type=int, default=20)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--ping-interval", type=float, default=5.0, help="WEBSOCKET_PING_INTERVAL_SECONDS")
+    parser.add_argument("--ping-timeout", type=float, default=5.0, help="WEBSOCKET_PING_TIMEOUT_SECONDS")
+    args = parser.parse_args()
+
+    raise_fd_limit(args.sockets + args.half_open + 1024)
+    workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["REALTIME_BROKER"] = "memory"
+    os.chdir(BACKEND_DIR)
+    from migrate_db import migrate_database
+    migrate_database()
+    pairs = seed(args.chats)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "4096", "--ws-ping-interval", str(args.ping_interval),
+         "--ws-ping-timeout", str(args.ping_timeout)],
+        env=dict(os.environ, PASSWORD_HASH_WORKERS="0", SQLITE_TUNING="true"),
+    )
+    try:
+        import httpx
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/health")
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        asyncio.run(run(args, port, pairs))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
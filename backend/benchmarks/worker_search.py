@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Category availability search benchmark for HelpMate
+
+Seeds one category with --workers workers (a mix of common and random weekly
+working hours, --orders scheduled orders each over the next two weeks) in a
+fresh SQLite file, then answers "who in the category is free for this
+window" for random 1-4 hour windows two ways: the slot bitmaps behind
+GET /workers/available, and one SQL query joining working hours with a
+NOT EXISTS overlap check on orders:
+
+    python benchmarks/worker_search.py --workers 50000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COMMON_HOURS = [
+    [(day, 9, 17) for day in range(5)],
+    [(day, 8, 16) for day in range(6)],
+    [(day, 12, 20) for day in range(2, 7)],
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def seed(workers: int, orders: int, origin: datetime):
+    from sqlalchemy import insert
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Category, Order, Service, User, Worker, WorkerWorkingHours
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(3)
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", full_name="Bench User", hashed_password="x"))
+    db.add(Category(name="Bench"))
+    db.flush()
+    db.execute(insert(Worker), [
+        {"email": f"bench-worker-{w}@example.com", "full_name": f"Bench Worker {w}", "hashed_password": "x",
+         "hourly_rate": 20.0, "skills": [], "is_active": True, "is_available": True,
+         "rating": round(rng.uniform(3, 5), 2)}
+        for w in range(workers)
+    ])
+    db.execute(insert(Service), [
+        {"title": "Bench", "category_id": 1, "worker_id": w + 1, "hourly_rate": 20.0, "is_available": True}
+        for w in range(workers)
+    ])
+    hours, bookings = [], []
+    for worker_id in range(1, workers + 1):
+        if rng.random() < 0.7:
+            schedule = rng.choice(COMMON_HOURS)
+        else:
+            schedule = [(day, start, start + rng.randint(4, 10))
+                        for day in rng.sample(range(7), rng.randint(3, 6))
+                        for start in [rng.randint(6, 13)]]
+        for day, start, end in schedule:
+            hours.append({"worker_id": worker_id, "weekday": day,
+                          "start_time": clock(start), "end_time": clock(min(end, 23))})
+        for _ in range(orders):
+            start = origin + timedelta(days=rng.randrange(14), hours=rng.randint(7, 19))
+            length = rng.randint(1, 3)
+            bookings.append({"user_id": 1, "worker_id": worker_id, "service_id": worker_id, "hours": length,
+                             "total_amount": 20.0 * length, "status": "accepted",
+                             "scheduled_date": start, "scheduled_end": start + timedelta(hours=length)})
+    db.execute(insert(WorkerWorkingHours), hours)
+    db.execute(insert(Order), bookings)
+    db.commit()
+    db.close()
+
+
+async def run(args, origin: datetime):
+    from sqlalchemy import and_, exists, func, select
+    from app.core.database import AsyncSessionLocal
+    from app.models.order import ACTIVE_ORDER_STATUSES, Order
+    from app.models.service import Service
+    from app.models.worker import Worker, WorkerWorkingHours
+    from app.services.slot_index import slot_index
+
+    rng = random.Random(9)
+    windows = []
+    for _ in range(args.searches):
+        start = origin + timedelta(days=rng.randrange(1, 14), hours=rng.randint(6, 18), minutes=15 * rng.randrange(4))
+        windows.append((start, start + timedelta(minutes=15 * rng.randint(4, 16))))
+
+    async def sql_search(db, start, end):
+        free = select(Worker.id).join(Service, Service.worker_id == Worker.id).join(
+            WorkerWorkingHours, WorkerWorkingHours.worker_id == Worker.id,
+        ).where(
+            Service.category_id == 1,
+            Worker.is_active == True,
+            Worker.is_available == True,
+            WorkerWorkingHours.weekday == start.weekday(),
+            WorkerWorkingHours.start_time <= start.time(),
+            WorkerWorkingHours.end_time >= end.time(),
+            ~exists().where(and_(
+                Order.worker_id == Worker.id,
+                Order.status.in_(ACTIVE_ORDER_STATUSES),
+                Order.scheduled_date < end,
+                Order.scheduled_end > start,
+            )),
+        )
+        return (await db.execute(select(func.count()).select_from(free.subquery()))).scalar()
+
+    async def bitmap_search(db, start, end):
+        total, _ = await slot_index.find_available(db, 1, start, end, 0, 20)
+        return total
+
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await bitmap_search(db, *windows[0])
+        print(f"workers={args.workers} orders/worker={args.orders} searches={args.searches}")
+        print(f"  bitmap build   {(time.perf_counter() - started) * 1000:9.1f} ms  {slot_index.stats()}")
+
+        results = {}
+        for label, search, count in (("bitmaps", bitmap_search, args.searches),
+                                     ("sql", sql_search, min(args.searches, args.sql_searches))):
+            latencies = []
+            totals = []
+            for start, end in windows[:count]:
+                began = time.perf_counter()
+                totals.append(await search(db, start, end))
+                latencies.append((time.perf_counter() - began) * 1000)
+            results[label] = (latencies, totals)
+
+    for label, (latencies, totals) in results.items():
+        print(f"  {label:<14} p50 {statistics.median(latencies):9.3f} ms  p99 {percentile(latencies, 99):9.3f} ms"
+              f"  mean matches {statistics.mean(totals):9.1f}")
+    checked = len(results["sql"][1])
+    mismatches = sum(a != b for a, b in zip(results["bitmaps"][1][:checked], results["sql"][1]))
+    print(f"  result mismatches: {mismatches}/{checked}")
+    if mismatches:
+        sys.exit("FAILED: bitmap search disagrees with SQL")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=50000)
+    parser.add_argument("--orders", type=int, default=4, help="scheduled orders per worker")
+    parser.add_argument("--searches", type=int, default=1000)
+    parser.add_argument("--sql-searches", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="helpmate-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    origin = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    seed(args.workers, args.orders, origin)
+    asyncio.run(run(args, origin))
+
+
+if __name__ == "__main__":
+    main()
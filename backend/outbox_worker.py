@@ -0,0 +1,47 @@
+"""Delivers the outbox and sends queued emails outside the API processes.
+
+Run it where API processes cannot keep a background task alive (serverless)
+or to take SMTP connections off the web servers, with OUTBOX_DISPATCHER=off
+and EMAIL_DISPATCHER=off on the API. New notifications reach sockets through
+the realtime broker, so use the redis or postgres broker when sockets are
+served by other processes.
+
+    python outbox_worker.py
+"""
+import asyncio
+import signal
+from app.core.database import async_engine
+from app.services.broker import broker
+from app.services.email_queue import email_queue
+from app.services.email_templates import email_templates
+from app.services.outbox import outbox_dispatcher
+from app.services.realtime import realtime_events
+
+
+async def _ignore(topic: str, message: str):
+    # This process holds no sockets; it only publishes
+    pass
+
+
+async def run_worker():
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await broker.start(_ignore)
+    realtime_events.start()
+    email_templates.load()
+    await outbox_dispatcher.start()
+    await email_queue.start()
+    print("Outbox worker started.")
+    await stopping.wait()
+    await outbox_dispatcher.stop()
+    await email_queue.stop()
+    realtime_events.stop()
+    await broker.stop()
+    await async_engine.dispose()
+    print("Outbox worker stopped.")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -32,11 +32,12 @@ def check_postgresql_connection():
         return False
 
 def create_tables():
-    """Create all tables using SQLAlchemy"""
+    """Create all tables by applying the Alembic migrations"""
     try:
         os.environ['DATABASE_URL'] = SUPABASE_URL
-        engine = create_engine(SUPABASE_URL)
-        Base.metadata.create_all(bind=engine)
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "head")
         print("✅ All tables created successfully in Supabase (no data migrated)")
         return True
     except Exception as e: